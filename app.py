@@ -8,22 +8,33 @@ dos municípios capixabas, incluindo IDEB, matrículas e rendimento escolar.
 
 import streamlit as st
 import sys
+import time
 from pathlib import Path
 
 # Adiciona o diretório src ao path para importações
 sys.path.append(str(Path(__file__).parent / "src"))
 
 from src.data.data_loader import DataLoader
+from src.data.warmup import is_warmup_ready, start_warmup
+from src.components.alertas import render_alert_sidebar
+from src.components.analises import render_analises
 from src.components.homepage import render_homepage
 from src.components.overview import render_overview
 from src.components.ideb import render_ideb_analysis
+from src.components.mapas import render_mapas
 from src.components.matriculas import render_matriculas_analysis
 from src.components.rendimento import render_rendimento_analysis
+from src.utils.fragments import interaction_scope
 from src.utils.helpers import apply_custom_css, show_expansion_plans
+from src.utils.metrics import record_rerun, start_metrics_writer, track_session
+from src.utils.settings import DATA_PATH, WARMUP_ENABLED
+from src.utils.tracing import render_performance_panel, span
 
 
 def main():
     """Função principal da aplicação."""
+    inicio = time.perf_counter()
+
     # Configuração da página
     st.set_page_config(
         page_title="Dashboard Educacional - Espírito Santo",
@@ -58,7 +69,7 @@ def main():
 
     # Inicializa o carregador de dados
     try:
-        data_loader = DataLoader()
+        data_loader = DataLoader(DATA_PATH)
 
         # Verifica se os dados estão disponíveis
         stats = data_loader.get_summary_stats()
@@ -77,6 +88,15 @@ def main():
         )
         st.stop()
 
+    # Pré-carrega agregados e gráficos em segundo plano (no início do
+    # servidor e após cada recarga dos dados)
+    if WARMUP_ENABLED:
+        start_warmup(data_loader)
+
+    # Métricas operacionais em arquivo (se DASHBOARD_METRICS_FILE definido)
+    start_metrics_writer()
+    track_session()
+
     # Sidebar para navegação
     st.sidebar.markdown("### 🎓 ES Educação")
 
@@ -98,6 +118,8 @@ def main():
         "🎯 Análise IDEB",
         "👥 Análise de Matrículas",
         "📈 Rendimento Escolar",
+        "🗺️ Mapas",
+        "🔬 Análises",
         "🚀 Planos de Expansão",
     ]
 
@@ -110,16 +132,11 @@ def main():
     # Informações do sidebar (filtradas por rede)
     st.sidebar.markdown("### 📊 Resumo dos Dados")
 
-    # Filtrar dados por rede selecionada
-    ideb_filtrado = data_loader.load_ideb_data()[
-        data_loader.load_ideb_data()["REDE"] == rede_selecionada
-    ]
-    microdados_filtrado = data_loader.load_microdados()[
-        data_loader.load_microdados()["REDE"] == rede_selecionada
-    ]
-    municipios_filtrados = len(ideb_filtrado["CO_MUNICIPIO"].unique())
-    matriculas_filtradas = microdados_filtrado["QT_MATRICULAS"].sum()
-    ideb_medio_filtrado = ideb_filtrado["VL_OBSERVADO_2023"].mean()
+    # Resumo da rede selecionada (cacheado por versão dos dados)
+    resumo_rede = data_loader.get_rede_summary(rede_selecionada)
+    municipios_filtrados = resumo_rede["municipios"]
+    matriculas_filtradas = resumo_rede["matriculas"]
+    ideb_medio_filtrado = resumo_rede["ideb_medio"]
 
     st.sidebar.metric("Municípios", municipios_filtrados)
     st.sidebar.metric(
@@ -127,6 +144,15 @@ def main():
     )
     st.sidebar.metric("IDEB Médio", f"{ideb_medio_filtrado:.2f}")
 
+    # Alertas de indicadores críticos (regras avaliadas por versão dos dados)
+    render_alert_sidebar(data_loader, rede_selecionada)
+
+    if WARMUP_ENABLED and not is_warmup_ready(data_loader):
+        st.sidebar.caption("⏳ Pré-carregando análises em segundo plano...")
+
+    # Painel de desempenho (apenas administradores, com rastreamento ativo)
+    render_performance_panel()
+
     st.sidebar.markdown("### 🎓 Sobre o Dashboard")
     st.sidebar.info(
         """
@@ -141,24 +167,31 @@ def main():
     """
     )
 
-    # Renderiza a seção selecionada
-    if opcao_selecionada == "🏠 Página Inicial":
-        render_homepage(data_loader, rede_selecionada)
+    # Renderiza a seção selecionada (medida como um span por página)
+    with span(f"pagina.{opcao_selecionada}"):
+        if opcao_selecionada == "🏠 Página Inicial":
+            render_homepage(data_loader, rede_selecionada)
+
+        elif opcao_selecionada == "📊 Visão Geral":
+            render_overview(data_loader, rede_selecionada)
 
-    elif opcao_selecionada == "📊 Visão Geral":
-        render_overview(data_loader, rede_selecionada)
+        elif opcao_selecionada == "🎯 Análise IDEB":
+            render_ideb_analysis(data_loader, rede_selecionada)
 
-    elif opcao_selecionada == "🎯 Análise IDEB":
-        render_ideb_analysis(data_loader, rede_selecionada)
+        elif opcao_selecionada == "👥 Análise de Matrículas":
+            render_matriculas_analysis(data_loader, rede_selecionada)
 
-    elif opcao_selecionada == "👥 Análise de Matrículas":
-        render_matriculas_analysis(data_loader, rede_selecionada)
+        elif opcao_selecionada == "📈 Rendimento Escolar":
+            render_rendimento_analysis(data_loader, rede_selecionada)
 
-    elif opcao_selecionada == "📈 Rendimento Escolar":
-        render_rendimento_analysis(data_loader, rede_selecionada)
+        elif opcao_selecionada == "🗺️ Mapas":
+            render_mapas(data_loader, rede_selecionada)
 
-    elif opcao_selecionada == "🚀 Planos de Expansão":
-        show_expansion_plans()
+        elif opcao_selecionada == "🔬 Análises":
+            render_analises(data_loader, rede_selecionada)
+
+        elif opcao_selecionada == "🚀 Planos de Expansão":
+            show_expansion_plans()
 
     # Rodapé
     st.markdown("---")
@@ -194,6 +227,11 @@ def main():
         """
         )
 
+    # Latência da execução completa, por página
+    record_rerun(opcao_selecionada, time.perf_counter() - inicio)
+
 
 if __name__ == "__main__":
-    main()
+    # Execução completa do script; reexecuções de fragmentos não passam aqui
+    with interaction_scope():
+        main()
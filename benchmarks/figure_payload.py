@@ -0,0 +1,128 @@
+"""
+Benchmark do tamanho (bytes) das especificações dos gráficos.
+
+Constrói cada gráfico registrado nos componentes para a visão padrão e
+compara o JSON original do Plotly com o JSON compactado (valores
+arredondados, typed arrays e template reduzido), com e sem gzip.
+
+Uso:
+    python benchmarks/figure_payload.py [--json resultados.json]
+"""
+
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import plotly.io as pio
+import streamlit.logger
+
+# Fora do servidor o Streamlit avisa a cada cache criado
+streamlit.logger.set_log_level("error")
+
+from src.data.data_loader import DataLoader
+from src.components import ideb, matriculas, overview, rendimento  # noqa: F401
+from src.utils.figure_cache import figure_builders
+from src.utils.payload import serialize_figure
+
+# Filtros da visão padrão de cada componente
+DEFAULT_FILTERS = {
+    "overview": ("Estadual",),
+    "ideb": ("Estadual", "Todas", "Todos"),
+    "matriculas": ("Todas", "Todos", "Todos"),
+    "rendimento": ("Todas", "Todos", "Todas", "Todos"),
+}
+
+
+def _primeira_previsao(data_loader: DataLoader):
+    """Primeira linha da projeção do IDEB da rede estadual (None se vazia)."""
+    previsao = data_loader.get_ideb_forecast()
+    previsao = previsao[previsao["REDE"] == "Estadual"]
+    return None if previsao.empty else previsao.iloc[0]
+
+
+def _filtros_previsao_distribuicao(data_loader: DataLoader):
+    """(rede, SRE, ano): a primeira edição projetada."""
+    primeira = _primeira_previsao(data_loader)
+    return None if primeira is None else ("Estadual", "Todas", int(primeira["ANO"]))
+
+
+def _filtros_previsao_municipio(data_loader: DataLoader):
+    """(rede, município): o primeiro município com projeção."""
+    primeira = _primeira_previsao(data_loader)
+    return None if primeira is None else ("Estadual", primeira["NO_MUNICIPIO"])
+
+
+# Gráficos cujos filtros diferem dos demais gráficos do componente (uma
+# função recebe o DataLoader, para filtros que dependem dos dados)
+CHART_FILTERS = {
+    ("ideb", "sre"): ("Estadual",),
+    ("ideb", "previsao_distribuicao"): _filtros_previsao_distribuicao,
+    ("ideb", "previsao_municipio"): _filtros_previsao_municipio,
+}
+
+
+def measure(data_loader: DataLoader) -> list:
+    """Mede o tamanho de cada gráfico registrado."""
+    results = []
+    for (component, chart_id), builder in sorted(figure_builders.items()):
+        filters = CHART_FILTERS.get(
+            (component, chart_id), DEFAULT_FILTERS.get(component)
+        )
+        if callable(filters):
+            filters = filters(data_loader)
+        if filters is None:
+            continue
+        fig = builder(data_loader, *filters)
+        if fig is None:
+            continue
+
+        raw = pio.to_json(fig, validate=False).encode()
+        compact = serialize_figure(fig).encode()
+        results.append(
+            {
+                "grafico": f"{component}.{chart_id}",
+                "bytes_original": len(raw),
+                "bytes_compacto": len(compact),
+                "gzip_original": len(gzip.compress(raw)),
+                "gzip_compacto": len(gzip.compress(compact)),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-path", default=str(ROOT / "database"))
+    parser.add_argument("--json", help="Arquivo para salvar os resultados")
+    args = parser.parse_args()
+
+    results = measure(DataLoader(args.data_path))
+
+    print(f"{'Gráfico':<32}{'Original':>10}{'Compacto':>10}{'Razão':>8}{'gzip':>14}")
+    for r in results:
+        razao = r["bytes_original"] / r["bytes_compacto"]
+        gz = f"{r['gzip_original']}→{r['gzip_compacto']}"
+        print(
+            f"{r['grafico']:<32}{r['bytes_original']:>10}"
+            f"{r['bytes_compacto']:>10}{razao:>7.1f}x{gz:>14}"
+        )
+
+    total_original = sum(r["bytes_original"] for r in results)
+    total_compacto = sum(r["bytes_compacto"] for r in results)
+    if total_compacto:
+        print(
+            f"{'Total':<32}{total_original:>10}{total_compacto:>10}"
+            f"{total_original / total_compacto:>7.1f}x"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
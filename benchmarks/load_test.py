@@ -0,0 +1,214 @@
+"""
+Teste de carga com sessões simultâneas do dashboard.
+
+Cada sessão simulada é um ``AppTest`` do Streamlit executando o ``app.py``
+(``main()``) em uma thread própria, todas no mesmo processo, como no
+servidor: caches compartilhados e um único interpretador. As sessões
+repetem um roteiro de navegação e mudanças de filtro (rede, ano escolar e
+município) e cada reexecução tem a latência medida.
+
+Para cada quantidade de sessões são informados vazão (reexecuções/s), os
+quantis p50/p95/p99 da latência e o crescimento da memória residente do
+processo (total e por sessão).
+
+Uso:
+    python benchmarks/load_test.py [--sessoes 1 2 4 8] [--ciclos 2]
+        [--data-path dados] [--json resultados.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+# Fora do servidor o Streamlit avisa a cada cache criado
+streamlit.logger.set_log_level("error")
+
+from src.utils import settings
+from src.utils.metrics import resident_memory_bytes
+
+APP = ROOT / "app.py"
+
+PAGINA_INICIAL = "🏠 Página Inicial"
+VISAO_GERAL = "📊 Visão Geral"
+IDEB = "🎯 Análise IDEB"
+MATRICULAS = "👥 Análise de Matrículas"
+RENDIMENTO = "📈 Rendimento Escolar"
+
+
+def _selectbox(app: AppTest, label: str):
+    """Selectbox da área principal pelo rótulo."""
+    for widget in app.main.selectbox:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"Filtro não encontrado: {label}")
+
+
+def _navegar(pagina: str):
+    return lambda app, rng: app.sidebar.radio[0].set_value(pagina)
+
+
+def _rede(app: AppTest, rng: random.Random):
+    widget = app.sidebar.selectbox[0]
+    return widget.set_value(rng.choice(widget.options))
+
+
+def _filtro(label: str, todos: bool = False):
+    """Escolhe uma opção do filtro (a primeira, "Todos", se ``todos``)."""
+
+    def action(app: AppTest, rng: random.Random):
+        widget = _selectbox(app, label)
+        return widget.set_value(
+            widget.options[0] if todos else rng.choice(widget.options)
+        )
+
+    return action
+
+
+# Roteiro de cada ciclo: (nome da ação, ação)
+ROTEIRO = [
+    ("rede", _rede),
+    ("visao_geral", _navegar(VISAO_GERAL)),
+    ("ideb", _navegar(IDEB)),
+    ("ideb.municipio", _filtro("Selecione o Município:")),
+    ("matriculas", _navegar(MATRICULAS)),
+    ("matriculas.ano", _filtro("Ano Escolar:")),
+    ("matriculas.municipio", _filtro("Município:")),
+    ("matriculas.municipio_todos", _filtro("Município:", todos=True)),
+    ("rendimento", _navegar(RENDIMENTO)),
+    ("rendimento.rede", _filtro("Rede de Ensino:")),
+    ("rendimento.ano", _filtro("Ano Escolar:")),
+    ("inicio", _navegar(PAGINA_INICIAL)),
+]
+
+
+def run_session(seed: int, ciclos: int, timeout: float, results: list, errors: list):
+    """Executa o roteiro de uma sessão e acrescenta as latências (s)."""
+    rng = random.Random(seed)
+    try:
+        app = AppTest.from_file(str(APP), default_timeout=timeout)
+        inicio = time.perf_counter()
+        app.run()
+        results.append(("inicial", time.perf_counter() - inicio))
+
+        for _ in range(ciclos):
+            for nome, action in ROTEIRO:
+                widget = action(app, rng)
+                inicio = time.perf_counter()
+                widget.run()
+                results.append((nome, time.perf_counter() - inicio))
+                if app.exception:
+                    raise RuntimeError(f"{nome}: {app.exception[0].message}")
+    except Exception as e:  # noqa: BLE001 - reportado ao final
+        errors.append(f"sessão {seed}: {e}")
+
+
+def run_level(sessoes: int, ciclos: int, timeout: float, seed: int) -> dict:
+    """Executa ``sessoes`` sessões simultâneas e resume as medições."""
+    gc.collect()
+    memoria_inicial = resident_memory_bytes()
+
+    results, errors = [], []
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(seed + i, ciclos, timeout, results, errors),
+            name=f"sessao-{i}",
+        )
+        for i in range(sessoes)
+    ]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    gc.collect()
+    memoria_final = resident_memory_bytes()
+    crescimento = np.nan if memoria_inicial is None else memoria_final - memoria_inicial
+    latencias = np.array([s for _, s in results]) * 1000
+    p50, p95, p99 = (
+        np.percentile(latencias, [50, 95, 99]) if len(latencias) else (np.nan,) * 3
+    )
+    por_acao = {}
+    for nome, s in results:
+        por_acao.setdefault(nome, []).append(s * 1000)
+
+    return {
+        "sessoes": sessoes,
+        "reexecucoes": len(results),
+        "duracao_s": round(duracao, 3),
+        "vazao_por_s": round(len(results) / duracao, 2),
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "memoria_mb": round(crescimento / 2**20, 1),
+        "memoria_por_sessao_mb": round(crescimento / sessoes / 2**20, 2),
+        "p50_por_acao_ms": {
+            nome: round(float(np.median(ms)), 1) for nome, ms in por_acao.items()
+        },
+        "erros": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ciclos", type=int, default=2, help="Ciclos do roteiro")
+    parser.add_argument("--data-path", help="Pasta com os CSVs (padrão: database)")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--sem-aquecimento",
+        action="store_true",
+        help="Não executa uma sessão antes das medições (inclui caches frios)",
+    )
+    parser.add_argument("--json", help="Arquivo para salvar os resultados")
+    args = parser.parse_args()
+
+    if args.data_path:
+        settings.DATA_PATH = str(Path(args.data_path).resolve())
+    # O app usa caminhos relativos à raiz do projeto
+    os.chdir(ROOT)
+
+    if not args.sem_aquecimento:
+        print("Aquecendo caches...", flush=True)
+        run_level(1, 1, args.timeout, args.seed)
+
+    niveis = []
+    for sessoes in args.sessoes:
+        print(f"{sessoes} sessão(ões) simultânea(s)...", flush=True)
+        niveis.append(run_level(sessoes, args.ciclos, args.timeout, args.seed))
+
+    print(
+        f"\n{'Sessões':>8}{'Reexec.':>9}{'Vazão/s':>9}{'p50':>9}{'p95':>9}"
+        f"{'p99':>9}{'Mem. MB':>9}{'MB/sessão':>11}"
+    )
+    for n in niveis:
+        print(
+            f"{n['sessoes']:>8}{n['reexecucoes']:>9}{n['vazao_por_s']:>9.1f}"
+            f"{n['p50_ms']:>9.0f}{n['p95_ms']:>9.0f}{n['p99_ms']:>9.0f}"
+            f"{n['memoria_mb']:>9.1f}{n['memoria_por_sessao_mb']:>11.2f}"
+        )
+        for erro in n["erros"]:
+            print(f"   ⚠️ {erro}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(niveis, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
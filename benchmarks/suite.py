@@ -0,0 +1,381 @@
+"""
+Suíte de benchmarks: carregamento, agregações, renderização e ETL.
+
+Mede, em 1×, 10× e 100× o tamanho atual dos dados:
+
+- ``DataLoader.load_*`` com o cache vazio (leitura dos CSVs);
+- ``get_summary_stats`` e ``filter_data_by_municipio`` com as tabelas já
+  carregadas;
+- cada ``render_*`` das páginas sob o ``AppTest`` do Streamlit (sem
+  navegador), na primeira execução (caches vazios) e nas seguintes;
+- as etapas do ``data_cleaning_script.py`` sobre arquivos brutos sintéticos
+  derivados da pasta ``database``.
+
+Os dados escalados replicam os municípios com novos códigos IBGE e nomes.
+Os resultados são gravados em JSON e comparados com uma linha de base salva,
+apontando as medições mais lentas que a tolerância.
+
+Uso:
+    python benchmarks/suite.py [--escalas 1 10 100] [--repeticoes 5]
+        [--json resultados.json] [--baseline base.json] [--salvar-baseline]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "data_cleaning"))
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+# Fora do servidor o Streamlit avisa a cada cache criado
+streamlit.logger.set_log_level("error")
+
+import data_cleaning_script as etl
+from src.data.data_loader import DATA_FILES, DataLoader
+from src.utils.figure_cache import figure_cache
+
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+
+# Página -> (módulo, função de renderização)
+PAGES = {
+    "homepage": ("src.components.homepage", "render_homepage"),
+    "overview": ("src.components.overview", "render_overview"),
+    "ideb": ("src.components.ideb", "render_ideb_analysis"),
+    "matriculas": ("src.components.matriculas", "render_matriculas_analysis"),
+    "rendimento": ("src.components.rendimento", "render_rendimento_analysis"),
+}
+
+LOADERS = ["load_ideb_data", "load_microdados", "load_dados_serie", "load_cities"]
+
+# Códigos das cópias: 3200102 -> 13200102, 23200102, ...
+CODE_OFFSET = 10_000_000
+
+
+def clear_caches():
+    """Esvazia os caches de dados, recursos e gráficos do processo."""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    figure_cache.clear()
+
+
+# ------------------------------
+# Dados escalados
+# ------------------------------
+def _replicate(df: pd.DataFrame, code: str, name: str, factor: int) -> pd.DataFrame:
+    """Repete as linhas ``factor`` vezes com códigos e nomes novos."""
+    copies = []
+    for k in range(factor):
+        copy = df.copy()
+        if k:
+            copy[code] = copy[code] + k * CODE_OFFSET
+            copy[name] = copy[name] + f" ({k + 1})"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def scale_database(source: Path, target: Path, factor: int) -> Path:
+    """
+    Grava em ``target`` os CSVs de ``source`` com ``factor`` vezes mais
+    municípios (cada cópia mantém a SRE do município original).
+    """
+    target.mkdir(parents=True, exist_ok=True)
+    for name, (file_name, sep) in DATA_FILES.items():
+        df = pd.read_csv(source / file_name, sep=sep)
+        if name == "cities":
+            df = _replicate(df, "ibge_code", "municipio", factor)
+        else:
+            df = _replicate(df, "CO_MUNICIPIO", "NO_MUNICIPIO", factor)
+        df.to_csv(target / file_name, sep=sep, index=False)
+    return target
+
+
+def raw_sources(data_path: Path, escolas: int = 3) -> dict:
+    """
+    Monta entradas brutas no formato do INEP a partir dos CSVs finais.
+
+    Returns:
+        Dicionário com os DataFrames brutos (tudo texto, como na leitura do
+        script) de IDEB, microdados (``escolas`` escolas por município+rede)
+        e rendimento
+    """
+    ideb = pd.read_csv(data_path / "ideb_final.csv", sep=";")
+    micro = pd.read_csv(data_path / "microdados_final.csv", sep=";")
+    serie = pd.read_csv(data_path / "dados_por_serie.csv", sep=";")
+    keys = ["CO_MUNICIPIO", "NO_MUNICIPIO", "SG_UF", "REDE"]
+
+    # IDEB: inclui as linhas da rede pública, descartadas pelo filtro; as
+    # edições ausentes do CSV final ficam com "-", como nas planilhas do INEP
+    publica = ideb.drop_duplicates("CO_MUNICIPIO").assign(REDE="Pública")
+    df_ideb = pd.concat([ideb, publica], ignore_index=True).reindex(
+        columns=etl.COLUNAS_IDEB
+    )
+    df_ideb = df_ideb.fillna("-").astype(str).astype(object)
+
+    # Microdados: matrículas por série divididas entre as escolas
+    wide = micro.pivot_table(
+        index=keys, columns="ANO_ESCOLAR", values="QT_MATRICULAS", aggfunc="sum"
+    ).fillna(0)
+    wide.columns = [f"QT_MAT_FUND_AF_{ano}" for ano in wide.columns]
+    wide = wide.reset_index()
+    escolas_df = wide.loc[wide.index.repeat(escolas)].reset_index(drop=True)
+    for c in etl.COLUNAS_MATRICULAS:
+        escolas_df[c] = (escolas_df[c] // escolas).astype(int)
+    escolas_df["TP_DEPENDENCIA"] = np.where(escolas_df["REDE"] == "Estadual", "2", "3")
+    escolas_df["NU_ANO_CENSO"] = "2023"
+    df_micro = escolas_df[etl.COLUNAS_MICRODADOS].astype(str).astype(object)
+
+    # Rendimento: taxas percentuais por série em colunas
+    taxas = {"1": "TAXA_APROVACAO", "2": "TAXA_REPROVACAO", "3": "TAXA_EVASAO"}
+    rend = serie.drop_duplicates(keys)[keys].set_index(keys)
+    for prefixo, coluna in taxas.items():
+        pivot = serie.pivot_table(index=keys, columns="ANO_ESCOLAR", values=coluna)
+        for ano in pivot.columns:
+            rend[f"{prefixo}_CAT_FUN_0{ano}"] = (pivot[ano] * 100).round(1)
+    rend = rend.reset_index().rename(columns={"REDE": "NO_DEPENDENCIA"})
+    rend["NO_CATEGORIA"] = "Total"
+    rend["NU_ANO_CENSO"] = "2023"
+    df_rend = rend[etl.COLUNAS_RENDIMENTO].astype(str).astype(object)
+
+    return {"ideb": df_ideb, "microdados": df_micro, "rendimento": df_rend}
+
+
+# ------------------------------
+# Medições
+# ------------------------------
+class Timings:
+    """Tempos (ms) acumulados por (nome, escala)."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, name: str, scale: int, seconds: float):
+        self.samples.setdefault((name, scale), []).append(seconds * 1000)
+
+    def measure(self, name: str, scale: int, func, *args):
+        """Executa ``func`` uma vez, registra o tempo e retorna o resultado."""
+        inicio = time.perf_counter()
+        result = func(*args)
+        self.add(name, scale, time.perf_counter() - inicio)
+        return result
+
+    def summary(self) -> list:
+        return [
+            {
+                "nome": name,
+                "escala": scale,
+                "mediana_ms": round(statistics.median(ms), 3),
+                "min_ms": round(min(ms), 3),
+                "execucoes": len(ms),
+            }
+            for (name, scale), ms in self.samples.items()
+        ]
+
+
+def bench_loaders(timings: Timings, data_path: Path, scale: int, repeat: int):
+    """Carregamento com cache vazio, estatísticas e filtro por município."""
+    for _ in range(repeat):
+        clear_caches()
+        data_loader = DataLoader(str(data_path))
+        for loader in LOADERS:
+            timings.measure(f"loader.{loader}", scale, getattr(data_loader, loader))
+
+    # Com as tabelas em cache: mede apenas o processamento
+    data_loader = DataLoader(str(data_path))
+    municipio = data_loader.get_municipios_list()[0]
+    for _ in range(repeat):
+        timings.measure(
+            "agregacao.get_summary_stats", scale, data_loader.get_summary_stats
+        )
+        timings.measure(
+            "agregacao.filter_data_by_municipio",
+            scale,
+            data_loader.filter_data_by_municipio,
+            municipio,
+        )
+
+
+def _render_page(data_path, module_name, function_name, rede):
+    """Script do AppTest: renderiza uma página isolada."""
+    import importlib
+
+    from src.data.data_loader import DataLoader
+
+    module = importlib.import_module(module_name)
+    getattr(module, function_name)(DataLoader(data_path), rede)
+
+
+def bench_render(timings: Timings, data_path: Path, scale: int, repeat: int):
+    """Renderização de cada página: primeira execução e execuções seguintes."""
+    clear_caches()
+    for page, (module_name, function_name) in PAGES.items():
+        for run in range(repeat + 1):
+            app = AppTest.from_function(
+                _render_page,
+                default_timeout=600,
+                args=(str(data_path), module_name, function_name, "Estadual"),
+            )
+            inicio = time.perf_counter()
+            app.run()
+            elapsed = time.perf_counter() - inicio
+            if app.exception:
+                raise RuntimeError(f"{page}: {app.exception[0].message}")
+            name = f"render.{page}" + (".frio" if run == 0 else "")
+            timings.add(name, scale, elapsed)
+
+
+def bench_etl(timings: Timings, data_path: Path, scale: int, repeat: int):
+    """Etapas do script de limpeza sobre entradas brutas sintéticas."""
+    raw = raw_sources(data_path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "microdados.csv"
+        raw["microdados"].to_csv(csv_path, sep=";", index=False, encoding="latin1")
+
+        # As etapas imprimem o progresso; a saída é descartada
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeat):
+                timings.measure(
+                    "etl.leitura_microdados", scale, etl.read_microdados, csv_path
+                )
+
+                # As etapas alteram as entradas: cada repetição usa cópias
+                sources = [raw[k].copy() for k in ("ideb", "microdados", "rendimento")]
+                sources = timings.measure(
+                    "etl.conversao_tipos", scale, etl.convert_types, *sources
+                )
+                filtered = timings.measure(
+                    "etl.filtro_uf", scale, etl.filter_uf, *sources
+                )
+                by_year = timings.measure(
+                    "etl.reestruturacao", scale, etl.reshape_by_year, *filtered
+                )
+                merged = timings.measure(
+                    "etl.merge", scale, etl.merge_by_year, *by_year
+                )
+                merged = timings.measure("etl.kpis", scale, etl.compute_kpis, merged)
+                final = timings.measure("etl.finalizacao", scale, etl.finalize, merged)
+                timings.measure(
+                    "etl.salvamento",
+                    scale,
+                    etl.save_outputs,
+                    final,
+                    by_year[0],
+                    filtered[0],
+                    tmp,
+                )
+
+
+GROUPS = {
+    "loaders": bench_loaders,
+    "render": bench_render,
+    "etl": bench_etl,
+}
+
+
+# ------------------------------
+# Linha de base
+# ------------------------------
+def compare(results: list, baseline: list, tolerance: float, min_ms: float) -> list:
+    """
+    Compara as medianas com a linha de base.
+
+    Uma medição é regressão quando fica mais lenta que a base em mais de
+    ``tolerance`` (fração) e em mais de ``min_ms`` milissegundos.
+    """
+    base = {(r["nome"], r["escala"]): r for r in baseline}
+    for r in results:
+        ref = base.get((r["nome"], r["escala"]))
+        if ref is None:
+            continue
+        r["base_ms"] = ref["mediana_ms"]
+        r["variacao"] = round(r["mediana_ms"] / ref["mediana_ms"] - 1, 4)
+        r["regressao"] = (
+            r["mediana_ms"] > ref["mediana_ms"] * (1 + tolerance)
+            and r["mediana_ms"] - ref["mediana_ms"] > min_ms
+        )
+    return [r for r in results if r.get("regressao")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-path", default=str(ROOT / "database"))
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument(
+        "--grupos", nargs="+", choices=list(GROUPS), default=list(GROUPS)
+    )
+    parser.add_argument("--json", help="Arquivo para salvar os resultados")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument(
+        "--salvar-baseline",
+        action="store_true",
+        help="Grava os resultados como nova linha de base",
+    )
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    parser.add_argument("--min-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    timings = Timings()
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.escalas:
+            data_path = scale_database(
+                Path(args.data_path), Path(tmp) / f"x{scale}", scale
+            )
+            for group in args.grupos:
+                print(f"Escala {scale}×: {group}...", flush=True)
+                GROUPS[group](timings, data_path, scale, args.repeticoes)
+    clear_caches()
+
+    results = timings.summary()
+    baseline_path = Path(args.baseline)
+    regressions = []
+    if baseline_path.exists() and not args.salvar_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        regressions = compare(
+            results, baseline["resultados"], args.tolerancia, args.min_ms
+        )
+
+    print(f"\n{'Medição':<40}{'Escala':>7}{'Mediana':>12}{'Base':>12}{'Var.':>9}")
+    for r in results:
+        base = f"{r['base_ms']:.1f}" if "base_ms" in r else "-"
+        variacao = f"{r['variacao']:+.0%}" if "variacao" in r else ""
+        alerta = "  ⚠️ regressão" if r.get("regressao") else ""
+        print(
+            f"{r['nome']:<40}{r['escala']:>6}×{r['mediana_ms']:>10.1f}ms"
+            f"{base:>12}{variacao:>9}{alerta}"
+        )
+
+    report = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "streamlit": st.__version__,
+        "repeticoes": args.repeticoes,
+        "resultados": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.salvar_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nLinha de base salva em {baseline_path}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regressão(ões) acima de {args.tolerancia:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
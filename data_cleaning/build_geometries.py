@@ -0,0 +1,313 @@
+"""
+Gera as malhas municipais simplificadas usadas nos mapas do dashboard.
+
+Lê a malha dos municípios de cada UF (GeoJSON da API de malhas do IBGE, ou
+arquivos locais), simplifica as fronteiras em cada nível de
+``src/data/geometries.NIVEIS`` e grava
+``static/geo/municipios_<UF>_<nível>.json``.
+
+A simplificação preserva a topologia entre vizinhos: as coordenadas são
+quantizadas em uma grade de 1e-5 grau (~1 m), os contornos são cortados nos
+vértices em que muda o par de municípios que compartilham a fronteira e
+cada trecho é simplificado (Douglas-Peucker) sempre no mesmo sentido. Os
+dois municípios de uma divisa recebem os mesmos vértices, sem frestas nem
+sobreposições no mapa. Os anéis externos são gravados no sentido horário,
+o esperado pelo ``d3-geo`` do plotly.js.
+
+Uso:
+    python data_cleaning/build_geometries.py [--ufs ES]
+        [--entrada malha_es.json ...] [--saida static/geo]
+"""
+
+import argparse
+import json
+import sys
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_synthetic_data import UFS
+from src.data.geometries import GEO_DIR, NIVEIS
+
+IBGE_MALHAS = (
+    "https://servicodados.ibge.gov.br/api/v3/malhas/estados/{uf}"
+    "?formato=application/vnd.geo+json&qualidade=maxima&intrarregiao=municipio"
+)
+RAW_DIR = Path(__file__).resolve().parent / "raw_data" / "malhas"
+
+# Grade de quantização (unidades por grau)
+ESCALA = 100_000
+
+# Propriedades com o código IBGE do município, conforme a fonte
+_CAMPOS_CODIGO = ("codarea", "CD_MUN", "CD_GEOCMU", "CO_MUNICIPIO", "id")
+
+
+def parse_args():
+    """Lê as opções da linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ufs", nargs="+", default=["ES"], help="UFs (padrão: ES)")
+    parser.add_argument(
+        "--entrada",
+        nargs="+",
+        help="GeoJSON locais, na ordem de --ufs (padrão: baixa do IBGE uma vez)",
+    )
+    parser.add_argument("--saida", default=str(GEO_DIR), help="Pasta das malhas")
+    return parser.parse_args()
+
+
+def load_source(uf: str, entrada=None) -> dict:
+    """
+    GeoJSON de origem da UF.
+
+    Sem arquivo informado, usa a cópia em ``raw_data/malhas`` ou baixa da
+    API do IBGE e guarda a cópia para as próximas execuções.
+    """
+    if entrada is not None:
+        return json.loads(Path(entrada).read_text(encoding="utf-8"))
+    copia = RAW_DIR / f"municipios_{uf}.json"
+    if not copia.exists():
+        print(f"⬇️  Baixando a malha de {uf} do IBGE...")
+        with urllib.request.urlopen(IBGE_MALHAS.format(uf=uf), timeout=120) as r:
+            conteudo = r.read()
+        RAW_DIR.mkdir(parents=True, exist_ok=True)
+        copia.write_bytes(conteudo)
+    return json.loads(copia.read_text(encoding="utf-8"))
+
+
+def _codigo(feature: dict) -> str:
+    propriedades = feature.get("properties") or {}
+    for campo in _CAMPOS_CODIGO:
+        if propriedades.get(campo) not in (None, ""):
+            return str(int(float(propriedades[campo])))
+    if feature.get("id") is not None:
+        return str(int(float(feature["id"])))
+    raise ValueError(f"Feição sem código IBGE: {sorted(propriedades)}")
+
+
+def _quantizar(anel) -> np.ndarray:
+    """Anel em inteiros da grade, sem o ponto de fechamento nem repetições."""
+    pontos = np.rint(np.asarray(anel, dtype=np.float64)[:, :2] * ESCALA)
+    pontos = pontos.astype(np.int64)
+    repetido = np.all(pontos == np.roll(pontos, 1, axis=0), axis=1)
+    return pontos[~repetido]
+
+
+def read_features(geojson: dict) -> dict:
+    """Código IBGE -> lista de polígonos (listas de anéis quantizados)."""
+    municipios = {}
+    for feature in geojson["features"]:
+        geometria = feature.get("geometry")
+        if not geometria:
+            continue
+        if geometria["type"] == "Polygon":
+            poligonos = [geometria["coordinates"]]
+        elif geometria["type"] == "MultiPolygon":
+            poligonos = geometria["coordinates"]
+        else:
+            continue
+        partes = municipios.setdefault(_codigo(feature), [])
+        for poligono in poligonos:
+            aneis = [_quantizar(anel) for anel in poligono]
+            if len(aneis[0]) >= 3:
+                partes.append([a for a in aneis if len(a) >= 3])
+    return municipios
+
+
+def fixed_vertices(aneis: list) -> tuple:
+    """
+    Identificadores dos vértices e vértices fixos de cada anel.
+
+    Cada aresta recebe a assinatura dos anéis que a contêm; um vértice é
+    fixo quando as arestas de chegada e de saída têm assinaturas diferentes
+    (início ou fim de uma divisa, encontro de três municípios).
+    """
+    tamanhos = np.array([len(a) for a in aneis])
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    _, ids = np.unique(np.concatenate(aneis), axis=0, return_inverse=True)
+    ids = ids.ravel().astype(np.int64)
+    anel_de = np.repeat(np.arange(len(aneis)), tamanhos)
+
+    # Próximo vértice de cada vértice dentro do próprio anel
+    posicao = np.arange(len(ids)) - inicios[anel_de]
+    proximo = inicios[anel_de] + (posicao + 1) % tamanhos[anel_de]
+    anterior = inicios[anel_de] + (posicao - 1) % tamanhos[anel_de]
+
+    n_pontos = int(ids.max()) + 1
+    a, b = ids, ids[proximo]
+    arestas = np.minimum(a, b) * n_pontos + np.maximum(a, b)
+    _, aresta_id = np.unique(arestas, return_inverse=True)
+    n_arestas = int(aresta_id.max()) + 1
+    menor = np.full(n_arestas, len(aneis))
+    maior = np.full(n_arestas, -1)
+    np.minimum.at(menor, aresta_id, anel_de)
+    np.maximum.at(maior, aresta_id, anel_de)
+    assinatura = (menor * len(aneis) + maior)[aresta_id]
+
+    fixos = assinatura != assinatura[anterior]
+    return (
+        [ids[s : s + n] for s, n in zip(inicios, tamanhos)],
+        [fixos[s : s + n] for s, n in zip(inicios, tamanhos)],
+    )
+
+
+def douglas_peucker(pontos: np.ndarray, tolerancia: float) -> np.ndarray:
+    """Máscara dos pontos mantidos (extremos sempre mantidos)."""
+    n = len(pontos)
+    manter = np.zeros(n, dtype=bool)
+    manter[0] = manter[-1] = True
+    pontos = pontos.astype(np.float64)
+    pilha = [(0, n - 1)]
+    while pilha:
+        i, j = pilha.pop()
+        if j <= i + 1:
+            continue
+        a, b = pontos[i], pontos[j]
+        trecho = pontos[i + 1 : j]
+        ab = b - a
+        comprimento = ab @ ab
+        if comprimento == 0:
+            distancias = np.hypot(*(trecho - a).T)
+        else:
+            # Distância ao segmento (não à reta), robusta a trechos em laço
+            t = np.clip((trecho - a) @ ab / comprimento, 0, 1)
+            distancias = np.hypot(*(trecho - a - t[:, None] * ab).T)
+        k = int(np.argmax(distancias))
+        if distancias[k] > tolerancia:
+            meio = i + 1 + k
+            manter[meio] = True
+            pilha.append((i, meio))
+            pilha.append((meio, j))
+    return manter
+
+
+def simplify_ring(
+    pontos: np.ndarray, ids: np.ndarray, fixos: np.ndarray, tolerancia: float
+) -> np.ndarray:
+    """Simplifica um anel trecho a trecho entre os vértices fixos."""
+    n = len(pontos)
+    cortes = np.flatnonzero(fixos)
+    if len(cortes) == 0:
+        # Anel sem divisas distintas: começa no vértice de menor id
+        cortes = np.array([int(np.argmin(ids))])
+    manter = np.zeros(n, dtype=bool)
+    manter[cortes] = True
+    for k, inicio in enumerate(cortes):
+        fim = cortes[(k + 1) % len(cortes)]
+        trecho = np.arange(inicio, inicio + ((fim - inicio) % n or n) + 1) % n
+        # Sentido canônico: o vizinho percorre o mesmo trecho ao contrário
+        primeiro, ultimo = ids[trecho[0]], ids[trecho[-1]]
+        if primeiro > ultimo or (
+            primeiro == ultimo and ids[trecho[1]] > ids[trecho[-2]]
+        ):
+            trecho = trecho[::-1]
+        manter[trecho[douglas_peucker(pontos[trecho], tolerancia)]] = True
+    return pontos[manter]
+
+
+def _area(anel: np.ndarray) -> float:
+    x, y = anel[:, 0].astype(np.float64), anel[:, 1].astype(np.float64)
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _fechar(anel: np.ndarray, externo: bool, casas: int) -> list:
+    """Anel em graus, arredondado, no sentido do d3-geo e fechado."""
+    coordenadas = np.round(anel / ESCALA, casas)
+    repetido = np.all(coordenadas == np.roll(coordenadas, 1, axis=0), axis=1)
+    coordenadas = coordenadas[~repetido]
+    if len(coordenadas) < 3:
+        return []
+    # Externo no sentido horário (área negativa), buracos no anti-horário
+    if (_area(coordenadas) < 0) != externo:
+        coordenadas = coordenadas[::-1]
+    return np.vstack([coordenadas, coordenadas[:1]]).tolist()
+
+
+def build_level(municipios: dict, topologia: dict, nivel: str) -> dict:
+    """FeatureCollection do nível, com só o código IBGE em cada feição."""
+    tolerancia, casas = NIVEIS[nivel]
+    tolerancia *= ESCALA
+    features = []
+    for codigo, poligonos in municipios.items():
+        # Polígono principal do município nunca é descartado
+        principal = max(
+            range(len(poligonos)), key=lambda i: abs(_area(poligonos[i][0]))
+        )
+        coordenadas = []
+        for p, poligono in enumerate(poligonos):
+            aneis = []
+            for r, anel in enumerate(poligono):
+                ids, fixos = topologia[(codigo, p, r)]
+                tol = tolerancia
+                while True:
+                    anel_fechado = _fechar(
+                        simplify_ring(anel, ids, fixos, tol), r == 0, casas
+                    )
+                    if anel_fechado or r > 0 or p != principal or tol < 1:
+                        break
+                    tol /= 4
+                if anel_fechado:
+                    aneis.append(anel_fechado)
+                elif r == 0:
+                    break
+            if aneis:
+                coordenadas.append(aneis)
+        if coordenadas:
+            features.append(
+                {
+                    "type": "Feature",
+                    "id": codigo,
+                    "properties": {},
+                    "geometry": {"type": "MultiPolygon", "coordinates": coordenadas},
+                }
+            )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def build_uf(uf: str, geojson: dict, saida: Path) -> dict:
+    """Grava as malhas da UF; retorna o tamanho em bytes de cada nível."""
+    prefixo = {sigla: str(codigo) for sigla, codigo, _ in UFS}.get(uf)
+    municipios = read_features(geojson)
+    if prefixo is not None:
+        municipios = {c: p for c, p in municipios.items() if c.startswith(prefixo)}
+    if not municipios:
+        raise ValueError(f"Nenhum município de {uf} na malha de origem")
+
+    chaves, aneis = [], []
+    for codigo, poligonos in municipios.items():
+        for p, poligono in enumerate(poligonos):
+            for r, anel in enumerate(poligono):
+                chaves.append((codigo, p, r))
+                aneis.append(anel)
+    ids, fixos = fixed_vertices(aneis)
+    topologia = dict(zip(chaves, zip(ids, fixos)))
+
+    saida.mkdir(parents=True, exist_ok=True)
+    tamanhos = {"vertices": sum(len(a) for a in aneis)}
+    for nivel in NIVEIS:
+        malha = build_level(municipios, topologia, nivel)
+        conteudo = json.dumps(malha, separators=(",", ":"))
+        (saida / f"municipios_{uf}_{nivel}.json").write_text(conteudo, encoding="utf-8")
+        tamanhos[nivel] = len(conteudo)
+    return tamanhos
+
+
+def main():
+    """Função principal."""
+    args = parse_args()
+    entradas = args.entrada or [None] * len(args.ufs)
+    if len(entradas) != len(args.ufs):
+        sys.exit("Informe um arquivo em --entrada para cada UF de --ufs")
+
+    for uf, entrada in zip(args.ufs, entradas):
+        tamanhos = build_uf(uf, load_source(uf, entrada), Path(args.saida))
+        niveis = ", ".join(f"{n} {tamanhos[n] / 1024:.0f} KB" for n in NIVEIS)
+        print(f"🗺️  {uf}: {tamanhos['vertices']:,} vértices na origem → {niveis}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+Gerador de dados sintéticos nos formatos do INEP e do dashboard.
+
+Gera, para um número configurável de UFs, municípios, anos do censo e
+escolas:
+
+- brutos: ``microdados_ed_basica_<ano>.csv`` (uma linha por escola, latin1,
+  separador ``;``), ``tx_rend_municipios_<ano>.xlsx`` e
+  ``divulgacao_anos_finais_municipios_2023.xlsx`` (mesmas abas e linhas de
+  título das planilhas do INEP);
+- finais: ``ideb_final.csv``, ``microdados_final.csv``,
+  ``dados_por_serie.csv`` e ``cities.csv``, produzidos pelas etapas do
+  ``data_cleaning_script.py`` a partir dos brutos do último ano.
+
+As distribuições imitam os dados reais: porte dos municípios log-normal,
+divisão das matrículas entre redes e escolas, redes ausentes em parte dos
+municípios, escolas privadas e federais (descartadas na limpeza), taxas de
+rendimento e IDEB correlacionados com uma qualidade latente do município.
+
+Uso:
+    python data_cleaning/generate_synthetic_data.py --saida dados_sinteticos
+        [--ufs 27] [--municipios 206] [--anos 2021 2022 2023]
+        [--escolas 6] [--seed 42] [--sem-planilhas]
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import data_cleaning_script as etl
+from src.data.manifest import write_manifest
+
+# UF, código IBGE e região (ES primeiro: é a UF do dashboard)
+UFS = [
+    ("ES", 32, "Sudeste"),
+    ("MG", 31, "Sudeste"),
+    ("RJ", 33, "Sudeste"),
+    ("SP", 35, "Sudeste"),
+    ("BA", 29, "Nordeste"),
+    ("PR", 41, "Sul"),
+    ("RS", 43, "Sul"),
+    ("SC", 42, "Sul"),
+    ("GO", 52, "Centro-Oeste"),
+    ("PE", 26, "Nordeste"),
+    ("CE", 23, "Nordeste"),
+    ("PA", 15, "Norte"),
+    ("MA", 21, "Nordeste"),
+    ("PB", 25, "Nordeste"),
+    ("PI", 22, "Nordeste"),
+    ("RN", 24, "Nordeste"),
+    ("AL", 27, "Nordeste"),
+    ("SE", 28, "Nordeste"),
+    ("MT", 51, "Centro-Oeste"),
+    ("MS", 50, "Centro-Oeste"),
+    ("DF", 53, "Centro-Oeste"),
+    ("TO", 17, "Norte"),
+    ("AM", 13, "Norte"),
+    ("RO", 11, "Norte"),
+    ("AC", 12, "Norte"),
+    ("AP", 16, "Norte"),
+    ("RR", 14, "Norte"),
+]
+
+# TP_DEPENDENCIA do Censo Escolar
+DEPENDENCIAS = {"1": "Federal", "2": "Estadual", "3": "Municipal", "4": "Privada"}
+
+# Matrículas relativas de cada série (6º ao 9º ano)
+PERFIL_SERIES = np.array([1.05, 1.0, 0.97, 0.93])
+
+# Reprovação/abandono relativos de cada série
+PERFIL_REPROVACAO = np.array([1.1, 1.05, 0.95, 0.9])
+
+MUNICIPIOS_POR_SRE = 7
+
+_PREFIXOS = ["", "", "", "São ", "Santa ", "Nova ", "Bom ", "Porto ", "Barra de "]
+_SILABAS = [
+    "A", "Ba", "Ca", "Cu", "Gua", "I", "Ja", "Ju", "Ma", "Mi", "Pa", "Pi",
+    "Ri", "Ta", "Ti", "U", "Ara", "Ita", "Mu", "Bo",
+]  # fmt: skip
+_SUFIXOS = [
+    "ré", "tiba", "çu", "rim", "nhém", "pé", "tinga", "lina", "polis",
+    "guaçu", "rana", "cema", "baí", "tuba", "randi",
+]  # fmt: skip
+
+
+def municipality_names(rng: np.random.Generator, n: int) -> list:
+    """Nomes de município únicos no estilo brasileiro."""
+    names, seen = [], set()
+    while len(names) < n:
+        name = (
+            rng.choice(_PREFIXOS)
+            + rng.choice(_SILABAS)
+            + "".join(rng.choice(_SILABAS).lower() for _ in range(rng.integers(0, 2)))
+            + rng.choice(_SUFIXOS)
+        )
+        if name in seen:
+            name = f"{name} do {rng.choice(['Norte', 'Sul', 'Leste', 'Oeste'])}"
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def generate_municipios(
+    rng: np.random.Generator, n_ufs: int, por_uf: int
+) -> pd.DataFrame:
+    """
+    Gera os municípios com SRE, porte e qualidade latente.
+
+    Returns:
+        DataFrame com CO_MUNICIPIO, NO_MUNICIPIO, SG_UF, CO_UF, NO_REGIAO,
+        SRE, PORTE (matrículas esperadas por série), PARTE_ESTADUAL,
+        QUALIDADE e as redes presentes (TEM_ESTADUAL, TEM_MUNICIPAL)
+    """
+    ufs = UFS[:n_ufs]
+    n = len(ufs) * por_uf
+    uf_idx = np.repeat(np.arange(len(ufs)), por_uf)
+    seq = np.tile(np.arange(por_uf), len(ufs))
+
+    df = pd.DataFrame(
+        {
+            "CO_MUNICIPIO": np.array([u[1] for u in ufs])[uf_idx] * 100_000
+            + (seq + 1) * 10,
+            "NO_MUNICIPIO": municipality_names(rng, n),
+            "SG_UF": np.array([u[0] for u in ufs])[uf_idx],
+            "CO_UF": np.array([u[1] for u in ufs])[uf_idx],
+            "NO_REGIAO": np.array([u[2] for u in ufs])[uf_idx],
+        }
+    )
+
+    # SRE: grupos de municípios vizinhos, com o nome do primeiro
+    sre_seq = seq // MUNICIPIOS_POR_SRE
+    first = df.groupby([uf_idx, sre_seq])["NO_MUNICIPIO"].transform("first")
+    df["SRE"] = first.to_numpy()
+
+    df["PORTE"] = rng.lognormal(np.log(250), 1.1, n)
+    df["PARTE_ESTADUAL"] = rng.beta(2, 2, n)
+    df["QUALIDADE"] = rng.normal(0, 1, n)
+
+    # Parte dos municípios não tem uma das redes nos anos finais
+    sem_rede = rng.random(n) < 0.12
+    sem_estadual = sem_rede & (rng.random(n) < 0.4)
+    df["TEM_ESTADUAL"] = ~sem_estadual
+    df["TEM_MUNICIPAL"] = ~(sem_rede & ~sem_estadual)
+    return df
+
+
+def _split(rng: np.random.Generator, totals: np.ndarray, groups: np.ndarray):
+    """
+    Divide ``totals[g]`` entre as escolas de cada grupo (Dirichlet).
+
+    Args:
+        totals: Total de cada grupo, shape (grupos, séries)
+        groups: Grupo de cada escola (ordenado)
+
+    Returns:
+        Matrículas inteiras por escola, shape (escolas, séries)
+    """
+    weights = rng.gamma(2.0, size=len(groups))
+    shares = weights / np.bincount(groups, weights=weights)[groups]
+    values = np.floor(shares[:, None] * totals[groups]).astype(np.int64)
+
+    # O resto do arredondamento vai para a primeira escola do grupo
+    first = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    rest = totals - np.add.reduceat(values, first, axis=0)
+    values[first] += rest.astype(np.int64)
+    return values
+
+
+def generate_microdados(
+    rng: np.random.Generator, municipios: pd.DataFrame, ano: int, escolas: float
+) -> pd.DataFrame:
+    """Gera os microdados do censo de um ano (uma linha por escola)."""
+    n = len(municipios)
+    porte = municipios["PORTE"].to_numpy() * rng.lognormal(0, 0.03, n)
+    parte = municipios["PARTE_ESTADUAL"].to_numpy()
+    partes = {
+        "1": np.where(rng.random(n) < 0.05, 0.04, 0.0),
+        "2": np.where(municipios["TEM_ESTADUAL"], parte, 0.0),
+        "3": np.where(municipios["TEM_MUNICIPAL"], 1 - parte, 0.0),
+        "4": rng.beta(1.2, 8, n),
+    }
+    # Redes públicas ausentes passam a parte para a outra rede
+    publica = partes["2"] + partes["3"]
+    partes["2"] = partes["2"] / publica
+    partes["3"] = partes["3"] / publica
+
+    frames = []
+    for tp, parte_rede in partes.items():
+        ativos = np.flatnonzero(parte_rede > 0)
+        if not len(ativos):
+            continue
+        series = porte[ativos, None] * parte_rede[ativos, None] * PERFIL_SERIES
+        series = rng.poisson(series * rng.lognormal(0, 0.05, series.shape))
+        n_escolas = 1 + rng.poisson(escolas * parte_rede[ativos] * 0.8)
+        grupos = np.repeat(np.arange(len(ativos)), n_escolas)
+        valores = _split(rng, series, grupos)
+        df = municipios.iloc[ativos[grupos]][
+            ["NO_REGIAO", "SG_UF", "CO_UF", "NO_MUNICIPIO", "CO_MUNICIPIO"]
+        ].reset_index(drop=True)
+        df["TP_DEPENDENCIA"] = tp
+        for i, c in enumerate(etl.COLUNAS_MATRICULAS):
+            df[c] = valores[:, i]
+        frames.append(df)
+
+    # Escolas só com anos iniciais: colunas dos anos finais em branco
+    iniciais = rng.choice(n, size=int(n * escolas * 0.4))
+    df = municipios.iloc[iniciais][
+        ["NO_REGIAO", "SG_UF", "CO_UF", "NO_MUNICIPIO", "CO_MUNICIPIO"]
+    ].reset_index(drop=True)
+    df["TP_DEPENDENCIA"] = rng.choice(["3", "4"], size=len(df), p=[0.8, 0.2])
+    frames.append(df)
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df.sort_values(["CO_MUNICIPIO", "TP_DEPENDENCIA"], kind="stable")
+    df.insert(0, "NU_ANO_CENSO", ano)
+    df["CO_ENTIDADE"] = df["CO_UF"] * 1_000_000 + np.arange(1, len(df) + 1)
+    df["NO_ENTIDADE"] = "ESCOLA " + (df.groupby("CO_MUNICIPIO").cumcount() + 1).map(
+        "{:03d}".format
+    )
+    df["QT_MAT_FUND_AF"] = df[etl.COLUNAS_MATRICULAS].sum(axis=1, min_count=1)
+    for c in etl.COLUNAS_MATRICULAS + ["QT_MAT_FUND_AF"]:
+        df[c] = df[c].astype("Int64")
+
+    return df[
+        [
+            "NU_ANO_CENSO",
+            "NO_REGIAO",
+            "SG_UF",
+            "CO_UF",
+            "NO_MUNICIPIO",
+            "CO_MUNICIPIO",
+            "NO_ENTIDADE",
+            "CO_ENTIDADE",
+            "TP_DEPENDENCIA",
+            "QT_MAT_FUND_AF",
+            *etl.COLUNAS_MATRICULAS,
+        ]
+    ].reset_index(drop=True)
+
+
+def _rates(rng: np.random.Generator, qualidade: np.ndarray, n_series: int = 4):
+    """Taxas percentuais (aprovação, reprovação, abandono) por série."""
+    n = len(qualidade)
+    falha = rng.beta(2, 40, n) * np.exp(-0.3 * qualidade)
+    falha = falha[:, None] * PERFIL_REPROVACAO[:n_series]
+    falha = np.clip(falha * rng.lognormal(0, 0.15, falha.shape), 0, 0.4)
+    abandono = falha * rng.beta(1, 6, (n, 1))
+
+    # Redes pequenas costumam ter 100% de aprovação
+    falha[rng.random(n) < 0.05] = 0
+    abandono = np.minimum(abandono, falha)
+
+    aprovacao = np.round(100 * (1 - falha), 1)
+    evasao = np.round(100 * abandono, 1)
+    reprovacao = np.round(100 - aprovacao - evasao, 1).clip(0)
+    return aprovacao, reprovacao, evasao
+
+
+def generate_rendimento(
+    rng: np.random.Generator, municipios: pd.DataFrame, microdados: pd.DataFrame
+) -> pd.DataFrame:
+    """Gera a planilha de taxas de rendimento de um ano (INEP)."""
+    ano = int(microdados["NU_ANO_CENSO"].iloc[0])
+    publicas = microdados[microdados["TP_DEPENDENCIA"].isin(["2", "3"])]
+    redes = (
+        publicas.groupby(["CO_MUNICIPIO", "TP_DEPENDENCIA"])["QT_MAT_FUND_AF"]
+        .sum()
+        .reset_index()
+    )
+    redes = redes[redes["QT_MAT_FUND_AF"] > 0]
+    base = municipios.set_index("CO_MUNICIPIO").loc[redes["CO_MUNICIPIO"]]
+    redes["NO_DEPENDENCIA"] = redes["TP_DEPENDENCIA"].map(DEPENDENCIAS)
+
+    qualidade = base["QUALIDADE"].to_numpy() + np.where(
+        redes["TP_DEPENDENCIA"] == "2", 0.2, 0.0
+    )
+
+    frames = []
+    for categoria, ruido in [("Total", 0.0), ("Urbana", -0.1), ("Rural", 0.4)]:
+        q = qualidade if not ruido else qualidade + rng.normal(ruido, 0.3, len(redes))
+        aprovacao, reprovacao, evasao = _rates(rng, q)
+        df = pd.DataFrame(
+            {
+                "NU_ANO_CENSO": ano,
+                "NO_REGIAO": base["NO_REGIAO"].to_numpy(),
+                "SG_UF": base["SG_UF"].to_numpy(),
+                "CO_MUNICIPIO": redes["CO_MUNICIPIO"].to_numpy(),
+                "NO_MUNICIPIO": base["NO_MUNICIPIO"].to_numpy(),
+                "NO_CATEGORIA": categoria,
+                "NO_DEPENDENCIA": redes["NO_DEPENDENCIA"].to_numpy(),
+            }
+        )
+        for prefixo, taxas in (("1", aprovacao), ("2", reprovacao), ("3", evasao)):
+            for i, ano_escolar in enumerate(etl.ANOS):
+                df[f"{prefixo}_CAT_FUN_0{ano_escolar}"] = taxas[:, i]
+        frames.append(df)
+
+    # Linhas da rede pública (média das redes), descartadas pela limpeza
+    total = frames[0]
+    publica = total.groupby(
+        ["NU_ANO_CENSO", "NO_REGIAO", "SG_UF", "CO_MUNICIPIO", "NO_MUNICIPIO"],
+        as_index=False,
+    )[etl.TAXA_COLS].mean()
+    publica[etl.TAXA_COLS] = publica[etl.TAXA_COLS].round(1)
+    publica["NO_CATEGORIA"] = "Total"
+    publica["NO_DEPENDENCIA"] = "Pública"
+    frames.append(publica[total.columns])
+
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values(
+        ["CO_MUNICIPIO", "NO_DEPENDENCIA", "NO_CATEGORIA"], kind="stable"
+    ).reset_index(drop=True)
+
+
+def generate_ideb(
+    rng: np.random.Generator, municipios: pd.DataFrame, rendimento: pd.DataFrame
+) -> pd.DataFrame:
+    """Gera a planilha de divulgação do IDEB 2023 (anos finais)."""
+    total = rendimento[rendimento["NO_CATEGORIA"] == "Total"]
+    base = municipios.set_index("CO_MUNICIPIO").loc[total["CO_MUNICIPIO"]]
+    n = len(total)
+
+    # Indicador de rendimento (aprovação média) e nota padronizada
+    aprovacao = total[[f"1_CAT_FUN_0{a}" for a in etl.ANOS]].mean(axis=1) / 100
+    nota = np.clip(
+        5.6 + 0.35 * base["QUALIDADE"].to_numpy() + rng.normal(0, 0.25, n), 2.5, 8.5
+    )
+    observado = np.round(nota * aprovacao.to_numpy(), 1)
+    projecao = np.round(np.clip(observado + rng.normal(0.25, 0.5, n), 2.0, 8.0), 1)
+
+    df = pd.DataFrame(
+        {
+            "SG_UF": base["SG_UF"].to_numpy(),
+            "CO_MUNICIPIO": total["CO_MUNICIPIO"].to_numpy(),
+            "NO_MUNICIPIO": base["NO_MUNICIPIO"].to_numpy(),
+            "REDE": total["NO_DEPENDENCIA"].to_numpy(),
+            "VL_INDICADOR_REND_2023": np.round(aprovacao.to_numpy(), 2),
+            "VL_NOTA_MEDIA_2023": np.round(nota, 2).astype(object),
+            "VL_OBSERVADO_2023": observado.astype(object),
+            "VL_PROJECAO_2021": projecao.astype(object),
+        }
+    )
+    # Redes sem participantes suficientes no SAEB aparecem com "-"
+    df.loc[rng.random(n) < 0.05, ["VL_NOTA_MEDIA_2023", "VL_OBSERVADO_2023"]] = "-"
+
+    # Edições anteriores: tendência de alta por edição, com ruído e mais
+    # lacunas nas edições antigas; metas crescentes até a de 2021
+    avanco = rng.normal(0.15, 0.1, n)
+    for ano in etl.EDICOES_IDEB[:-1]:
+        edicoes = (2023 - ano) / 2
+        valor = observado - avanco * edicoes + rng.normal(0, 0.2, n)
+        coluna = np.round(np.clip(valor, 1.0, 9.0), 1).astype(object)
+        coluna[rng.random(n) < 0.05 + 0.03 * edicoes] = "-"
+        df[f"VL_OBSERVADO_{ano}"] = coluna
+    passo = rng.uniform(0.15, 0.35, n)
+    for ano in etl.METAS_IDEB[:-1]:
+        meta = projecao - passo * (2021 - ano) / 2
+        df[f"VL_PROJECAO_{ano}"] = np.round(np.clip(meta, 1.0, 9.0), 1)
+
+    # Ordem da planilha do INEP: edições observadas e depois as metas
+    colunas = [c for c in df.columns if c not in etl.COLUNAS_VALORES_IDEB]
+    return df[colunas + etl.COLUNAS_VALORES_IDEB].reset_index(drop=True)
+
+
+def write_workbook(
+    df: pd.DataFrame, path: Path, sheet_name: str, title_rows: int, title: str
+):
+    """Grava uma planilha com ``title_rows`` linhas de título antes da tabela."""
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name=sheet_name, startrow=title_rows, index=False)
+        sheet = writer.sheets[sheet_name]
+        sheet.cell(row=1, column=1, value=title)
+        sheet.cell(row=2, column=1, value="Dados sintéticos - não oficiais")
+
+
+def _as_read(df: pd.DataFrame, usecols: list) -> pd.DataFrame:
+    """Reproduz a leitura do script (``usecols`` e ``dtype=object``)."""
+    df = df[[c for c in df.columns if c in usecols]]
+    return df.apply(lambda s: s.astype(str).astype(object).where(s.notna(), np.nan))
+
+
+def build_final(
+    ideb: pd.DataFrame,
+    microdados: pd.DataFrame,
+    rendimento: pd.DataFrame,
+    ufs: list,
+    output_dir: Path,
+):
+    """Executa as etapas da limpeza e grava os CSVs finais do dashboard."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        sources = etl.convert_types(
+            _as_read(ideb, etl.COLUNAS_IDEB),
+            microdados,
+            _as_read(rendimento, etl.COLUNAS_RENDIMENTO),
+        )
+        ideb_uf, micro_uf, rend_uf = etl.filter_uf(*sources, uf=ufs)
+        micro_ano, rates_ano, ideb_ano = etl.reshape_by_year(ideb_uf, micro_uf, rend_uf)
+        consolidado = etl.merge_by_year(micro_ano, rates_ano, ideb_ano)
+        final = etl.finalize(etl.compute_kpis(consolidado))
+        etl.save_outputs(final, micro_ano, ideb_uf, output_dir)
+    return final
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--saida", default="dados_sinteticos", help="Pasta de saída")
+    parser.add_argument("--ufs", type=int, default=1, help="Número de UFs (até 27)")
+    parser.add_argument("--municipios", type=int, default=78, help="Municípios por UF")
+    parser.add_argument("--anos", type=int, nargs="+", default=[2023])
+    parser.add_argument(
+        "--escolas", type=float, default=6, help="Média de escolas por município"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--sem-planilhas",
+        action="store_true",
+        help="Não grava as planilhas .xlsx do INEP (dispensa o openpyxl)",
+    )
+    args = parser.parse_args()
+
+    if not 1 <= args.ufs <= len(UFS):
+        parser.error(f"--ufs deve estar entre 1 e {len(UFS)}")
+    if not args.sem_planilhas and importlib.util.find_spec("openpyxl") is None:
+        parser.error("as planilhas exigem o openpyxl (ou use --sem-planilhas)")
+
+    rng = np.random.default_rng(args.seed)
+    saida = Path(args.saida)
+    brutos = saida / "raw_data"
+    brutos.mkdir(parents=True, exist_ok=True)
+
+    print("Gerando municípios...")
+    municipios = generate_municipios(rng, args.ufs, args.municipios)
+    ufs = sorted(municipios["SG_UF"].unique())
+
+    anos = sorted(args.anos)
+    for ano in anos:
+        print(f"Gerando censo {ano}...")
+        # Tendência de queda de matrículas de ~1% ao ano
+        tendencia = municipios.assign(
+            PORTE=municipios["PORTE"] * 0.99 ** (anos[-1] - ano)
+        )
+        microdados = generate_microdados(rng, tendencia, ano, args.escolas)
+        microdados.to_csv(
+            brutos / f"microdados_ed_basica_{ano}.csv",
+            sep=";",
+            index=False,
+            encoding="latin1",
+        )
+        rendimento = generate_rendimento(rng, municipios, microdados)
+        if not args.sem_planilhas:
+            write_workbook(
+                rendimento,
+                brutos / f"tx_rend_municipios_{ano}.xlsx",
+                "MUNICIPIOS ",
+                8,
+                f"Taxas de Rendimento Escolar {ano} - Municípios",
+            )
+
+    ideb = generate_ideb(rng, municipios, rendimento)
+    if not args.sem_planilhas:
+        write_workbook(
+            ideb,
+            brutos / "divulgacao_anos_finais_municipios_2023.xlsx",
+            "IDEB_AF_MUNICÍPIOS",
+            9,
+            "IDEB 2023 - Anos Finais do Ensino Fundamental - Municípios",
+        )
+
+    print("Executando a limpeza...")
+    microdados_lidos = etl.read_microdados(
+        brutos / f"microdados_ed_basica_{anos[-1]}.csv"
+    )
+    final = build_final(ideb, microdados_lidos, rendimento, ufs, saida)
+
+    cities = municipios[["CO_MUNICIPIO", "NO_MUNICIPIO", "SRE"]]
+    cities.columns = ["ibge_code", "municipio", "sre"]
+    cities.to_csv(saida / "cities.csv", index=False)
+    write_manifest(saida)  # refeito com o cities.csv
+
+    print(f"\n✅ Dados sintéticos gravados em {saida}")
+    print(f"📍 {len(municipios)} municípios em {len(ufs)} UF(s)")
+    print(f"🏫 {len(microdados)} escolas no censo {anos[-1]}")
+    print(f"📋 dados_por_serie.csv: {len(final)} linhas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Gera um relatório em PDF por município (IDEB × meta, posição no ranking,
+matrículas por série e taxas de rendimento).
+
+Os relatórios são gerados em paralelo e apenas para os municípios cujos
+dados mudaram desde a última execução (veja ``src/reports/batch.py``).
+
+Uso:
+    python generate_reports.py [--saida relatorios] [--ufs ES]
+        [--municipios 3205309 ...] [--processos 4] [--forcar] [--json tempos.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import streamlit.logger
+
+# Fora do servidor o Streamlit avisa a cada cache criado
+streamlit.logger.set_log_level("error")
+
+from src.reports.batch import generate_reports, slowest
+from src.utils.settings import DATA_PATH
+
+
+def parse_args():
+    """Lê as opções da linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-path", default=DATA_PATH, help="Pasta com os CSVs")
+    parser.add_argument("--saida", default="relatorios", help="Pasta dos PDFs")
+    parser.add_argument("--ufs", nargs="+", help="UFs incluídas (padrão: todas)")
+    parser.add_argument(
+        "--municipios", type=int, nargs="+", help="Códigos IBGE (padrão: todos)"
+    )
+    parser.add_argument(
+        "--processos", type=int, help="Processos do pool (padrão: número de CPUs)"
+    )
+    parser.add_argument(
+        "--forcar",
+        action="store_true",
+        help="Regenera todos os relatórios, mesmo os inalterados",
+    )
+    parser.add_argument("--json", help="Arquivo para salvar o tempo de cada relatório")
+    return parser.parse_args()
+
+
+def _progresso(feitos: int, total: int):
+    if feitos == total or feitos % 50 == 0:
+        print(f"   {feitos}/{total} relatórios", flush=True)
+
+
+def main():
+    """Função principal."""
+    args = parse_args()
+    inicio = time.perf_counter()
+    resumo = generate_reports(
+        args.data_path,
+        Path(args.saida),
+        ufs=args.ufs,
+        municipios=args.municipios,
+        processos=args.processos,
+        forcar=args.forcar,
+        progresso=_progresso,
+    )
+    total = time.perf_counter() - inicio
+
+    gerados = resumo["gerados"]
+    erros = [r for r in gerados if r.erro is not None]
+    tempos = np.array([r.segundos for r in gerados if r.segundos is not None])
+
+    print(
+        f"\n📄 {len(gerados) - len(erros)} relatório(s) gerado(s), "
+        f"{len(resumo['inalterados'])} inalterado(s), {len(erros)} erro(s) "
+        f"em {total:.2f}s com {resumo['processos']} processo(s)"
+    )
+    for etapa, segundos in resumo["etapas"].items():
+        print(f"   • {etapa:<12}{segundos:>8.2f}s")
+    if len(tempos):
+        p50, p95 = np.percentile(tempos, [50, 95])
+        print(
+            f"   • por relatório: p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms, "
+            f"máx. {tempos.max() * 1000:.0f} ms"
+        )
+        for r in slowest(gerados, 3):
+            print(f"     {r.segundos * 1000:>7.0f} ms  {r.arquivo}")
+    for r in erros:
+        print(f"   ⚠️ {r.codigo}: {r.erro}")
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(
+                [
+                    {
+                        "codigo": r.codigo,
+                        "arquivo": r.arquivo,
+                        "segundos": r.segundos,
+                        "gerado": gerado,
+                        "erro": r.erro,
+                    }
+                    for gerado, lista in (
+                        (True, gerados),
+                        (False, resumo["inalterados"]),
+                    )
+                    for r in lista
+                ],
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+    if erros:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
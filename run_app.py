@@ -1,11 +1,83 @@
 """
 Script para executar o dashboard localmente.
+
+A instalação das dependências só roda quando o ambiente muda: a impressão
+digital do ``requirements.txt`` e das distribuições instaladas fica em
+``.run_app_state.json``. Os CSVs são conferidos pelo hash SHA-256 do
+``manifest.json`` da pasta de dados (com cache por tamanho e data de
+modificação) e, ao final, é exibido o tempo de cada etapa da inicialização.
 """
 
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from importlib import metadata
 from pathlib import Path
 
+from src.data.manifest import DATA_FILES, MANIFEST_NAME, file_sha256, write_manifest
+from src.utils.settings import DATA_PATH
+
+REQUIREMENTS = Path("requirements.txt")
+STATE_FILE = Path(".run_app_state.json")
+
+
+def load_state() -> dict:
+    """Estado salvo da última inicialização."""
+    try:
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: dict):
+    try:
+        STATE_FILE.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    except OSError as e:
+        print(f"⚠️ Não foi possível salvar {STATE_FILE}: {e}")
+
+
+def environment_fingerprint() -> str:
+    """Hash do requirements.txt, do interpretador e das distribuições."""
+    digest = hashlib.sha256()
+    digest.update(REQUIREMENTS.read_bytes())
+    digest.update(sys.executable.encode())
+    installed = sorted(
+        f"{(d.metadata['Name'] or '').lower()}=={d.version}"
+        for d in metadata.distributions()
+    )
+    digest.update("\n".join(installed).encode())
+    return digest.hexdigest()
+
+
+def requirements_satisfied() -> bool:
+    """Confere as versões instaladas contra o requirements.txt."""
+    try:
+        from packaging.requirements import Requirement
+    except ImportError:
+        return False
+
+    for line in REQUIREMENTS.read_text(encoding="utf-8").splitlines():
+        line = line.split("#")[0].strip()
+        if not line:
+            continue
+        requirement = Requirement(line)
+        try:
+            version = metadata.version(requirement.name)
+        except metadata.PackageNotFoundError:
+            return False
+        if not requirement.specifier.contains(version, prereleases=True):
+            return False
+    return True
+
 
 def install_requirements():
     """Instala as dependências necessárias."""
@@ -21,52 +93,277 @@ def install_requirements():
         return False
 
 
-def run_streamlit():
+def ensure_requirements(state: dict, force: bool = False) -> bool:
+    """Instala as dependências apenas se o ambiente mudou."""
+    fingerprint = environment_fingerprint()
+    if not force and (state.get("ambiente") == fingerprint or requirements_satisfied()):
+        print("✅ Dependências já satisfeitas (instalação ignorada)")
+        state["ambiente"] = fingerprint
+        return True
+
+    if not install_requirements():
+        return False
+    state["ambiente"] = environment_fingerprint()
+    return True
+
+
+def check_data_files(data_dir: Path, state: dict) -> list:
+    """
+    Confere os CSVs com o manifesto da pasta de dados.
+
+    Returns:
+        Lista de problemas (vazia se tudo confere)
+    """
+    missing = [name for name in DATA_FILES if not (data_dir / name).exists()]
+    if missing:
+        return [f"{data_dir / name}: não encontrado" for name in missing]
+
+    manifest_path = data_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        print(f"⚠️ {manifest_path} ausente: conferida apenas a existência")
+        return []
+
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    return [
+        f"{data_dir / name}: hash diferente do manifesto"
+        for name, entry in manifest.items()
+        if file_sha256(data_dir / name, state.setdefault("hashes", {}))
+        != entry["sha256"]
+    ]
+
+
+def measure_imports(timings: dict):
+    """
+    Mede a importação das bibliotecas.
+
+    A primeira carga dos dados é feita pelo próprio servidor, ao abrir a
+    primeira sessão, e lida da métrica ``dashboard_data_load_seconds``
+    (veja ``metrics_file_for_startup``).
+    """
+    inicio = time.perf_counter()
+    import streamlit.logger
+
+    streamlit.logger.set_log_level("error")
+    import plotly.express  # noqa: F401
+
+    from src.data.data_loader import DataLoader  # noqa: F401
+
+    timings["importação"] = time.perf_counter() - inicio
+
+
+def metrics_file_for_startup() -> Path:
+    """
+    Arquivo de métricas do servidor, de onde sai o tempo da primeira carga.
+
+    Sem ``DASHBOARD_METRICS_FILE`` definido, o servidor recebe um arquivo
+    temporário (o ambiente é herdado pelos processos do Streamlit).
+    """
+    if not os.environ.get("DASHBOARD_METRICS_FILE"):
+        os.environ["DASHBOARD_METRICS_FILE"] = str(
+            Path(tempfile.mkdtemp(prefix="dashboard-")) / "metrics.prom"
+        )
+    return Path(os.environ["DASHBOARD_METRICS_FILE"])
+
+
+def read_data_load_seconds(metrics_file: Path):
+    """
+    Tempo da carga dos dados gravado pelo servidor (None se ainda não houve).
+
+    Com ``--workers``, cada processo grava ``metrics-<n>.prom``; vale o
+    primeiro processo que carregou os dados.
+    """
+    candidatos = [metrics_file] + sorted(
+        metrics_file.parent.glob(f"{metrics_file.stem}-*{metrics_file.suffix}")
+    )
+    for arquivo in candidatos:
+        try:
+            linhas = arquivo.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        valores = [
+            float(linha.rsplit(" ", 1)[1])
+            for linha in linhas
+            if linha.startswith("dashboard_data_load_seconds{")
+        ]
+        if valores:
+            return sum(valores)
+    return None
+
+
+def wait_until_ready(
+    port: int,
+    timings: dict,
+    inicio: float,
+    metrics_file: Path = None,
+    timeout: float = 120,
+):
+    """
+    Aguarda o endpoint de saúde e a primeira carga dos dados e mostra o
+    tempo de cada etapa.
+
+    A carga acontece na primeira sessão (o Streamlit abre o navegador ao
+    iniciar); sem sessão em ``timeout`` segundos, ela fica de fora.
+    """
+    url = f"http://127.0.0.1:{port}/_stcore/health"
+    while time.perf_counter() - inicio < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    break
+        except OSError:
+            pass
+        time.sleep(0.2)
+    else:
+        print(f"⚠️ Servidor não respondeu em {timeout:.0f}s")
+        return
+
+    timings["servidor pronto"] = time.perf_counter() - inicio
+
+    carga = None
+    if metrics_file is not None:
+        limite = time.perf_counter() + timeout
+        while carga is None and time.perf_counter() < limite:
+            carga = read_data_load_seconds(metrics_file)
+            if carga is None:
+                time.sleep(0.5)
+    if carga is not None:
+        timings["primeira carga dos dados"] = carga
+
+    print("\n⏱️ Tempo de inicialização:")
+    for etapa, segundos in timings.items():
+        print(f"   • {etapa:<28}{segundos:>7.2f}s")
+    print(f"   • {'total':<28}{sum(timings.values()):>7.2f}s")
+    if carga is None:
+        print("   (primeira carga dos dados não medida: nenhuma sessão aberta)")
+
+
+def run_streamlit(port: int = 8501, timings: dict = None):
     """Executa o dashboard Streamlit."""
     print("🚀 Iniciando o dashboard...")
+    metrics_file = metrics_file_for_startup() if timings is not None else None
+    inicio = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            "app.py",
+            "--server.port",
+            str(port),
+        ]
+    )
+    if timings is not None:
+        threading.Thread(
+            target=wait_until_ready,
+            args=(port, timings, inicio, metrics_file),
+            daemon=True,
+        ).start()
     try:
-        subprocess.run([sys.executable, "-m", "streamlit", "run", "app.py"], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Erro ao executar o Streamlit: {e}")
+        if process.wait() != 0:
+            print(f"❌ Erro ao executar o Streamlit: código {process.returncode}")
     except KeyboardInterrupt:
+        process.terminate()
+        process.wait()
         print("\n🛑 Dashboard encerrado pelo usuário.")
 
 
+def run_workers(workers: int, port: int, timings: dict = None):
+    """Executa vários processos do Streamlit atrás do proxy local."""
+    # Importado aqui: depende das bibliotecas recém-instaladas
+    from src.utils.supervisor import Supervisor
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    print(f"🚀 Iniciando {workers} processos do dashboard...")
+    metrics_file = metrics_file_for_startup() if timings is not None else None
+    supervisor = Supervisor(workers, port=port, data_path=DATA_PATH)
+    if timings is not None:
+        threading.Thread(
+            target=wait_until_ready,
+            args=(port, timings, time.perf_counter(), metrics_file),
+            daemon=True,
+        ).start()
+    try:
+        asyncio.run(supervisor.run())
+    except KeyboardInterrupt:
+        supervisor.stop()
+        print("\n🛑 Dashboard encerrado pelo usuário.")
+
+
+def parse_args():
+    """Lê as opções da linha de comando."""
+    parser = argparse.ArgumentParser(description="Executa o dashboard localmente.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("DASHBOARD_WORKERS", 1)),
+        help="Processos do Streamlit (mais de 1 usa o proxy local)",
+    )
+    parser.add_argument("--port", type=int, default=8501, help="Porta pública")
+    parser.add_argument(
+        "--reinstalar",
+        action="store_true",
+        help="Executa o pip install mesmo com o ambiente inalterado",
+    )
+    parser.add_argument(
+        "--atualizar-manifesto",
+        action="store_true",
+        help="Regrava o manifest.json com os hashes dos CSVs atuais",
+    )
+    return parser.parse_args()
+
+
 def main():
     """Função principal."""
+    args = parse_args()
     print("=" * 60)
     print("📚 Dashboard de Indicadores Educacionais do Espírito Santo")
     print("=" * 60)
 
-    # Verifica se os arquivos de dados existem
-    data_files = [
-        "database/ideb_final.csv",
-        "database/microdados_final.csv",
-        "database/dados_por_serie.csv",
-        "database/cities.csv",
-    ]
+    state = load_state()
+    timings = {}
+    data_dir = Path(DATA_PATH)
 
-    missing_files = []
-    for file_path in data_files:
-        if not Path(file_path).exists():
-            missing_files.append(file_path)
+    # Confere os arquivos de dados pelo manifesto
+    inicio = time.perf_counter()
+    if args.atualizar_manifesto:
+        print(
+            f"📝 Manifesto atualizado: {write_manifest(data_dir, state.setdefault('hashes', {}))}"
+        )
+    problems = check_data_files(data_dir, state)
+    timings["verificação dos dados"] = time.perf_counter() - inicio
 
-    if missing_files:
-        print("❌ Arquivos de dados não encontrados:")
-        for file in missing_files:
-            print(f"   • {file}")
-        print("\n💡 Certifique-se de que os arquivos CSV estão na pasta 'database/'")
+    if problems:
+        print("❌ Arquivos de dados inválidos:")
+        for problem in problems:
+            print(f"   • {problem}")
+        print(
+            f"\n💡 Certifique-se de que os arquivos CSV estão na pasta '{data_dir}/'"
+            " (após atualizar os dados, use --atualizar-manifesto)"
+        )
+        save_state(state)
         return
 
-    print("✅ Todos os arquivos de dados encontrados!")
+    print("✅ Todos os arquivos de dados conferidos!")
 
-    # Instala dependências e executa o app
-    if install_requirements():
-        print("\n" + "=" * 60)
-        print("🌐 O dashboard será aberto em: http://localhost:8501")
-        print("🛑 Para encerrar, pressione Ctrl+C")
-        print("=" * 60)
-        run_streamlit()
+    # Instala dependências (se o ambiente mudou) e executa o app
+    inicio = time.perf_counter()
+    ok = ensure_requirements(state, force=args.reinstalar)
+    timings["ambiente"] = time.perf_counter() - inicio
+    save_state(state)
+    if not ok:
+        return
+
+    measure_imports(timings)
+
+    print("\n" + "=" * 60)
+    print(f"🌐 O dashboard será aberto em: http://localhost:{args.port}")
+    print("🛑 Para encerrar, pressione Ctrl+C")
+    print("=" * 60)
+    if args.workers > 1:
+        run_workers(args.workers, args.port, timings)
+    else:
+        run_streamlit(args.port, timings)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+"""
+Alertas de indicadores críticos exibidos na sidebar.
+
+As regras (``src/data/alerts.py``) são avaliadas uma vez por versão dos
+dados por um motor compartilhado pelas sessões do processo; ao mudar a
+versão, só as linhas alteradas são reavaliadas. Com ``ALERT_STATE_DIR``
+definido, o estado fica gravado nessa pasta e sobrevive a reinícios.
+"""
+
+import pandas as pd
+import streamlit as st
+
+from src.data.alerts import AlertEngine, AlertResult, alert_frame, load_rules
+from src.data.data_loader import DataLoader
+from src.data.warmup import warmup_task
+from src.utils.settings import ALERT_RULES_FILE, ALERT_STATE_DIR
+from src.utils.tracing import traced
+
+# Linhas exibidas por regra na sidebar
+_MAX_LINHAS = 50
+
+_ICONES = {"alta": "🔴", "media": "🟠", "baixa": "🟡"}
+
+_engine = AlertEngine(load_rules(ALERT_RULES_FILE), ALERT_STATE_DIR)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _alertas(_data_loader: DataLoader, data_version: str) -> AlertResult:
+    """Avalia as regras sobre a versão atual dos dados."""
+    frame = alert_frame(
+        _data_loader.load_dados_serie(),
+        _data_loader.load_ideb_data(),
+        _engine.columns,
+    )
+    return _engine.evaluate(frame, data_version)
+
+
+@traced("alertas.disparos")
+@st.cache_data(show_spinner=False)
+def _disparos(_data_loader: DataLoader, data_version: str, rede: str) -> pd.DataFrame:
+    """Alertas disparados para a rede."""
+    return _alertas(_data_loader, data_version).firing(rede)
+
+
+@warmup_task
+def _aquecer_alertas(data_loader: DataLoader, rede: str):
+    """Avalia as regras e separa os disparos da rede."""
+    _disparos(data_loader, data_loader.data_version, rede)
+
+
+def render_alert_sidebar(data_loader: DataLoader, rede: str):
+    """Mostra na sidebar os alertas disparados para a rede selecionada."""
+    data_version = data_loader.data_version
+    resultado = _alertas(data_loader, data_version)
+    disparos = _disparos(data_loader, data_version, rede)
+
+    st.sidebar.markdown("### 🚨 Alertas")
+    if disparos.empty:
+        st.sidebar.success("Nenhum alerta para a rede selecionada.")
+        return
+
+    contagem = disparos["regra"].value_counts()
+    for regra in resultado.rules:
+        total = int(contagem.get(regra.nome, 0))
+        if total == 0:
+            continue
+        icone = _ICONES.get(regra.severidade, "⚪")
+        with st.sidebar.expander(f"{icone} {regra.descricao} ({total})"):
+            tabela = disparos.loc[
+                disparos["regra"] == regra.nome, ["NO_MUNICIPIO", "ANO_ESCOLAR"]
+            ]
+            if regra.por_serie:
+                tabela = tabela.assign(
+                    ANO_ESCOLAR=tabela["ANO_ESCOLAR"].astype(str) + "º ano"
+                )
+                tabela.columns = ["Município", "Série"]
+            else:
+                tabela = tabela[["NO_MUNICIPIO"]]
+                tabela.columns = ["Município"]
+            st.dataframe(
+                tabela.head(_MAX_LINHAS), hide_index=True, use_container_width=True
+            )
+            if total > _MAX_LINHAS:
+                st.caption(f"... e mais {total - _MAX_LINHAS}")
+
+    st.sidebar.caption(
+        f"{disparos['CO_MUNICIPIO'].nunique()} município(s) com alerta · "
+        f"{resultado.reavaliadas} linha(s) avaliada(s) na última atualização"
+    )
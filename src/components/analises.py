@@ -0,0 +1,453 @@
+"""
+Componente de análises entre municípios.
+
+Agrupamento de municípios semelhantes com k-means sobre os indicadores
+padronizados de ``src/data/features.py``, montados pelo ``DataLoader`` uma
+vez por versão dos dados e rede; cada combinação de k e indicadores é
+agrupada uma vez e fica em cache, então mudar os parâmetros e voltar a
+uma combinação já vista não recalcula nada. As correlações entre os
+indicadores (``src/data/correlation.py``) e as anomalias dos dados por
+série (``src/data/anomalies.py``) também são calculadas uma vez por versão;
+os controles das seções só escolhem o que exibir do resultado pronto.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from src.components.data_export import render_data_export
+from src.components.paginated_table import render_paginated_table
+from src.data.anomalies import ATIPICO, LIMITE_ESCORE, MIN_MATRICULAS, TIPOS
+from src.data.clustering import kmeans, principal_components
+from src.data.correlation import PEARSON, SPEARMAN, correlation_matrices
+from src.data.data_loader import DataLoader
+from src.data.table_index import TableIndex
+from src.data.warmup import warmup_task
+from src.utils.chart_scale import SVG, scatter_mode
+from src.utils.figure_cache import cached_figure, plotly_chart_spec
+from src.utils.fragments import instrumented_fragment, render_fragment_counter
+from src.utils.tracing import traced
+
+K_PADRAO = 4
+
+# Municípios sorteados para a matriz de dispersão (gráfico leve em escala
+# nacional; as correlações usam todos os municípios)
+AMOSTRA_DISPERSAO = 1500
+DISPERSAO_PADRAO = ["IDEB 2023", "IDEB − Meta", "Matrículas", "Evasão 9º"]
+
+
+@traced("analises.agrupamento")
+@st.cache_data(show_spinner=False, max_entries=64)
+def _agrupamento(
+    _data_loader: DataLoader, data_version: str, rede: str, k: int, grupos: tuple
+) -> dict:
+    """Grupos, perfil médio de cada grupo e projeção 2D dos municípios."""
+    indicadores = _data_loader.get_municipality_features(rede)
+    x, colunas = indicadores.matrix(grupos)
+    resultado = kmeans(x, k)
+    nomes = [f"Grupo {i + 1}" for i in range(len(resultado.centers))]
+    rotulos = pd.Series(pd.Categorical.from_codes(resultado.labels, nomes))
+
+    membros = indicadores.municipios[["NO_MUNICIPIO", "SG_UF", "SRE"]].copy()
+    membros.insert(0, "Grupo", rotulos.to_numpy())
+    membros = pd.concat([membros, indicadores.valores[colunas]], axis=1)
+
+    perfil = membros.groupby("Grupo", observed=True)[colunas].mean().round(2)
+    perfil.insert(0, "Municípios", membros["Grupo"].value_counts())
+
+    projecao = principal_components(x)
+    return {
+        "membros": membros.sort_values(["Grupo", "NO_MUNICIPIO"]),
+        "perfil": perfil.reset_index(),
+        "projecao": pd.DataFrame(
+            {
+                "Componente 1": projecao[:, 0],
+                "Componente 2": projecao[:, 1],
+                "Grupo": rotulos,
+                "Município": indicadores.municipios["NO_MUNICIPIO"],
+            }
+        ),
+        "inercia": resultado.inertia,
+        "iteracoes": resultado.iterations,
+    }
+
+
+@cached_figure("analises", "agrupamento")
+def _figura_agrupamento(data_loader: DataLoader, rede: str, k: int, grupos: tuple):
+    """Municípios nas duas primeiras componentes principais, por grupo."""
+    agrupamento = _agrupamento(data_loader, data_loader.data_version, rede, k, grupos)
+    projecao = agrupamento["projecao"]
+    if projecao.empty:
+        return None
+    fig = px.scatter(
+        projecao.sort_values("Grupo"),
+        x="Componente 1",
+        y="Componente 2",
+        color="Grupo",
+        hover_data=["Município"],
+        title="Municípios por grupo (componentes principais dos indicadores)",
+        template="plotly_white",
+        render_mode="svg" if scatter_mode(len(projecao)) == SVG else "webgl",
+    )
+    fig.update_layout(height=450)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def _correlacoes(_data_loader: DataLoader, data_version: str, rede: str) -> dict:
+    """Correlações entre todos os indicadores e os pares mais correlacionados."""
+    indicadores = _data_loader.get_municipality_features(rede)
+    x, colunas = indicadores.transformed(list(indicadores.grupos))
+    matrizes = correlation_matrices(x, colunas)
+
+    # Pares com IDEB, meta ou matrículas (as taxas de rendimento somam 100%
+    # e se correlacionam entre si por construção)
+    taxas = {c for g, cs in indicadores.grupos.items() if "série" in g for c in cs}
+    i, j = np.triu_indices(len(colunas), k=1)
+    pares = pd.DataFrame(
+        {
+            "Indicador 1": np.array(colunas)[i],
+            "Indicador 2": np.array(colunas)[j],
+            PEARSON: matrizes[PEARSON].to_numpy()[i, j],
+            SPEARMAN: matrizes[SPEARMAN].to_numpy()[i, j],
+            "Municípios": matrizes["pares"].to_numpy()[i, j],
+        }
+    )
+    ambas_taxas = pares["Indicador 1"].isin(taxas) & pares["Indicador 2"].isin(taxas)
+    pares = pares[~ambas_taxas].dropna(subset=[SPEARMAN])
+    destaques = pares.reindex(
+        pares[SPEARMAN].abs().sort_values(ascending=False).index
+    ).head(10)
+    return {**matrizes, "destaques": destaques.round(2)}
+
+
+@st.cache_data(show_spinner=False)
+def _amostra_dispersao(
+    _data_loader: DataLoader, data_version: str, rede: str
+) -> pd.DataFrame:
+    """Indicadores de uma amostra fixa de municípios (matrículas em log)."""
+    indicadores = _data_loader.get_municipality_features(rede)
+    x, colunas = indicadores.transformed(list(indicadores.grupos))
+    amostra = pd.DataFrame(x, columns=colunas)
+    amostra["Município"] = indicadores.municipios["NO_MUNICIPIO"].to_numpy()
+    if len(amostra) > AMOSTRA_DISPERSAO:
+        amostra = amostra.sample(AMOSTRA_DISPERSAO, random_state=42).sort_index()
+    return amostra
+
+
+@cached_figure("analises", "correlacao")
+def _figura_correlacao(data_loader: DataLoader, rede: str, metodo: str):
+    """Mapa de calor da matriz de correlação."""
+    matriz = _correlacoes(data_loader, data_loader.data_version, rede)[metodo]
+    if matriz.empty:
+        return None
+    fig = px.imshow(
+        matriz.round(2),
+        text_auto=True,
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale="RdBu",
+        aspect="auto",
+        title=f"Correlação de {metodo} entre os indicadores - {rede}",
+        template="plotly_white",
+    )
+    fig.update_layout(height=600)
+    return fig
+
+
+@cached_figure("analises", "dispersao")
+def _figura_dispersao(data_loader: DataLoader, rede: str, colunas: tuple):
+    """Matriz de dispersão dos indicadores escolhidos, na amostra."""
+    amostra = _amostra_dispersao(data_loader, data_loader.data_version, rede)
+    if amostra.empty or len(colunas) < 2:
+        return None
+    fig = px.scatter_matrix(
+        amostra,
+        dimensions=list(colunas),
+        hover_name="Município",
+        template="plotly_white",
+    )
+    fig.update_traces(diagonal_visible=False, marker=dict(size=3, opacity=0.5))
+    fig.update_layout(height=150 + 150 * len(colunas))
+    return fig
+
+
+@traced("analises.anomalias")
+@st.cache_data(show_spinner=False)
+def _resumo_anomalias(_data_loader: DataLoader, data_version: str, rede: str) -> dict:
+    """Contagens das anomalias da rede, por série e tipo."""
+    dados_serie = _data_loader.load_dados_serie()
+    anomalias = _data_loader.get_anomalies()
+    anomalias = anomalias[anomalias["REDE"] == rede]
+
+    contagem = (
+        anomalias.groupby(["ANO_ESCOLAR", "Tipo"], observed=True)
+        .size()
+        .rename("Ocorrências")
+        .reset_index()
+    )
+    contagem["Série"] = contagem["ANO_ESCOLAR"].astype(str) + "º ano"
+    return {
+        "linhas": int((dados_serie["REDE"] == rede).sum()),
+        "linhas_anomalas": len(
+            anomalias.drop_duplicates(["CO_MUNICIPIO", "ANO_ESCOLAR"])
+        ),
+        "atipicos": int((anomalias["Tipo"] == ATIPICO).sum()),
+        "inconsistencias": int((anomalias["Tipo"] != ATIPICO).sum()),
+        "contagem": contagem,
+    }
+
+
+@traced("analises.anomalias_tabela")
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _indice_anomalias(
+    _data_loader: DataLoader, data_version: str, rede: str, tipos: tuple, serie: str
+) -> TableIndex:
+    """Índice da tabela de anomalias da rede, filtrada por tipo e série."""
+    anomalias = _data_loader.get_anomalies()
+    filtro = (anomalias["REDE"] == rede) & anomalias["Tipo"].isin(tipos)
+    if serie != "Todas":
+        filtro &= anomalias["ANO_ESCOLAR"] == int(serie[0])
+
+    tabela = anomalias[filtro].drop(columns=["CO_MUNICIPIO", "REDE"])
+    tabela = tabela.astype({"SRE": str, "Tipo": str})
+    return TableIndex(
+        tabela.rename(
+            columns={
+                "NO_MUNICIPIO": "Município",
+                "SG_UF": "UF",
+                "ANO_ESCOLAR": "Série",
+                "Mediana": "Mediana da Série",
+            }
+        )
+    )
+
+
+@cached_figure("analises", "anomalias")
+def _figura_anomalias(data_loader: DataLoader, rede: str):
+    """Ocorrências de cada tipo de anomalia por série."""
+    contagem = _resumo_anomalias(data_loader, data_loader.data_version, rede)[
+        "contagem"
+    ]
+    if contagem.empty:
+        return None
+    fig = px.bar(
+        contagem,
+        x="Série",
+        y="Ocorrências",
+        color="Tipo",
+        barmode="group",
+        title=f"Anomalias por série - {rede}",
+        template="plotly_white",
+        category_orders={"Tipo": TIPOS},
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@warmup_task
+def _aquecer_analises(data_loader: DataLoader, rede: str):
+    """Agrupa os municípios com os parâmetros padrão."""
+    grupos = tuple(data_loader.get_municipality_features(rede).grupos)
+    _figura_agrupamento(data_loader, rede, K_PADRAO, grupos)
+    for metodo in (PEARSON, SPEARMAN):
+        _figura_correlacao(data_loader, rede, metodo)
+    _figura_dispersao(data_loader, rede, tuple(DISPERSAO_PADRAO))
+    _figura_anomalias(data_loader, rede)
+    _indice_anomalias(
+        data_loader, data_loader.data_version, rede, tuple(TIPOS), "Todas"
+    )
+
+
+def render_analises(data_loader: DataLoader, rede_selecionada: str):
+    """Renderiza a seção de análises entre municípios."""
+    st.markdown(
+        '<div class="section-header">🔬 Análises entre Municípios</div>',
+        unsafe_allow_html=True,
+    )
+
+    st.info(f"📊 **Análise filtrada para:** {rede_selecionada}")
+
+    _secao_agrupamento(data_loader, rede_selecionada)
+    _secao_correlacao(data_loader, rede_selecionada)
+    _secao_anomalias(data_loader, rede_selecionada)
+
+
+@instrumented_fragment("analises.agrupamento")
+def _secao_agrupamento(data_loader: DataLoader, rede: str):
+    """Agrupamento por k-means; mudar k ou os indicadores reexecuta só aqui."""
+    st.subheader("🧩 Agrupamento de Municípios Semelhantes")
+
+    indicadores = data_loader.get_municipality_features(rede)
+    if len(indicadores) < 2:
+        st.warning("⚠️ Municípios insuficientes para o agrupamento nesta rede.")
+        return
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        grupos = st.multiselect(
+            "Indicadores:",
+            list(indicadores.grupos),
+            default=list(indicadores.grupos),
+            key="analises_indicadores",
+            help="Padronizados (média 0, desvio 1); matrículas em escala log",
+        )
+    with col2:
+        k = st.slider(
+            "Número de grupos:",
+            min_value=2,
+            max_value=min(10, len(indicadores)),
+            value=min(K_PADRAO, len(indicadores)),
+            key="analises_k",
+        )
+
+    if not grupos:
+        st.warning("⚠️ Selecione ao menos um indicador.")
+        return
+
+    grupos = tuple(grupos)
+    agrupamento = _agrupamento(data_loader, data_loader.data_version, rede, k, grupos)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Municípios", len(agrupamento["membros"]))
+    col2.metric("Indicadores", len(indicadores.columns(grupos)))
+    col3.metric(
+        "Iterações",
+        agrupamento["iteracoes"],
+        help=f"Inércia: {agrupamento['inercia']:,.1f}",
+    )
+
+    spec = _figura_agrupamento(data_loader, rede, k, grupos)
+    if spec:
+        plotly_chart_spec(spec, use_container_width=True)
+
+    st.markdown("**Perfil médio de cada grupo** (unidades originais)")
+    st.dataframe(agrupamento["perfil"], hide_index=True, use_container_width=True)
+
+    with st.expander("👥 Municípios de cada grupo"):
+        st.dataframe(
+            agrupamento["membros"][["Grupo", "NO_MUNICIPIO", "SG_UF", "SRE"]].rename(
+                columns={"NO_MUNICIPIO": "Município", "SG_UF": "UF"}
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    render_data_export(
+        {"Agrupamento": agrupamento["membros"]}, "analises_grupos", rede, f"k{k}"
+    )
+    render_fragment_counter()
+
+
+@instrumented_fragment("analises.correlacao")
+def _secao_correlacao(data_loader: DataLoader, rede: str):
+    """Correlações entre os indicadores; trocar o método reexecuta só aqui."""
+    st.subheader("🔗 Correlação entre Indicadores")
+
+    indicadores = data_loader.get_municipality_features(rede)
+    if len(indicadores) < 3:
+        st.warning("⚠️ Municípios insuficientes para as correlações nesta rede.")
+        return
+
+    metodo = st.radio(
+        "Método:",
+        [PEARSON, SPEARMAN],
+        horizontal=True,
+        key="analises_correlacao_metodo",
+        help="Spearman (postos) capta relações monotônicas e resiste a extremos",
+    )
+    spec = _figura_correlacao(data_loader, rede, metodo)
+    if spec:
+        plotly_chart_spec(spec, use_container_width=True)
+
+    correlacoes = _correlacoes(data_loader, data_loader.data_version, rede)
+    st.markdown("**Pares de indicadores mais correlacionados** (por Spearman)")
+    st.dataframe(correlacoes["destaques"], hide_index=True, use_container_width=True)
+
+    colunas = indicadores.columns(list(indicadores.grupos))
+    escolhidos = st.multiselect(
+        "Indicadores da matriz de dispersão:",
+        colunas,
+        default=[c for c in DISPERSAO_PADRAO if c in colunas],
+        max_selections=6,
+        key="analises_correlacao_indicadores",
+    )
+    spec = _figura_dispersao(data_loader, rede, tuple(escolhidos))
+    if spec:
+        plotly_chart_spec(spec, use_container_width=True)
+    else:
+        st.info("Selecione ao menos dois indicadores para a matriz de dispersão.")
+
+    total = f"{len(indicadores):,}".replace(",", ".")
+    amostra = f"{min(len(indicadores), AMOSTRA_DISPERSAO):,}".replace(",", ".")
+    st.caption(
+        f"Correlações com todos os {total} municípios da rede (pares com valor "
+        "nos dois indicadores); matrículas em escala log. A matriz de dispersão "
+        f"mostra uma amostra fixa de {amostra} municípios."
+    )
+
+    render_data_export(
+        {
+            PEARSON: correlacoes[PEARSON].round(3).reset_index(names="Indicador"),
+            SPEARMAN: correlacoes[SPEARMAN].round(3).reset_index(names="Indicador"),
+        },
+        "analises_correlacao",
+        rede,
+    )
+
+
+@instrumented_fragment("analises.anomalias")
+def _secao_anomalias(data_loader: DataLoader, rede: str):
+    """Valores atípicos e inconsistências dos dados por série da rede."""
+    st.subheader("🚨 Detecção de Anomalias")
+
+    resumo = _resumo_anomalias(data_loader, data_loader.data_version, rede)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Linhas Analisadas", f"{resumo['linhas']:,}".replace(",", "."))
+    col2.metric(
+        "Linhas com Anomalia",
+        f"{resumo['linhas_anomalas']:,}".replace(",", "."),
+        help="Pares município × série com ao menos uma ocorrência",
+    )
+    col3.metric("Valores Atípicos", resumo["atipicos"])
+    col4.metric("Inconsistências", resumo["inconsistencias"])
+
+    spec = _figura_anomalias(data_loader, rede)
+    if spec is None:
+        st.success("✅ Nenhuma anomalia encontrada nos dados desta rede.")
+        return
+    plotly_chart_spec(spec, use_container_width=True)
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        tipos = st.multiselect(
+            "Tipos:", TIPOS, default=TIPOS, key="analises_anomalias_tipos"
+        )
+    with col2:
+        serie = st.selectbox(
+            "Série:",
+            ["Todas", "6º ano", "7º ano", "8º ano", "9º ano"],
+            key="analises_anomalias_serie",
+        )
+
+    indice = _indice_anomalias(
+        data_loader, data_loader.data_version, rede, tuple(tipos), serie
+    )
+    render_paginated_table(indice, key="analises_anomalias")
+    st.caption(
+        "Valor atípico: escore robusto (mediana e MAD da mesma rede e série) "
+        f"acima de {str(LIMITE_ESCORE).replace('.', ',')} em módulo; matrículas "
+        f"em escala log e taxas só com ao menos {MIN_MATRICULAS} matrículas. "
+        "Inconsistências: série sem matrículas, taxas ausentes, evasão "
+        "exatamente zero e taxas que não somam 100%."
+    )
+
+    # Tipos no nome do arquivo (todos selecionados não entram, como "Todas")
+    if set(tipos) == set(TIPOS):
+        filtro_tipos = ["Todos"]
+    else:
+        filtro_tipos = tipos or ["Nenhum tipo"]
+    render_data_export(
+        {"Anomalias": indice.df}, "analises_anomalias", rede, serie, *filtro_tipos
+    )
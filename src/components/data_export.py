@@ -0,0 +1,84 @@
+"""
+Exportação da visão filtrada de cada página.
+
+O arquivo só é gerado no clique em "Gerar", em blocos, pelo
+``src.utils.export``, direto em disco; o navegador o baixa pelo link do
+servidor de arquivos estáticos, sem que o conteúdo passe pela sessão.
+Trocar a tabela ou o formato reexecuta apenas este fragmento.
+"""
+
+import html
+from typing import Dict
+
+import pandas as pd
+import streamlit as st
+
+from src.utils.export import FORMATOS, available_formats, export_file_name, export_table
+from src.utils.fragments import instrumented_fragment
+
+
+@instrumented_fragment("exportacao")
+def render_data_export(tabelas: Dict[str, pd.DataFrame], key: str, *filtros: str):
+    """
+    Renderiza o download dos dados filtrados.
+
+    Args:
+        tabelas: Tabelas exportáveis da página, por rótulo
+        key: Prefixo único das chaves dos widgets (e nome do arquivo)
+        filtros: Filtros aplicados, incluídos no nome do arquivo
+    """
+    with st.expander("📥 Exportar dados filtrados"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            # Páginas com uma só tabela não mostram a escolha
+            rotulo = next(iter(tabelas))
+            if len(tabelas) > 1:
+                rotulo = st.selectbox(
+                    "Tabela:", list(tabelas), key=f"{key}_export_tabela"
+                )
+
+        with col2:
+            formatos = available_formats()
+            formato = st.radio(
+                "Formato:", formatos, horizontal=True, key=f"{key}_export_formato"
+            )
+
+        df = tabelas[rotulo]
+        st.caption(
+            f"{len(df):,} linhas × {df.shape[1]} colunas".replace(",", ".")
+            + " — exatamente os registros dos filtros selecionados"
+        )
+
+        nome = key if len(tabelas) == 1 else f"{key}_{rotulo}"
+        file_name = export_file_name(nome, formato, *filtros)
+        # O link vale só para a mesma visão (nome com os filtros e tamanho)
+        visao = (file_name, df.shape)
+        arquivo_key = f"{key}_export_arquivo"
+        if st.button(f"⚙️ Gerar {formato}", key=f"{key}_export_gerar"):
+            st.session_state.pop(arquivo_key, None)
+            try:
+                st.session_state[arquivo_key] = (
+                    visao,
+                    export_table(df, formato, file_name),
+                )
+            except ValueError as e:
+                st.warning(str(e))
+
+        arquivo = st.session_state.get(arquivo_key)
+        if arquivo and arquivo[0] == visao:
+            st.markdown(
+                f'<a href="{html.escape(arquivo[1])}" '
+                f'download="{html.escape(file_name)}">⬇️ Baixar {file_name}</a>',
+                unsafe_allow_html=True,
+            )
+
+        indisponiveis = [f for f in FORMATOS if f not in formatos]
+        if indisponiveis:
+            st.caption(
+                "Formatos indisponíveis: "
+                + ", ".join(
+                    f"{f} (requer {' ou '.join(FORMATOS[f].modules)})"
+                    for f in indisponiveis
+                )
+            )
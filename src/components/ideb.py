@@ -6,7 +6,361 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+from src.components.data_export import render_data_export
+from src.components.semelhantes import render_peer_comparison
 from src.data.data_loader import DataLoader
+from src.data.forecast import MIN_EDICOES, OBSERVADO, PROJECAO, year_columns
+from src.data.ranking import RankingIndex
+from src.data.warmup import warmup_task
+from src.utils.chart_scale import RESUMO, WEBGL, density_grid, scatter_mode
+from src.utils.figure_cache import cached_figure, plotly_chart_spec
+from src.utils.fragments import instrumented_fragment, render_fragment_counter
+from src.utils.tracing import traced
+
+
+@traced("ideb.filtro")
+@st.cache_data(show_spinner=False)
+def _dados_ideb(
+    _data_loader: DataLoader,
+    data_version: str,
+    rede: str,
+    sre: str,
+    municipio: str,
+) -> pd.DataFrame:
+    """Registros do IDEB com valor observado, filtrados por rede, SRE e município."""
+    ideb_df = _data_loader.load_ideb_data()
+    filtered_df = ideb_df[ideb_df["REDE"] == rede]
+
+    if sre != "Todas":
+        filtered_df = filtered_df[filtered_df["SRE"] == sre]
+
+    if municipio != "Todos":
+        municipio_code = _data_loader.get_municipio_code(municipio)
+        filtered_df = filtered_df[filtered_df["CO_MUNICIPIO"] == municipio_code]
+
+    return filtered_df.dropna(subset=["VL_OBSERVADO_2023"])
+
+
+@traced("ideb.ranking")
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _ranking_ideb(
+    _data_loader: DataLoader, data_version: str, rede: str, sre: str
+) -> RankingIndex:
+    """Ranking de todos os municípios da rede (e SRE) pelo IDEB 2023."""
+    return RankingIndex(
+        _dados_ideb(_data_loader, data_version, rede, sre, "Todos"),
+        "VL_OBSERVADO_2023",
+    )
+
+
+@traced("ideb.agregacao")
+@st.cache_data(show_spinner=False)
+def _tabelas_ideb(
+    _data_loader: DataLoader, data_version: str, rede: str, sre: str, municipio: str
+) -> dict:
+    """Ranking dos municípios e comparativo por rede."""
+    valid_data = _dados_ideb(_data_loader, data_version, rede, sre, municipio)
+
+    # Top 10 municípios por IDEB (ou o município selecionado, com sua posição)
+    ranking_index = _ranking_ideb(_data_loader, data_version, rede, sre)
+    linhas = None if municipio == "Todos" else ranking_index.rows_for(municipio)
+    ranking = ranking_index.top(10, linhas)[
+        [
+            "Posição",
+            "NO_MUNICIPIO",
+            "REDE",
+            "VL_OBSERVADO_2023",
+            "VL_PROJECAO_2021",
+            "acima_meta",
+        ]
+    ].round(2)
+
+    ranking["Status"] = ranking["acima_meta"].map({True: "✅", False: "❌"})
+    ranking_display = ranking[
+        ["Posição", "NO_MUNICIPIO", "REDE", "VL_OBSERVADO_2023", "Status"]
+    ]
+    ranking_display.columns = ["Posição", "Município", "Rede", "IDEB 2023", "Meta"]
+
+    rede_analysis = (
+        valid_data.groupby("REDE")
+        .agg(
+            {
+                "VL_OBSERVADO_2023": ["mean", "count"],
+                "VL_PROJECAO_2021": "mean",
+                "acima_meta": "sum",
+            }
+        )
+        .round(3)
+    )
+
+    rede_analysis.columns = [
+        "IDEB_Médio",
+        "Qtd_Registros",
+        "Meta_Média",
+        "Acima_Meta",
+    ]
+    rede_analysis["Perc_Acima_Meta"] = (
+        rede_analysis["Acima_Meta"] / rede_analysis["Qtd_Registros"] * 100
+    ).round(1)
+    rede_analysis["Diferença"] = (
+        rede_analysis["IDEB_Médio"] - rede_analysis["Meta_Média"]
+    ).round(3)
+
+    return {
+        "ranking": ranking_display,
+        "total_ranqueados": len(ranking_index),
+        "rede_analysis": rede_analysis[
+            [
+                "IDEB_Médio",
+                "Meta_Média",
+                "Diferença",
+                "Acima_Meta",
+                "Perc_Acima_Meta",
+            ]
+        ],
+    }
+
+
+@traced("ideb.previsao_filtro")
+@st.cache_data(show_spinner=False)
+def _previsao_ideb(
+    _data_loader: DataLoader,
+    data_version: str,
+    rede: str,
+    sre: str,
+    municipio: str,
+    ano: int,
+) -> pd.DataFrame:
+    """Projeção de uma edição, filtrada por rede, SRE e município."""
+    previsao = _data_loader.get_ideb_forecast()
+    previsao = previsao[(previsao["REDE"] == rede) & (previsao["ANO"] == ano)]
+
+    if sre != "Todas":
+        previsao = previsao[previsao["SRE"] == sre]
+
+    if municipio != "Todos":
+        municipio_code = _data_loader.get_municipio_code(municipio)
+        previsao = previsao[previsao["CO_MUNICIPIO"] == municipio_code]
+
+    return previsao
+
+
+_CORES_SITUACAO = {
+    "Deve atingir": "#2E8B57",
+    "Incerta": "#DAA520",
+    "Não deve atingir": "#DC143C",
+    "Sem meta": "#A9A9A9",
+}
+
+
+@cached_figure("ideb", "previsao_distribuicao")
+def _figura_previsao_distribuicao(
+    data_loader: DataLoader, rede: str, sre: str, ano: int
+):
+    """Distribuição da diferença entre IDEB e meta projetados."""
+    previsao = _previsao_ideb(
+        data_loader, data_loader.data_version, rede, sre, "Todos", ano
+    )
+    if previsao.empty:
+        return None
+    chart_data = previsao.assign(
+        Diferença=previsao["IDEB Projetado"] - previsao["Meta Projetada"]
+    )
+    fig = px.histogram(
+        chart_data,
+        x="Diferença",
+        color="Situação",
+        nbins=40,
+        title=f"IDEB Projetado − Meta Projetada em {ano}",
+        template="plotly_white",
+        color_discrete_map=_CORES_SITUACAO,
+        category_orders={"Situação": list(_CORES_SITUACAO)},
+        labels={"count": "Municípios"},
+    )
+    fig.add_vline(x=0, line_dash="dash", line_color="gray")
+    fig.update_layout(height=400, yaxis_title="Municípios")
+    return fig
+
+
+@cached_figure("ideb", "previsao_municipio")
+def _figura_previsao_municipio(data_loader: DataLoader, rede: str, municipio: str):
+    """Série histórica do município com a projeção e o intervalo de 95%."""
+    ideb_df = data_loader.load_ideb_data()
+    codigo = data_loader.get_municipio_code(municipio)
+    linha = ideb_df[(ideb_df["CO_MUNICIPIO"] == codigo) & (ideb_df["REDE"] == rede)]
+    previsao = data_loader.get_ideb_forecast()
+    previsao = previsao[
+        (previsao["CO_MUNICIPIO"] == codigo) & (previsao["REDE"] == rede)
+    ]
+    if linha.empty or previsao.empty:
+        return None
+
+    fig = go.Figure()
+    for prefixo, nome, estilo in (
+        (OBSERVADO, "IDEB observado", dict(color="#1f77b4")),
+        (PROJECAO, "Meta", dict(color="gray", dash="dash")),
+    ):
+        colunas = year_columns(ideb_df, prefixo)
+        fig.add_trace(
+            go.Scatter(
+                x=list(colunas),
+                y=linha.iloc[0][list(colunas.values())].to_numpy(dtype=float),
+                mode="lines+markers",
+                name=nome,
+                line=estilo,
+                connectgaps=True,
+            )
+        )
+
+    anos = previsao["ANO"].tolist()
+    fig.add_trace(
+        go.Scatter(
+            x=anos + anos[::-1],
+            y=previsao["Superior"].tolist() + previsao["Inferior"].tolist()[::-1],
+            fill="toself",
+            fillcolor="rgba(31, 119, 180, 0.15)",
+            line=dict(width=0),
+            hoverinfo="skip",
+            name="Intervalo de 95%",
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=anos,
+            y=previsao["IDEB Projetado"],
+            mode="lines+markers",
+            name="IDEB projetado",
+            line=dict(color="#1f77b4", dash="dot"),
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=anos,
+            y=previsao["Meta Projetada"],
+            mode="lines+markers",
+            name="Meta projetada",
+            line=dict(color="gray", dash="dot"),
+        )
+    )
+    fig.update_layout(
+        title=f"IDEB de {municipio} - {rede}",
+        template="plotly_white",
+        height=400,
+        xaxis_title="Edição",
+        yaxis_title="IDEB",
+    )
+    return fig
+
+
+@cached_figure("ideb", "ideb_vs_meta")
+def _figura_ideb_vs_meta(data_loader: DataLoader, rede: str, sre: str, municipio: str):
+    """Gráfico de dispersão IDEB observado vs meta."""
+    chart_data = _dados_ideb(
+        data_loader, data_loader.data_version, rede, sre, municipio
+    ).copy()
+    chart_data["Status"] = chart_data["acima_meta"].map(
+        {True: "Acima da Meta", False: "Abaixo da Meta"}
+    )
+
+    modo = scatter_mode(len(chart_data))
+    if modo == RESUMO:
+        # Escala nacional: densidade de municípios em grade, calculada aqui
+        x, y, contagem = density_grid(
+            chart_data["VL_PROJECAO_2021"].to_numpy(),
+            chart_data["VL_OBSERVADO_2023"].to_numpy(),
+        )
+        fig = go.Figure(
+            go.Heatmap(
+                x=x,
+                y=y,
+                z=contagem,
+                colorscale="Blues",
+                colorbar=dict(title="Municípios"),
+                hovertemplate="Meta: %{x:.1f}<br>IDEB: %{y:.1f}"
+                "<br>Municípios: %{z}<extra></extra>",
+            )
+        )
+        fig.update_layout(
+            title=f"IDEB Observado vs Meta - densidade de {len(chart_data)} pontos",
+            template="plotly_white",
+            xaxis_title="VL_PROJECAO_2021",
+            yaxis_title="VL_OBSERVADO_2023",
+        )
+    else:
+        fig = px.scatter(
+            chart_data,
+            x="VL_PROJECAO_2021",
+            y="VL_OBSERVADO_2023",
+            color="Status",
+            hover_data=["NO_MUNICIPIO", "REDE"],
+            title="IDEB Observado vs Meta",
+            template="plotly_white",
+            color_discrete_map={
+                "Acima da Meta": "#2E8B57",
+                "Abaixo da Meta": "#DC143C",
+            },
+            render_mode="webgl" if modo == WEBGL else "svg",
+        )
+
+    # Linha de igualdade (y = x)
+    min_val = min(
+        chart_data["VL_PROJECAO_2021"].min(),
+        chart_data["VL_OBSERVADO_2023"].min(),
+    )
+    max_val = max(
+        chart_data["VL_PROJECAO_2021"].max(),
+        chart_data["VL_OBSERVADO_2023"].max(),
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=[min_val, max_val],
+            y=[min_val, max_val],
+            mode="lines",
+            line=dict(dash="dash", color="gray"),
+            name="Meta = Observado",
+            showlegend=True,
+        )
+    )
+
+    fig.update_layout(height=400)
+    return fig
+
+
+@cached_figure("ideb", "sre")
+def _figura_sre(data_loader: DataLoader, rede: str):
+    """IDEB médio por SRE (None se não houver dados)."""
+    rollup = data_loader.get_sre_rollup(rede).dropna(subset=["ideb_medio"])
+    if len(rollup) == 0:
+        return None
+
+    rollup = rollup.sort_values("ideb_medio")
+    fig = px.bar(
+        x=rollup["ideb_medio"].round(2),
+        y=rollup.index.astype(str),
+        orientation="h",
+        title=f"IDEB Médio por SRE - {rede}",
+        template="plotly_white",
+        labels={"x": "IDEB 2023", "y": "SRE"},
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@warmup_task
+def _aquecer_ideb(data_loader: DataLoader, rede: str):
+    """Pré-calcula a visão padrão (todos os municípios) da análise do IDEB."""
+    data_version = data_loader.data_version
+    filtros = (rede, "Todas", "Todos")
+    if len(_dados_ideb(data_loader, data_version, *filtros)) > 0:
+        _tabelas_ideb(data_loader, data_version, *filtros)
+        _figura_ideb_vs_meta(data_loader, *filtros)
+        _figura_sre(data_loader, rede)
+
+    previsao = data_loader.get_ideb_forecast()
+    if len(previsao) > 0:
+        _figura_previsao_distribuicao(
+            data_loader, rede, "Todas", int(previsao["ANO"].min())
+        )
 
 
 def render_ideb_analysis(data_loader: DataLoader, rede_selecionada):
@@ -16,43 +370,97 @@ def render_ideb_analysis(data_loader: DataLoader, rede_selecionada):
         unsafe_allow_html=True,
     )
 
-    # Carrega dados do IDEB
-    ideb_df = data_loader.load_ideb_data()
-
-    # Aplica filtro de rede da sidebar
-    ideb_df = ideb_df[ideb_df["REDE"] == rede_selecionada]
     st.info(f"📊 **Análise filtrada para:** {rede_selecionada}")
 
+    _pagina_ideb(data_loader, rede_selecionada)
+
+    # Informações sobre o IDEB
+    with st.expander("ℹ️ Sobre o IDEB"):
+        st.markdown(
+            """
+        **O que é o IDEB?**
+        
+        O Índice de Desenvolvimento da Educação Básica (IDEB) é um indicador de qualidade educacional 
+        que combina informações de desempenho em exames padronizados com informações sobre rendimento escolar.
+        
+        **Como é calculado:**
+        - **Desempenho**: Resultados da Prova Brasil/SAEB
+        - **Rendimento**: Taxa de aprovação escolar
+        - **Fórmula**: IDEB = Desempenho × Taxa de Aprovação
+        
+        **Interpretação:**
+        - **Escala**: 0 a 10 pontos
+        - **Meta**: Definida para cada município/escola
+        """
+        )
+
+
+@instrumented_fragment("ideb.filtros")
+def _pagina_ideb(data_loader: DataLoader, rede_selecionada: str):
+    """
+    Filtros e seções da página.
+
+    Alterar um filtro reexecuta este fragmento inteiro (todas as seções),
+    mas não o script nem a sidebar.
+    """
     # Filtros adicionais
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
 
     with col1:
-        municipios = data_loader.get_municipios_list()
+        sre_filter = st.selectbox(
+            "SRE:",
+            ["Todas"] + data_loader.get_sre_list(),
+            help="Filtrar por Superintendência Regional de Educação",
+        )
+
+    with col2:
+        municipios = data_loader.get_municipios_list(sre_filter)
         municipio_filter = st.selectbox(
             "Selecione o Município:",
             ["Todos"] + municipios,
             help="Filtrar análise por município específico",
         )
 
-    with col2:
+    with col3:
         # Mostrar informações sobre o filtro atual
         st.info(f"**Rede:** {rede_selecionada}")
 
-    # Aplica filtro de município
-    filtered_df = ideb_df.copy()
-    if municipio_filter != "Todos":
-        # Buscar código do município
-        cities_df = data_loader.load_cities()
-        municipio_code = cities_df[cities_df["municipio"] == municipio_filter][
-            "ibge_code"
-        ].iloc[0]
-        filtered_df = filtered_df[filtered_df["CO_MUNICIPIO"] == municipio_code]
+    # Aplica filtros de rede, SRE e município
+    filtros = (rede_selecionada, sre_filter, municipio_filter)
+    valid_data = _dados_ideb(data_loader, data_loader.data_version, *filtros)
 
-    # Métricas IDEB
-    col1, col2, col3, col4 = st.columns(4)
+    _secao_metricas(valid_data)
+
+    # Gráficos de análise
+    if len(valid_data) > 0:
+        _secao_graficos(data_loader, filtros)
+        _secao_comparativo_rede(data_loader, filtros)
+        _secao_previsao(data_loader, filtros)
+
+        # Análise por SRE
+        if sre_filter == "Todas" and municipio_filter == "Todos":
+            _secao_sre(data_loader, rede_selecionada)
+
+        # Municípios com perfil semelhante ao selecionado
+        if municipio_filter != "Todos":
+            render_peer_comparison(
+                data_loader,
+                municipio_filter,
+                [rede_selecionada],
+                ["IDEB 2023", "IDEB − Meta", "Matrículas"],
+                "ideb",
+            )
 
-    # Remove valores nulos para cálculos
-    valid_data = filtered_df.dropna(subset=["VL_OBSERVADO_2023"])
+        render_data_export({"IDEB": valid_data}, "ideb", *filtros)
+    else:
+        st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
+
+    render_fragment_counter()
+
+
+def _secao_metricas(valid_data: pd.DataFrame):
+    """Métricas do IDEB para os registros filtrados."""
+    col1, col2, col3, col4 = st.columns(4)
 
     with col1:
         ideb_medio = valid_data["VL_OBSERVADO_2023"].mean()
@@ -95,138 +503,130 @@ def render_ideb_analysis(data_loader: DataLoader, rede_selecionada):
         else:
             st.metric("Diferença Média", "N/A")
 
-    # Gráficos de análise
-    if len(valid_data) > 0:
-        col1, col2 = st.columns(2)
 
-        with col1:
-            st.markdown("### 📊 IDEB vs Meta por Município")
+def _secao_graficos(data_loader: DataLoader, filtros: tuple):
+    """Dispersão IDEB vs meta e ranking dos municípios."""
+    data_version = data_loader.data_version
+    col1, col2 = st.columns(2)
 
-            # Prepara dados para o gráfico
-            chart_data = valid_data.copy()
-            chart_data["Status"] = chart_data["acima_meta"].map(
-                {True: "Acima da Meta", False: "Abaixo da Meta"}
-            )
+    with col1:
+        st.markdown("### 📊 IDEB vs Meta por Município")
 
-            fig = px.scatter(
-                chart_data,
-                x="VL_PROJECAO_2021",
-                y="VL_OBSERVADO_2023",
-                color="Status",
-                hover_data=["NO_MUNICIPIO", "REDE"],
-                title="IDEB Observado vs Meta",
-                template="plotly_white",
-                color_discrete_map={
-                    "Acima da Meta": "#2E8B57",
-                    "Abaixo da Meta": "#DC143C",
-                },
-            )
+        spec = _figura_ideb_vs_meta(data_loader, *filtros)
+        plotly_chart_spec(spec, use_container_width=True)
 
-            # Linha de igualdade (y = x)
-            min_val = min(
-                chart_data["VL_PROJECAO_2021"].min(),
-                chart_data["VL_OBSERVADO_2023"].min(),
-            )
-            max_val = max(
-                chart_data["VL_PROJECAO_2021"].max(),
-                chart_data["VL_OBSERVADO_2023"].max(),
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=[min_val, max_val],
-                    y=[min_val, max_val],
-                    mode="lines",
-                    line=dict(dash="dash", color="gray"),
-                    name="Meta = Observado",
-                    showlegend=True,
-                )
+    with col2:
+        st.markdown("### 🏆 Ranking dos Municípios")
+
+        tabelas = _tabelas_ideb(data_loader, data_version, *filtros)
+        ranking_display = tabelas["ranking"]
+
+        st.dataframe(ranking_display, use_container_width=True, hide_index=True)
+
+        _, sre, municipio = filtros
+        if municipio != "Todos" and len(ranking_display) > 0:
+            posicao = ranking_display["Posição"].iloc[0]
+            escopo = "da rede" if sre == "Todas" else f"da rede na SRE {sre}"
+            st.caption(
+                f"📍 {municipio} ocupa a {posicao}ª posição entre "
+                f"{tabelas['total_ranqueados']} municípios {escopo}."
             )
 
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-
-        with col2:
-            st.markdown("### 🏆 Ranking dos Municípios")
-
-            # Top 10 municípios por IDEB
-            ranking = valid_data.nlargest(10, "VL_OBSERVADO_2023")[
-                [
-                    "NO_MUNICIPIO",
-                    "REDE",
-                    "VL_OBSERVADO_2023",
-                    "VL_PROJECAO_2021",
-                    "acima_meta",
-                ]
-            ].round(2)
-
-            ranking["Status"] = ranking["acima_meta"].map({True: "✅", False: "❌"})
-            ranking_display = ranking[
-                ["NO_MUNICIPIO", "REDE", "VL_OBSERVADO_2023", "Status"]
-            ]
-            ranking_display.columns = ["Município", "Rede", "IDEB 2023", "Meta"]
 
-            st.dataframe(ranking_display, use_container_width=True, hide_index=True)
+def _secao_comparativo_rede(data_loader: DataLoader, filtros: tuple):
+    """Comparativo do IDEB por rede de ensino."""
+    tabelas = _tabelas_ideb(data_loader, data_loader.data_version, *filtros)
 
-        # Análise por rede
-        st.markdown("### 🔍 Comparativo por Rede de Ensino")
+    st.markdown("### 🔍 Comparativo por Rede de Ensino")
+    st.dataframe(tabelas["rede_analysis"], use_container_width=True)
 
-        rede_analysis = (
-            valid_data.groupby("REDE")
-            .agg(
-                {
-                    "VL_OBSERVADO_2023": ["mean", "count"],
-                    "VL_PROJECAO_2021": "mean",
-                    "acima_meta": "sum",
-                }
-            )
-            .round(3)
-        )
 
-        rede_analysis.columns = [
-            "IDEB_Médio",
-            "Qtd_Registros",
-            "Meta_Média",
-            "Acima_Meta",
-        ]
-        rede_analysis["Perc_Acima_Meta"] = (
-            rede_analysis["Acima_Meta"] / rede_analysis["Qtd_Registros"] * 100
-        ).round(1)
-        rede_analysis["Diferença"] = (
-            rede_analysis["IDEB_Médio"] - rede_analysis["Meta_Média"]
-        ).round(3)
-
-        st.dataframe(
-            rede_analysis[
-                [
-                    "IDEB_Médio",
-                    "Meta_Média",
-                    "Diferença",
-                    "Acima_Meta",
-                    "Perc_Acima_Meta",
-                ]
-            ],
-            use_container_width=True,
+def _secao_sre(data_loader: DataLoader, rede: str):
+    """IDEB por Superintendência Regional de Educação."""
+    st.markdown("### 🌍 Análise por SRE (Superintendência Regional de Educação)")
+
+    rollup = data_loader.get_sre_rollup(rede)
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        spec = _figura_sre(data_loader, rede)
+        if spec is not None:
+            plotly_chart_spec(spec, use_container_width=True)
+
+    with col2:
+        tabela = rollup[["municipios", "ideb_medio", "acima_meta"]].round(2)
+        tabela.index = tabela.index.astype(str)
+        tabela.columns = ["Municípios", "IDEB Médio", "Acima da Meta"]
+        st.dataframe(tabela, use_container_width=True)
+
+
+@instrumented_fragment("ideb.previsao")
+def _secao_previsao(data_loader: DataLoader, filtros: tuple):
+    """Projeção do IDEB e da meta nas próximas edições."""
+    st.markdown("### 🔮 Projeção do IDEB")
+
+    previsao_total = data_loader.get_ideb_forecast()
+    if previsao_total.empty:
+        st.info(
+            f"ℹ️ A projeção usa a série histórica do IDEB (ao menos {MIN_EDICOES} "
+            "edições por município), mas os dados carregados só têm a edição "
+            "mais recente. Reprocesse a planilha de divulgação do INEP com o "
+            "script de limpeza para incluir as edições anteriores."
         )
+        return
+
+    rede, sre, municipio = filtros
+    ano = st.selectbox(
+        "Edição projetada:",
+        sorted(previsao_total["ANO"].unique().tolist()),
+        key="ideb_previsao_ano",
+    )
+    previsao = _previsao_ideb(data_loader, data_loader.data_version, *filtros, ano)
+    if previsao.empty:
+        st.info("Nenhum município com histórico suficiente para os filtros.")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Séries Projetadas", len(previsao))
+    col2.metric(f"IDEB Projetado {ano}", f"{previsao['IDEB Projetado'].mean():.2f}")
+    col3.metric(f"Meta Projetada {ano}", f"{previsao['Meta Projetada'].mean():.2f}")
+    atingem = int((previsao["Situação"] == "Deve atingir").sum())
+    col4.metric(
+        "Devem Atingir a Meta",
+        f"{atingem}/{len(previsao)}",
+        f"{atingem / len(previsao) * 100:.1f}%",
+        help="Limite inferior do intervalo de 95% acima da meta projetada",
+    )
 
+    if municipio == "Todos":
+        spec = _figura_previsao_distribuicao(data_loader, rede, sre, ano)
     else:
-        st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
+        spec = _figura_previsao_municipio(data_loader, rede, municipio)
+    if spec:
+        plotly_chart_spec(spec, use_container_width=True)
 
-    # Informações sobre o IDEB
-    with st.expander("ℹ️ Sobre o IDEB"):
-        st.markdown(
-            """
-        **O que é o IDEB?**
-        
-        O Índice de Desenvolvimento da Educação Básica (IDEB) é um indicador de qualidade educacional 
-        que combina informações de desempenho em exames padronizados com informações sobre rendimento escolar.
-        
-        **Como é calculado:**
-        - **Desempenho**: Resultados da Prova Brasil/SAEB
-        - **Rendimento**: Taxa de aprovação escolar
-        - **Fórmula**: IDEB = Desempenho × Taxa de Aprovação
-        
-        **Interpretação:**
-        - **Escala**: 0 a 10 pontos
-        - **Meta**: Definida para cada município/escola
-        """
-        )
+    tabela = previsao.assign(
+        Diferença=(previsao["IDEB Projetado"] - previsao["Meta Projetada"]).round(1)
+    ).sort_values("Diferença")
+    st.dataframe(
+        tabela[
+            [
+                "NO_MUNICIPIO",
+                "Edições",
+                "Tendência",
+                "IDEB Projetado",
+                "Inferior",
+                "Superior",
+                "Meta Projetada",
+                "Diferença",
+                "Situação",
+            ]
+        ].rename(columns={"NO_MUNICIPIO": "Município"}),
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption(
+        "Tendência linear das edições observadas de cada município e rede "
+        "(variação por edição), com intervalo de previsão de 95%. A meta "
+        "projetada estende a trajetória das metas do INEP, publicadas até 2021."
+    )
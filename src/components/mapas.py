@@ -0,0 +1,242 @@
+"""
+Componente de mapas coropléticos por município.
+
+As geometrias não passam pelo servidor a cada interação: o gráfico aponta
+para a malha pré-simplificada servida como arquivo estático (veja
+``src/data/geometries.py``) e só os códigos IBGE e os valores mudam com os
+filtros. O nível de detalhe da malha acompanha o zoom: a UF inteira usa a
+malha mais simplificada e uma SRE, a mais detalhada.
+"""
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from src.components.data_export import render_data_export
+from src.data.data_loader import DataLoader
+from src.data.geometries import geometry_url, zoom_level
+from src.data.rates import weighted_rates
+from src.data.warmup import warmup_task
+from src.utils.figure_cache import cached_figure, plotly_chart_spec
+from src.utils.fragments import instrumented_fragment, render_fragment_counter
+from src.utils.tracing import traced
+
+# Indicador -> (base, coluna, formato do valor, escala de cores)
+INDICADORES = {
+    "IDEB 2023": ("ideb", "VL_OBSERVADO_2023", ".1f", "Blues"),
+    "IDEB 2023 − Meta": ("ideb", "DIFERENCA_META", "+.1f", "RdBu"),
+    "Matrículas": ("matriculas", "QT_MATRICULAS", ",.0f", "Purples"),
+    "Aprovação (%)": ("rendimento", "Taxa_Aprovacao", ".1f", "Greens"),
+    "Reprovação (%)": ("rendimento", "Taxa_Reprovacao", ".1f", "Oranges"),
+    "Evasão (%)": ("rendimento", "Taxa_Evasao", ".1f", "Reds"),
+}
+
+
+@traced("mapas.valores")
+@st.cache_data(show_spinner=False)
+def _valores_mapa(
+    _data_loader: DataLoader,
+    data_version: str,
+    rede: str,
+    indicador: str,
+    ano_filter: str,
+    sre_filter: str,
+) -> pd.DataFrame:
+    """Valor do indicador por município (NaN para municípios sem dado)."""
+    base, coluna, _, _ = INDICADORES[indicador]
+    microdados = _data_loader.load_microdados()
+    municipios = microdados[
+        ["CO_MUNICIPIO", "NO_MUNICIPIO", "SG_UF", "SRE"]
+    ].drop_duplicates("CO_MUNICIPIO")
+    if sre_filter != "Todas":
+        municipios = municipios[municipios["SRE"] == sre_filter]
+
+    if base == "ideb":
+        df = _data_loader.load_ideb_data()
+        df = df[df["REDE"] == rede].drop_duplicates("CO_MUNICIPIO")
+        valores = df.set_index("CO_MUNICIPIO")["VL_OBSERVADO_2023"]
+        if coluna == "DIFERENCA_META":
+            valores = valores - df.set_index("CO_MUNICIPIO")["VL_PROJECAO_2021"]
+    else:
+        df = microdados if base == "matriculas" else _data_loader.load_dados_serie()
+        df = df[df["REDE"] == rede]
+        if ano_filter != "Todos":
+            df = df[df["ANO_ESCOLAR"] == int(ano_filter.split("º")[0])]
+        if base == "matriculas":
+            valores = df.groupby("CO_MUNICIPIO")["QT_MATRICULAS"].sum()
+        else:
+            taxas = weighted_rates(df, [("CO_MUNICIPIO",)], decimals=1)
+            valores = taxas[("CO_MUNICIPIO",)].set_index("CO_MUNICIPIO")[coluna]
+
+    resultado = municipios[["CO_MUNICIPIO", "NO_MUNICIPIO", "SG_UF"]].copy()
+    resultado["VALOR"] = resultado["CO_MUNICIPIO"].map(valores).astype("float64")
+    return resultado.sort_values("CO_MUNICIPIO").reset_index(drop=True)
+
+
+def _malhas(valores: pd.DataFrame) -> tuple:
+    """(UF, URL da malha) das UFs exibidas, no nível de detalhe do zoom."""
+    nivel = zoom_level(len(valores))
+    malhas = ((uf, geometry_url(uf, nivel)) for uf in valores["SG_UF"].unique())
+    return tuple((uf, url) for uf, url in malhas if url is not None)
+
+
+@cached_figure("mapas", "coropletico")
+def _figura_mapa(
+    data_loader: DataLoader,
+    rede: str,
+    indicador: str,
+    ano_filter: str,
+    sre_filter: str,
+    malhas: tuple,
+):
+    """Mapa coroplético do indicador; um traço por UF, com a malha por URL."""
+    valores = _valores_mapa(
+        data_loader, data_loader.data_version, rede, indicador, ano_filter, sre_filter
+    )
+    _, _, formato, escala = INDICADORES[indicador]
+
+    fig = go.Figure()
+    for uf, url in malhas:
+        da_uf = valores[valores["SG_UF"] == uf]
+        sem_dados = da_uf["VALOR"].isna()
+        comum = dict(
+            geojson=url,
+            featureidkey="id",
+            marker_line_color="white",
+            marker_line_width=0.4,
+        )
+        if sem_dados.any():
+            fig.add_trace(
+                go.Choropleth(
+                    locations=da_uf.loc[sem_dados, "CO_MUNICIPIO"].astype(str),
+                    z=[0] * int(sem_dados.sum()),
+                    text=da_uf.loc[sem_dados, "NO_MUNICIPIO"],
+                    colorscale=[[0, "#d1d5db"], [1, "#d1d5db"]],
+                    showscale=False,
+                    hovertemplate="<b>%{text}</b><br>Sem dados<extra></extra>",
+                    **comum,
+                )
+            )
+        com_dados = da_uf[~sem_dados]
+        fig.add_trace(
+            go.Choropleth(
+                locations=com_dados["CO_MUNICIPIO"].astype(str),
+                z=com_dados["VALOR"],
+                text=com_dados["NO_MUNICIPIO"],
+                coloraxis="coloraxis",
+                hovertemplate=(
+                    f"<b>%{{text}}</b><br>{indicador}: %{{z:{formato}}}<extra></extra>"
+                ),
+                **comum,
+            )
+        )
+
+    if not fig.data:
+        return None
+
+    coloraxis = dict(colorscale=escala, colorbar=dict(title=indicador))
+    if indicador == "IDEB 2023 − Meta":
+        coloraxis["cmid"] = 0
+    fig.update_geos(fitbounds="locations", visible=False)
+    fig.update_layout(
+        coloraxis=coloraxis,
+        height=600,
+        margin=dict(l=0, r=0, t=10, b=0),
+        template="plotly_white",
+    )
+    return fig
+
+
+@warmup_task
+def _aquecer_mapas(data_loader: DataLoader, rede: str):
+    """Pré-calcula o mapa padrão (IDEB 2023 de todo o estado)."""
+    filtros = (rede, "IDEB 2023", "Todos", "Todas")
+    valores = _valores_mapa(data_loader, data_loader.data_version, *filtros)
+    malhas = _malhas(valores)
+    if malhas:
+        _figura_mapa(data_loader, *filtros, malhas)
+
+
+def render_mapas(data_loader: DataLoader, rede_selecionada: str):
+    """Renderiza a seção de mapas por município."""
+    st.markdown(
+        '<div class="section-header">🗺️ Mapas por Município</div>',
+        unsafe_allow_html=True,
+    )
+
+    _pagina_mapas(data_loader, rede_selecionada)
+
+
+@instrumented_fragment("mapas.filtros")
+def _pagina_mapas(data_loader: DataLoader, rede: str):
+    """Filtros do mapa; alterá-los reenvia só os valores, não as malhas."""
+    dados_serie_df = data_loader.load_dados_serie()
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        indicador = st.selectbox("Indicador:", list(INDICADORES), key="mapas_indicador")
+
+    with col2:
+        anos_disponiveis = sorted(dados_serie_df["ANO_ESCOLAR"].unique())
+        ano_filter = st.selectbox(
+            "Ano Escolar:",
+            ["Todos"] + [f"{ano}º ano" for ano in anos_disponiveis],
+            key="mapas_ano",
+            disabled=INDICADORES[indicador][0] == "ideb",
+            help="O IDEB é divulgado por rede, sem separação por série",
+        )
+        if INDICADORES[indicador][0] == "ideb":
+            ano_filter = "Todos"
+
+    with col3:
+        sre_filter = st.selectbox(
+            "SRE:", ["Todas"] + data_loader.get_sre_list(), key="mapas_sre"
+        )
+
+    filtros = (rede, indicador, ano_filter, sre_filter)
+    valores = _valores_mapa(data_loader, data_loader.data_version, *filtros)
+    if valores["VALOR"].isna().all():
+        st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
+        render_fragment_counter()
+        return
+
+    malhas = _malhas(valores)
+    if not malhas:
+        st.info(
+            """
+        🗺️ **Malhas municipais não encontradas.**
+
+        Gere as malhas simplificadas uma vez com:
+
+        `python data_cleaning/build_geometries.py --ufs ES`
+
+        (baixa a malha do IBGE na primeira execução) e recarregue a página.
+        """
+        )
+        render_fragment_counter()
+        return
+
+    spec = _figura_mapa(data_loader, *filtros, malhas)
+    if spec:
+        plotly_chart_spec(spec, use_container_width=True)
+
+    exibidos = valores.dropna(subset=["VALOR"])
+    _, coluna, formato, _ = INDICADORES[indicador]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Municípios com dados", f"{len(exibidos)} de {len(valores)}")
+    for col, titulo, linha in [
+        (col2, "Maior valor", exibidos.loc[exibidos["VALOR"].idxmax()]),
+        (col3, "Menor valor", exibidos.loc[exibidos["VALOR"].idxmin()]),
+    ]:
+        col.metric(titulo, f"{linha['VALOR']:{formato}}".replace(",", "."))
+        col.caption(linha["NO_MUNICIPIO"])
+
+    sem_malha = set(valores["SG_UF"]) - {uf for uf, _ in malhas}
+    if sem_malha:
+        st.caption(f"UFs sem malha gerada: {', '.join(sorted(sem_malha))}")
+
+    render_data_export(
+        {"Mapa": valores.rename(columns={"VALOR": coluna})}, "mapas", *filtros
+    )
+    render_fragment_counter()
@@ -6,6 +6,209 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 from src.data.data_loader import DataLoader
+from src.data.ranking import RankingIndex
+from src.data.table_index import TableIndex
+from src.data.warmup import warmup_task
+from src.components.data_export import render_data_export
+from src.components.paginated_table import render_paginated_table
+from src.utils.figure_cache import cached_figure, plotly_chart_spec
+from src.utils.fragments import instrumented_fragment, render_fragment_counter
+from src.utils.tracing import traced
+
+
+@traced("matriculas.filtro")
+@st.cache_data(show_spinner=False)
+def _dados_matriculas(
+    _data_loader: DataLoader,
+    data_version: str,
+    rede_filter: str,
+    ano_filter: str,
+    municipio_filter: str,
+) -> pd.DataFrame:
+    """Aplica os filtros da página aos microdados de matrículas."""
+    filtered_df = _data_loader.load_microdados()
+
+    if rede_filter != "Todas":
+        filtered_df = filtered_df[filtered_df["REDE"] == rede_filter]
+
+    if ano_filter != "Todos":
+        ano_numero = int(ano_filter.split("º")[0])
+        filtered_df = filtered_df[filtered_df["ANO_ESCOLAR"] == ano_numero]
+
+    if municipio_filter != "Todos":
+        municipio_code = _data_loader.get_municipio_code(municipio_filter)
+        filtered_df = filtered_df[filtered_df["CO_MUNICIPIO"] == municipio_code]
+
+    return filtered_df
+
+
+@traced("matriculas.ranking")
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _ranking_matriculas(
+    _data_loader: DataLoader, data_version: str, rede_filter: str, ano_filter: str
+) -> RankingIndex:
+    """Ranking de município e rede por matrículas, sem filtro de município."""
+    base_df = _dados_matriculas(
+        _data_loader, data_version, rede_filter, ano_filter, "Todos"
+    )
+    por_municipio = (
+        base_df.groupby(["NO_MUNICIPIO", "REDE"])["QT_MATRICULAS"].sum().reset_index()
+    )
+    return RankingIndex(por_municipio, "QT_MATRICULAS")
+
+
+@traced("matriculas.agregacao")
+@st.cache_data(show_spinner=False)
+def _agregados_matriculas(
+    _data_loader: DataLoader, data_version: str, *filtros: str
+) -> dict:
+    """Agregados da página de matrículas para os filtros informados."""
+    filtered_df = _dados_matriculas(_data_loader, data_version, *filtros)
+
+    matriculas_ano = (
+        filtered_df.groupby("ANO_ESCOLAR")["QT_MATRICULAS"].sum().reset_index()
+    )
+    matriculas_ano["ANO_ESCOLAR"] = matriculas_ano["ANO_ESCOLAR"].astype(str) + "º ano"
+
+    # Top 15 do ranking pré-calculado; com município, só as linhas dele
+    rede_filter, ano_filter, municipio_filter = filtros
+    ranking_index = _ranking_matriculas(
+        _data_loader, data_version, rede_filter, ano_filter
+    )
+    linhas = (
+        None
+        if municipio_filter == "Todos"
+        else ranking_index.rows_for(municipio_filter)
+    )
+    ranking_municipios = ranking_index.top(15, linhas)
+
+    # A SRE já vem anexada pelo DataLoader (sem junção com cities)
+    sre_analysis = (
+        filtered_df.groupby("SRE", observed=True)["QT_MATRICULAS"]
+        .sum()
+        .sort_values(ascending=False)
+    )
+
+    por_municipio = filtered_df.groupby("NO_MUNICIPIO")["QT_MATRICULAS"].sum()
+
+    return {
+        "registros": len(filtered_df),
+        "total_matriculas": filtered_df["QT_MATRICULAS"].sum(),
+        "total_municipios": filtered_df["NO_MUNICIPIO"].nunique(),
+        "maior_municipio": (
+            por_municipio.idxmax() if len(por_municipio) > 0 else "N/A"
+        ),
+        "matriculas_ano": matriculas_ano,
+        "matriculas_rede": filtered_df.groupby("REDE")["QT_MATRICULAS"].sum(),
+        "ranking_municipios": ranking_municipios,
+        "total_ranqueados": len(ranking_index),
+        "sre_analysis": sre_analysis,
+    }
+
+
+@traced("matriculas.tabela")
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _indice_tabela(
+    _data_loader: DataLoader, data_version: str, *filtros: str
+) -> TableIndex:
+    """Índice da tabela detalhada por município, rede e ano escolar."""
+    filtered_df = _dados_matriculas(_data_loader, data_version, *filtros)
+
+    tabela_detalhada = (
+        filtered_df.groupby(["NO_MUNICIPIO", "REDE", "ANO_ESCOLAR"])["QT_MATRICULAS"]
+        .sum()
+        .reset_index()
+    )
+    tabela_detalhada = tabela_detalhada.sort_values(
+        ["NO_MUNICIPIO", "REDE", "ANO_ESCOLAR"]
+    )
+    tabela_detalhada["ANO_ESCOLAR"] = (
+        tabela_detalhada["ANO_ESCOLAR"].astype(str) + "º ano"
+    )
+    tabela_detalhada.columns = ["Município", "Rede", "Ano Escolar", "Matrículas"]
+    return TableIndex(tabela_detalhada)
+
+
+@cached_figure("matriculas", "ano")
+def _figura_ano(data_loader: DataLoader, *filtros: str):
+    """Matrículas por ano escolar."""
+    agregados = _agregados_matriculas(data_loader, data_loader.data_version, *filtros)
+
+    fig = px.bar(
+        agregados["matriculas_ano"],
+        x="ANO_ESCOLAR",
+        y="QT_MATRICULAS",
+        title="Distribuição por Série",
+        template="plotly_white",
+        color="QT_MATRICULAS",
+        color_continuous_scale=["#1e3a8a", "#3b82f6", "#60a5fa", "#93c5fd"],
+    )
+    fig.update_layout(height=400, showlegend=False)
+    return fig
+
+
+@cached_figure("matriculas", "rede")
+def _figura_rede(data_loader: DataLoader, *filtros: str):
+    """Matrículas por rede de ensino."""
+    agregados = _agregados_matriculas(data_loader, data_loader.data_version, *filtros)
+    matriculas_rede = agregados["matriculas_rede"]
+
+    fig = px.pie(
+        values=matriculas_rede.values,
+        names=matriculas_rede.index,
+        title="Distribuição por Rede",
+        template="plotly_white",
+        hole=0.3,
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@cached_figure("matriculas", "ranking")
+def _figura_ranking(data_loader: DataLoader, *filtros: str):
+    """Top 15 municípios por matrículas."""
+    agregados = _agregados_matriculas(data_loader, data_loader.data_version, *filtros)
+
+    fig = px.bar(
+        agregados["ranking_municipios"],
+        x="QT_MATRICULAS",
+        y="NO_MUNICIPIO",
+        color="REDE",
+        orientation="h",
+        title="Top 15 Municípios",
+        template="plotly_white",
+        height=600,
+    )
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    return fig
+
+
+@cached_figure("matriculas", "sre")
+def _figura_sre(data_loader: DataLoader, *filtros: str):
+    """Matrículas por SRE."""
+    agregados = _agregados_matriculas(data_loader, data_loader.data_version, *filtros)
+    sre_analysis = agregados["sre_analysis"]
+
+    fig = px.bar(
+        x=sre_analysis.values,
+        y=sre_analysis.index,
+        orientation="h",
+        title="Matrículas por SRE",
+        template="plotly_white",
+    )
+    fig.update_layout(height=400, yaxis={"categoryorder": "total ascending"})
+    return fig
+
+
+@warmup_task
+def _aquecer_matriculas(data_loader: DataLoader, rede: str):
+    """Pré-calcula a visão padrão (sem filtros) da análise de matrículas."""
+    # A página tem filtro de rede próprio; a visão padrão independe da sidebar
+    filtros = ("Todas", "Todos", "Todos")
+    _agregados_matriculas(data_loader, data_loader.data_version, *filtros)
+    _indice_tabela(data_loader, data_loader.data_version, *filtros)
+    for figura in (_figura_ano, _figura_rede, _figura_ranking, _figura_sre):
+        figura(data_loader, *filtros)
 
 
 def render_matriculas_analysis(data_loader: DataLoader, rede_selecionada):
@@ -15,6 +218,36 @@ def render_matriculas_analysis(data_loader: DataLoader, rede_selecionada):
         unsafe_allow_html=True,
     )
 
+    _pagina_matriculas(data_loader)
+
+    # Informações sobre os dados
+    with st.expander("ℹ️ Sobre os Dados de Matrículas"):
+        st.markdown(
+            """
+        **Fonte dos Dados:**
+        - Censo Escolar 2023 (INEP/MEC)
+        - Anos Finais do Ensino Fundamental (6º ao 9º ano)
+        
+        **Cobertura:**
+        - Rede Estadual e Municipal
+        - Todos os municípios do Espírito Santo
+        
+        **Observações:**
+        - Dados referem-se ao ano letivo de 2023
+        - Inclui apenas escolas públicas
+        - Valores zerados podem indicar ausência de oferta da série no município/rede
+        """
+        )
+
+
+@instrumented_fragment("matriculas.filtros")
+def _pagina_matriculas(data_loader: DataLoader):
+    """
+    Filtros e seções da página.
+
+    Alterar um filtro reexecuta este fragmento inteiro (todas as seções),
+    mas não o script nem a sidebar.
+    """
     # Carrega dados
     microdados_df = data_loader.load_microdados()
 
@@ -43,25 +276,40 @@ def render_matriculas_analysis(data_loader: DataLoader, rede_selecionada):
         )
 
     # Aplica filtros
-    filtered_df = microdados_df.copy()
+    filtros = (rede_filter, ano_filter, municipio_filter)
+    agregados = _agregados_matriculas(data_loader, data_loader.data_version, *filtros)
 
-    if rede_filter != "Todas":
-        filtered_df = filtered_df[filtered_df["REDE"] == rede_filter]
+    _secao_metricas(agregados)
 
-    if ano_filter != "Todos":
-        ano_numero = int(ano_filter.split("º")[0])
-        filtered_df = filtered_df[filtered_df["ANO_ESCOLAR"] == ano_numero]
+    if agregados["registros"] > 0:
+        _secao_graficos(data_loader, filtros)
+        _secao_ranking(data_loader, filtros, agregados)
+        _secao_tabela(data_loader, filtros)
 
-    if municipio_filter != "Todos":
-        cities_df = data_loader.load_cities()
-        municipio_code = cities_df[cities_df["municipio"] == municipio_filter][
-            "ibge_code"
-        ].iloc[0]
-        filtered_df = filtered_df[filtered_df["CO_MUNICIPIO"] == municipio_code]
+        # Análise por SRE
+        if municipio_filter == "Todos":
+            _secao_sre(data_loader, filtros, agregados)
 
-    # Métricas de matrículas
-    total_matriculas = filtered_df["QT_MATRICULAS"].sum()
-    total_municipios = filtered_df["NO_MUNICIPIO"].nunique()
+        render_data_export(
+            {
+                "Matrículas": _dados_matriculas(
+                    data_loader, data_loader.data_version, *filtros
+                )
+            },
+            "matriculas",
+            *filtros,
+        )
+
+    else:
+        st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
+
+    render_fragment_counter()
+
+
+def _secao_metricas(agregados: dict):
+    """Métricas de matrículas para os filtros selecionados."""
+    total_matriculas = agregados["total_matriculas"]
+    total_municipios = agregados["total_municipios"]
     media_por_municipio = (
         total_matriculas / total_municipios if total_municipios > 0 else 0
     )
@@ -86,162 +334,63 @@ def render_matriculas_analysis(data_loader: DataLoader, rede_selecionada):
         )
 
     with col4:
-        if len(filtered_df) > 0:
-            maior_municipio = (
-                filtered_df.groupby("NO_MUNICIPIO")["QT_MATRICULAS"].sum().idxmax()
-            )
-            st.metric(
-                "Maior Município", maior_municipio, help="Município com mais matrículas"
-            )
-        else:
-            st.metric("Maior Município", "N/A")
-
-    if len(filtered_df) > 0:
-        # Gráficos de análise
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.markdown("### 📊 Matrículas por Ano Escolar")
-
-            matriculas_ano = (
-                filtered_df.groupby("ANO_ESCOLAR")["QT_MATRICULAS"].sum().reset_index()
-            )
-            matriculas_ano["ANO_ESCOLAR"] = (
-                matriculas_ano["ANO_ESCOLAR"].astype(str) + "º ano"
-            )
+        st.metric(
+            "Maior Município",
+            agregados["maior_municipio"],
+            help="Município com mais matrículas",
+        )
 
-            fig = px.bar(
-                matriculas_ano,
-                x="ANO_ESCOLAR",
-                y="QT_MATRICULAS",
-                title="Distribuição por Série",
-                template="plotly_white",
-                color="QT_MATRICULAS",
-                color_continuous_scale=["#1e3a8a", "#3b82f6", "#60a5fa", "#93c5fd"],
-            )
-            fig.update_layout(height=400, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
 
-        with col2:
-            st.markdown("### 🏫 Matrículas por Rede")
+def _secao_graficos(data_loader: DataLoader, filtros: tuple):
+    """Distribuição das matrículas por ano escolar e por rede."""
+    col1, col2 = st.columns(2)
 
-            matriculas_rede = filtered_df.groupby("REDE")["QT_MATRICULAS"].sum()
+    with col1:
+        st.markdown("### 📊 Matrículas por Ano Escolar")
+        plotly_chart_spec(_figura_ano(data_loader, *filtros), use_container_width=True)
 
-            fig = px.pie(
-                values=matriculas_rede.values,
-                names=matriculas_rede.index,
-                title="Distribuição por Rede",
-                template="plotly_white",
-                hole=0.3,
-            )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.markdown("### 🏫 Matrículas por Rede")
+        plotly_chart_spec(_figura_rede(data_loader, *filtros), use_container_width=True)
 
-        # Ranking de municípios
-        st.markdown("### 🏆 Ranking de Municípios por Matrículas")
 
-        ranking_municipios = (
-            filtered_df.groupby(["NO_MUNICIPIO", "REDE"])["QT_MATRICULAS"]
-            .sum()
-            .reset_index()
-        )
-        ranking_municipios = ranking_municipios.sort_values(
-            "QT_MATRICULAS", ascending=False
-        ).head(15)
-
-        fig = px.bar(
-            ranking_municipios,
-            x="QT_MATRICULAS",
-            y="NO_MUNICIPIO",
-            color="REDE",
-            orientation="h",
-            title="Top 15 Municípios",
-            template="plotly_white",
-            height=600,
-        )
-        fig.update_layout(yaxis={"categoryorder": "total ascending"})
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Tabela detalhada
-        st.markdown("### 📋 Dados Detalhados")
-
-        tabela_detalhada = (
-            filtered_df.groupby(["NO_MUNICIPIO", "REDE", "ANO_ESCOLAR"])[
-                "QT_MATRICULAS"
-            ]
-            .sum()
-            .reset_index()
-        )
-        tabela_detalhada = tabela_detalhada.sort_values(
-            ["NO_MUNICIPIO", "REDE", "ANO_ESCOLAR"]
-        )
-        tabela_detalhada["ANO_ESCOLAR"] = (
-            tabela_detalhada["ANO_ESCOLAR"].astype(str) + "º ano"
-        )
-        tabela_detalhada.columns = ["Município", "Rede", "Ano Escolar", "Matrículas"]
+def _secao_ranking(data_loader: DataLoader, filtros: tuple, agregados: dict):
+    """Ranking de municípios por matrículas."""
+    st.markdown("### 🏆 Ranking de Municípios por Matrículas")
+    plotly_chart_spec(_figura_ranking(data_loader, *filtros), use_container_width=True)
 
-        st.dataframe(
-            tabela_detalhada, use_container_width=True, hide_index=True, height=400
+    municipio = filtros[2]
+    if municipio != "Todos":
+        posicoes = ", ".join(
+            f"{row['Posição']}ª ({row['REDE']})"
+            for _, row in agregados["ranking_municipios"].iterrows()
         )
-
-        # Análise por SRE
-        if municipio_filter == "Todos":
-            st.markdown(
-                "### 🌍 Análise por SRE (Superintendência Regional de Educação)"
+        if posicoes:
+            st.caption(
+                f"📍 Posição de {municipio} entre {agregados['total_ranqueados']} "
+                f"pares município/rede: {posicoes}"
             )
 
-            cities_df = data_loader.load_cities()
-            df_with_sre = filtered_df.merge(
-                cities_df[["ibge_code", "sre"]],
-                left_on="CO_MUNICIPIO",
-                right_on="ibge_code",
-                how="left",
-            )
 
-            sre_analysis = (
-                df_with_sre.groupby("sre")["QT_MATRICULAS"]
-                .sum()
-                .sort_values(ascending=False)
-            )
+def _secao_tabela(data_loader: DataLoader, filtros: tuple):
+    """Tabela detalhada por município, rede e ano escolar."""
+    st.markdown("### 📋 Dados Detalhados")
+    indice = _indice_tabela(data_loader, data_loader.data_version, *filtros)
+    render_paginated_table(indice, key="matriculas_tabela")
 
-            col1, col2 = st.columns([2, 1])
 
-            with col1:
-                fig = px.bar(
-                    x=sre_analysis.values,
-                    y=sre_analysis.index,
-                    orientation="h",
-                    title="Matrículas por SRE",
-                    template="plotly_white",
-                )
-                fig.update_layout(
-                    height=400, yaxis={"categoryorder": "total ascending"}
-                )
-                st.plotly_chart(fig, use_container_width=True)
+def _secao_sre(data_loader: DataLoader, filtros: tuple, agregados: dict):
+    """Matrículas por Superintendência Regional de Educação."""
+    st.markdown("### 🌍 Análise por SRE (Superintendência Regional de Educação)")
 
-            with col2:
-                st.markdown("**Resumo por SRE:**")
-                for sre, matriculas in sre_analysis.head(5).items():
-                    st.write(f"• **{sre}**: {matriculas:,.0f}".replace(",", "."))
+    sre_analysis = agregados["sre_analysis"]
 
-    else:
-        st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
+    col1, col2 = st.columns([2, 1])
 
-    # Informações sobre os dados
-    with st.expander("ℹ️ Sobre os Dados de Matrículas"):
-        st.markdown(
-            """
-        **Fonte dos Dados:**
-        - Censo Escolar 2023 (INEP/MEC)
-        - Anos Finais do Ensino Fundamental (6º ao 9º ano)
-        
-        **Cobertura:**
-        - Rede Estadual e Municipal
-        - Todos os municípios do Espírito Santo
-        
-        **Observações:**
-        - Dados referem-se ao ano letivo de 2023
-        - Inclui apenas escolas públicas
-        - Valores zerados podem indicar ausência de oferta da série no município/rede
-        """
-        )
+    with col1:
+        plotly_chart_spec(_figura_sre(data_loader, *filtros), use_container_width=True)
+
+    with col2:
+        st.markdown("**Resumo por SRE:**")
+        for sre, matriculas in sre_analysis.head(5).items():
+            st.write(f"• **{sre}**: {matriculas:,.0f}".replace(",", "."))
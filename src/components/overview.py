@@ -5,8 +5,120 @@ Componente de visão geral do dashboard.
 import streamlit as st
 import plotly.express as px
 import pandas as pd
+from src.components.data_export import render_data_export
 from src.data.data_loader import DataLoader
+from src.data.rates import weighted_rates
+from src.data.warmup import warmup_task
+from src.utils.figure_cache import cached_figure, plotly_chart_spec
+from src.utils.chart_scale import RESUMO, bar_mode, top_n_with_others
 from src.utils.helpers import create_metric_card, format_number
+from src.utils.tracing import traced
+
+# Barras exibidas quando há municípios demais para um gráfico legível
+_TOP_MUNICIPIOS = 50
+
+
+@traced("overview.agregacao")
+@st.cache_data(show_spinner=False)
+def _dados_overview(_data_loader: DataLoader, data_version: str, rede: str) -> dict:
+    """Calcula métricas e agregados da visão geral para uma rede."""
+    ideb_df = _data_loader.load_ideb_data()
+    microdados_df = _data_loader.load_microdados()
+    dados_serie_df = _data_loader.load_dados_serie()
+
+    ideb_data = ideb_df[ideb_df["REDE"] == rede]
+    microdados_data = microdados_df[microdados_df["REDE"] == rede]
+    dados_serie_data = dados_serie_df[dados_serie_df["REDE"] == rede]
+
+    return {
+        "municipios": len(ideb_data["CO_MUNICIPIO"].unique()),
+        "matriculas": microdados_data["QT_MATRICULAS"].sum(),
+        "acima_meta": len(ideb_data[ideb_data["acima_meta"] == True]),
+        # Fração ponderada pelas matrículas, como na página de rendimento
+        "taxa_aprovacao": weighted_rates(dados_serie_data, [()])[()].at[
+            0, "Taxa_Aprovacao"
+        ]
+        / 100,
+        "ideb_validos": ideb_data.dropna(subset=["VL_OBSERVADO_2023"]),
+        "matriculas_serie": microdados_data.groupby("ANO_ESCOLAR")[
+            "QT_MATRICULAS"
+        ].sum(),
+    }
+
+
+@cached_figure("overview", "ideb_municipios")
+def _figura_ideb_municipios(data_loader: DataLoader, rede: str):
+    """Gráfico de IDEB por município (None se não houver dados)."""
+    dados = _dados_overview(data_loader, data_loader.data_version, rede)
+    ideb_validos = dados["ideb_validos"]
+    if len(ideb_validos) == 0:
+        return None
+
+    titulo = f"IDEB 2023 - {rede}"
+    if bar_mode(len(ideb_validos)) == RESUMO:
+        # Escala nacional: maiores IDEBs e a média dos demais municípios
+        municipios, valores, demais = top_n_with_others(
+            ideb_validos["NO_MUNICIPIO"].to_numpy(),
+            ideb_validos["VL_OBSERVADO_2023"].to_numpy(),
+            _TOP_MUNICIPIOS,
+            "Demais municípios (média)",
+        )
+        ideb_validos = pd.DataFrame(
+            {"NO_MUNICIPIO": municipios, "VL_OBSERVADO_2023": valores}
+        )
+        titulo += f" - {_TOP_MUNICIPIOS} maiores e média de outros {demais}"
+
+    fig = px.bar(
+        ideb_validos,
+        x="NO_MUNICIPIO",
+        y="VL_OBSERVADO_2023",
+        title=titulo,
+        template="plotly_white",
+        color="VL_OBSERVADO_2023",
+        color_continuous_scale=["#1e3a8a", "#3b82f6", "#60a5fa", "#93c5fd"],
+    )
+    fig.update_layout(
+        height=400,
+        showlegend=False,
+        xaxis_tickangle=-45,
+        coloraxis_colorbar=dict(title="IDEB"),
+    )
+    return fig
+
+
+@cached_figure("overview", "matriculas_serie")
+def _figura_matriculas_serie(data_loader: DataLoader, rede: str):
+    """Gráfico de matrículas por série (None se não houver dados)."""
+    dados = _dados_overview(data_loader, data_loader.data_version, rede)
+    matriculas_serie = dados["matriculas_serie"]
+    if len(matriculas_serie) == 0:
+        return None
+
+    fig = px.bar(
+        x=matriculas_serie.index,
+        y=matriculas_serie.values,
+        title=f"Matrículas por Série - {rede}",
+        template="plotly_white",
+        color=matriculas_serie.values,
+        color_continuous_scale=["#1e3a8a", "#3b82f6", "#60a5fa", "#93c5fd"],
+    )
+    fig.update_layout(
+        height=400,
+        showlegend=False,
+        xaxis_title="Série",
+        yaxis_title="Matrículas",
+        coloraxis_colorbar=dict(title="Matrículas"),
+    )
+    return fig
+
+
+@warmup_task
+def _aquecer_overview(data_loader: DataLoader, rede: str):
+    """Pré-calcula agregados e gráficos da visão geral."""
+    data_version = data_loader.data_version
+    _dados_overview(data_loader, data_version, rede)
+    _figura_ideb_municipios(data_loader, rede)
+    _figura_matriculas_serie(data_loader, rede)
 
 
 def render_overview(data_loader: DataLoader, rede_selecionada):
@@ -16,22 +128,14 @@ def render_overview(data_loader: DataLoader, rede_selecionada):
         unsafe_allow_html=True,
     )
 
-    # Carrega dados filtrados por rede
-    ideb_data = data_loader.load_ideb_data()[
-        data_loader.load_ideb_data()["REDE"] == rede_selecionada
-    ]
-    microdados_data = data_loader.load_microdados()[
-        data_loader.load_microdados()["REDE"] == rede_selecionada
-    ]
-    dados_serie_data = data_loader.load_dados_serie()[
-        data_loader.load_dados_serie()["REDE"] == rede_selecionada
-    ]
-
-    # Calcula estatísticas filtradas
-    municipios_filtrados = len(ideb_data["CO_MUNICIPIO"].unique())
-    matriculas_filtradas = microdados_data["QT_MATRICULAS"].sum()
-    municipios_acima_meta = len(ideb_data[ideb_data["acima_meta"] == True])
-    taxa_aprovacao_media = dados_serie_data["TAXA_APROVACAO"].mean()
+    # Carrega agregados filtrados por rede
+    data_version = data_loader.data_version
+    dados = _dados_overview(data_loader, data_version, rede_selecionada)
+
+    municipios_filtrados = dados["municipios"]
+    matriculas_filtradas = dados["matriculas"]
+    municipios_acima_meta = dados["acima_meta"]
+    taxa_aprovacao_media = dados["taxa_aprovacao"]
 
     # Mostra informação sobre o filtro
     st.info(f"📊 **Dados filtrados para:** {rede_selecionada}")
@@ -81,52 +185,19 @@ def render_overview(data_loader: DataLoader, rede_selecionada):
 
     with col1:
         st.markdown("### 🎯 IDEB por Município")
-        # Remove valores nulos para o gráfico
-        ideb_validos = ideb_data.dropna(subset=["VL_OBSERVADO_2023"])
-
-        if len(ideb_validos) > 0:
-            fig = px.bar(
-                ideb_validos,
-                x="NO_MUNICIPIO",
-                y="VL_OBSERVADO_2023",
-                title=f"IDEB 2023 - {rede_selecionada}",
-                template="plotly_white",
-                color="VL_OBSERVADO_2023",
-                color_continuous_scale=["#1e3a8a", "#3b82f6", "#60a5fa", "#93c5fd"],
-            )
-            fig.update_layout(
-                height=400,
-                showlegend=False,
-                xaxis_tickangle=-45,
-                coloraxis_colorbar=dict(title="IDEB"),
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        spec = _figura_ideb_municipios(data_loader, rede_selecionada)
+
+        if spec is not None:
+            plotly_chart_spec(spec, use_container_width=True)
         else:
             st.warning("Não há dados de IDEB disponíveis para esta rede.")
 
     with col2:
         st.markdown("### 📈 Matrículas por Série")
-        if len(microdados_data) > 0:
-            matriculas_serie = microdados_data.groupby("ANO_ESCOLAR")[
-                "QT_MATRICULAS"
-            ].sum()
-
-            fig = px.bar(
-                x=matriculas_serie.index,
-                y=matriculas_serie.values,
-                title=f"Matrículas por Série - {rede_selecionada}",
-                template="plotly_white",
-                color=matriculas_serie.values,
-                color_continuous_scale=["#1e3a8a", "#3b82f6", "#60a5fa", "#93c5fd"],
-            )
-            fig.update_layout(
-                height=400,
-                showlegend=False,
-                xaxis_title="Série",
-                yaxis_title="Matrículas",
-                coloraxis_colorbar=dict(title="Matrículas"),
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        spec = _figura_matriculas_serie(data_loader, rede_selecionada)
+
+        if spec is not None:
+            plotly_chart_spec(spec, use_container_width=True)
         else:
             st.warning("Não há dados de matrículas disponíveis para esta rede.")
 
@@ -172,3 +243,15 @@ def render_overview(data_loader: DataLoader, rede_selecionada):
     evasão e aprovação escolar, e comparar o desempenho entre diferentes municípios da mesma rede.
     """
     )
+
+    # Registros das três bases para a rede selecionada
+    tabelas = {
+        "IDEB": data_loader.load_ideb_data(),
+        "Matrículas": data_loader.load_microdados(),
+        "Rendimento": data_loader.load_dados_serie(),
+    }
+    render_data_export(
+        {rotulo: df[df["REDE"] == rede_selecionada] for rotulo, df in tabelas.items()},
+        "visao_geral",
+        rede_selecionada,
+    )
@@ -0,0 +1,97 @@
+"""
+Tabela paginada no servidor.
+
+Apenas as linhas da página atual são enviadas ao navegador. A busca e a
+ordenação são feitas sobre um ``TableIndex``; os botões "Anterior" e
+"Próxima" trocam a página exibida, sem reexecutar o restante da página.
+"""
+
+import streamlit as st
+
+from src.data.table_index import TableIndex
+from src.utils.fragments import instrumented_fragment
+from src.utils.settings import TABLE_PAGE_SIZE
+
+_SEM_ORDENACAO = "(ordem padrão)"
+
+
+@instrumented_fragment("tabela.paginada")
+def render_paginated_table(
+    index: TableIndex, key: str, page_size: int = TABLE_PAGE_SIZE, height: int = 400
+):
+    """
+    Renderiza uma tabela com busca, ordenação e paginação.
+
+    Args:
+        index: Índice da tabela completa
+        key: Prefixo único das chaves dos widgets
+        page_size: Linhas de cada página
+        height: Altura da área de rolagem da tabela
+    """
+    col1, col2, col3 = st.columns([3, 2, 1])
+
+    with col1:
+        busca = st.text_input(
+            "Buscar:", key=f"{key}_busca", placeholder="Digite para filtrar..."
+        )
+
+    with col2:
+        ordenar_por = st.selectbox(
+            "Ordenar por:", [_SEM_ORDENACAO] + index.columns, key=f"{key}_ordem"
+        )
+
+    with col3:
+        decrescente = st.toggle("Decrescente", key=f"{key}_desc")
+
+    # Nova consulta (ou nova tabela) volta à primeira página
+    assinatura = (id(index), busca, ordenar_por, decrescente)
+    pagina_key = f"{key}_pagina"
+    if st.session_state.get(f"{key}_assinatura") != assinatura:
+        st.session_state[f"{key}_assinatura"] = assinatura
+        st.session_state[pagina_key] = 0
+
+    inicio = st.session_state[pagina_key] * page_size
+    pagina, total = index.query(
+        search=busca,
+        sort_by=None if ordenar_por == _SEM_ORDENACAO else ordenar_por,
+        ascending=not decrescente,
+        offset=inicio,
+        limit=page_size,
+    )
+    paginas = max(1, -(-total // page_size))
+
+    st.dataframe(pagina, use_container_width=True, hide_index=True, height=height)
+
+    col1, col2, col3 = st.columns([4, 1, 1])
+    with col1:
+        if total:
+            texto = (
+                f"Registros {inicio + 1:,}–{inicio + len(pagina):,} de {total:,} "
+                f"(página {inicio // page_size + 1:,} de {paginas:,})"
+            )
+        else:
+            texto = "Nenhum registro encontrado"
+        st.caption(texto.replace(",", "."))
+    with col2:
+        st.button(
+            "⬅️ Anterior",
+            key=f"{key}_anterior",
+            on_click=_mudar_pagina,
+            args=(pagina_key, -1),
+            disabled=inicio == 0,
+            use_container_width=True,
+        )
+    with col3:
+        st.button(
+            "Próxima ➡️",
+            key=f"{key}_proxima",
+            on_click=_mudar_pagina,
+            args=(pagina_key, 1),
+            disabled=inicio + len(pagina) >= total,
+            use_container_width=True,
+        )
+
+
+def _mudar_pagina(pagina_key: str, passo: int):
+    """Avança ou volta uma página."""
+    st.session_state[pagina_key] = max(0, st.session_state[pagina_key] + passo)
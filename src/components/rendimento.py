@@ -7,6 +7,261 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from src.data.data_loader import DataLoader
+from src.data.ranking import RankingIndex
+from src.data.rates import RATE_COLUMNS, weighted_rates
+from src.data.table_index import TableIndex
+from src.data.warmup import warmup_task
+from src.components.data_export import render_data_export
+from src.components.paginated_table import render_paginated_table
+from src.components.semelhantes import render_peer_comparison
+from src.utils.figure_cache import cached_figure, plotly_chart_spec
+from src.utils.fragments import instrumented_fragment, render_fragment_counter
+from src.utils.tracing import traced
+
+# Agrupamentos exibidos na página, calculados juntos pelo kernel de taxas
+AGRUPAMENTOS = [
+    ("ANO_ESCOLAR",),
+    ("REDE",),
+    ("SRE",),
+    ("NO_MUNICIPIO", "REDE"),
+    (),
+]
+TAXAS = list(RATE_COLUMNS)
+
+
+@traced("rendimento.filtro")
+@st.cache_data(show_spinner=False)
+def _dados_rendimento(
+    _data_loader: DataLoader,
+    data_version: str,
+    rede_filter: str,
+    ano_filter: str,
+    sre_filter: str,
+    municipio_filter: str,
+) -> pd.DataFrame:
+    """Aplica os filtros da página aos dados por série."""
+    filtered_df = _data_loader.load_dados_serie()
+
+    if rede_filter != "Todas":
+        filtered_df = filtered_df[filtered_df["REDE"] == rede_filter]
+
+    if ano_filter != "Todos":
+        ano_numero = int(ano_filter.split("º")[0])
+        filtered_df = filtered_df[filtered_df["ANO_ESCOLAR"] == ano_numero]
+
+    if sre_filter != "Todas":
+        filtered_df = filtered_df[filtered_df["SRE"] == sre_filter]
+
+    if municipio_filter != "Todos":
+        municipio_code = _data_loader.get_municipio_code(municipio_filter)
+        filtered_df = filtered_df[filtered_df["CO_MUNICIPIO"] == municipio_code]
+
+    return filtered_df
+
+
+@traced("rendimento.taxas")
+@st.cache_data(show_spinner=False)
+def _taxas_rendimento(
+    _data_loader: DataLoader, data_version: str, *filtros: str
+) -> dict:
+    """Taxas ponderadas de todos os agrupamentos da página, em uma passada."""
+    filtered_df = _dados_rendimento(_data_loader, data_version, *filtros)
+    return weighted_rates(filtered_df, AGRUPAMENTOS)
+
+
+@traced("rendimento.ranking")
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _ranking_rendimento(
+    _data_loader: DataLoader,
+    data_version: str,
+    rede_filter: str,
+    ano_filter: str,
+    sre_filter: str,
+) -> RankingIndex:
+    """Ranking de município e rede pela aprovação, sem filtro de município."""
+    taxas = _taxas_rendimento(
+        _data_loader, data_version, rede_filter, ano_filter, sre_filter, "Todos"
+    )
+    por_municipio = taxas[("NO_MUNICIPIO", "REDE")].round({"Taxa_Aprovacao": 1})
+    # Só entram municípios com pelo menos 10 matrículas
+    return RankingIndex(
+        por_municipio,
+        "Taxa_Aprovacao",
+        eligible=por_municipio["QT_MATRICULAS"].to_numpy() >= 10,
+    )
+
+
+@traced("rendimento.agregacao")
+@st.cache_data(show_spinner=False)
+def _agregados_rendimento(
+    _data_loader: DataLoader, data_version: str, *filtros: str
+) -> dict:
+    """Taxas médias e agregados da página de rendimento."""
+    filtered_df = _dados_rendimento(_data_loader, data_version, *filtros)
+    taxas = _taxas_rendimento(_data_loader, data_version, *filtros)
+
+    # Médias ponderadas pelas matrículas (sem matrículas, taxas zeradas)
+    total = taxas[()].fillna(0).iloc[0]
+
+    rendimento_ano = taxas[("ANO_ESCOLAR",)].copy()
+    rendimento_ano["ANO_ESCOLAR"] = rendimento_ano["ANO_ESCOLAR"].astype(str) + "º ano"
+
+    comp_rede = taxas[("REDE",)].round({taxa: 1 for taxa in TAXAS})
+
+    # Top 15 do ranking pré-calculado; com município, só as linhas dele
+    rede_filter, ano_filter, sre_filter, municipio_filter = filtros
+    ranking_index = _ranking_rendimento(
+        _data_loader, data_version, rede_filter, ano_filter, sre_filter
+    )
+    linhas = (
+        None
+        if municipio_filter == "Todos"
+        else ranking_index.rows_for(municipio_filter)
+    )
+    ranking_municipios = ranking_index.top(15, linhas)
+
+    ranking_display = ranking_municipios[
+        ["Posição", "NO_MUNICIPIO", "REDE", "Taxa_Aprovacao", "QT_MATRICULAS"]
+    ].copy()
+    ranking_display.columns = [
+        "Posição",
+        "Município",
+        "Rede",
+        "Taxa Aprovação (%)",
+        "Matrículas",
+    ]
+
+    return {
+        "registros": len(filtered_df),
+        "total_matriculas": total["QT_MATRICULAS"],
+        "taxa_aprovacao": total["Taxa_Aprovacao"],
+        "taxa_reprovacao": total["Taxa_Reprovacao"],
+        "taxa_evasao": total["Taxa_Evasao"],
+        "rendimento_ano": rendimento_ano,
+        "comp_rede": comp_rede,
+        "comp_sre": taxas[("SRE",)].round({taxa: 1 for taxa in TAXAS}),
+        "ranking": ranking_display,
+        "total_ranqueados": len(ranking_index),
+    }
+
+
+@traced("rendimento.tabela")
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _indice_tabela(
+    _data_loader: DataLoader, data_version: str, *filtros: str
+) -> TableIndex:
+    """Índice da tabela detalhada com todos os indicadores por município."""
+    taxas = _taxas_rendimento(_data_loader, data_version, *filtros)
+    tabela_detalhada = taxas[("NO_MUNICIPIO", "REDE")].round({t: 1 for t in TAXAS})
+
+    tabela_display = tabela_detalhada[
+        [
+            "NO_MUNICIPIO",
+            "REDE",
+            "QT_MATRICULAS",
+            "Taxa_Aprovacao",
+            "Taxa_Reprovacao",
+            "Taxa_Evasao",
+        ]
+    ]
+    tabela_display.columns = [
+        "Município",
+        "Rede",
+        "Matrículas",
+        "Aprovação (%)",
+        "Reprovação (%)",
+        "Evasão (%)",
+    ]
+    return TableIndex(tabela_display)
+
+
+def _barras_taxas(x, df: pd.DataFrame, **layout) -> go.Figure:
+    """Gráfico de barras agrupadas com as três taxas de rendimento."""
+    fig = go.Figure()
+
+    for coluna, nome, cor in [
+        ("Taxa_Aprovacao", "Aprovação", "#2E8B57"),
+        ("Taxa_Reprovacao", "Reprovação", "#DC143C"),
+        ("Taxa_Evasao", "Evasão", "#FF8C00"),
+    ]:
+        fig.add_trace(go.Bar(x=x, y=df[coluna], name=nome, marker_color=cor))
+
+    fig.update_layout(
+        barmode="group",
+        height=400,
+        template="plotly_white",
+        yaxis_title="Percentual (%)",
+        **layout,
+    )
+    return fig
+
+
+@cached_figure("rendimento", "pizza")
+def _figura_pizza(data_loader: DataLoader, *filtros: str):
+    """Composição do rendimento (aprovação, reprovação e evasão)."""
+    agregados = _agregados_rendimento(data_loader, data_loader.data_version, *filtros)
+
+    labels = ["Aprovação", "Reprovação", "Evasão"]
+    values = [
+        agregados["taxa_aprovacao"],
+        agregados["taxa_reprovacao"],
+        agregados["taxa_evasao"],
+    ]
+    colors = ["#2E8B57", "#DC143C", "#FF8C00"]
+
+    fig = go.Figure(
+        data=[go.Pie(labels=labels, values=values, hole=0.3, marker_colors=colors)]
+    )
+    fig.update_layout(
+        title="Distribuição do Rendimento (%)",
+        height=400,
+        template="plotly_white",
+    )
+    return fig
+
+
+@cached_figure("rendimento", "ano")
+def _figura_ano(data_loader: DataLoader, *filtros: str):
+    """Taxas de rendimento por ano escolar."""
+    agregados = _agregados_rendimento(data_loader, data_loader.data_version, *filtros)
+    rendimento_ano = agregados["rendimento_ano"]
+    return _barras_taxas(
+        rendimento_ano["ANO_ESCOLAR"], rendimento_ano, title="Taxas por Série (%)"
+    )
+
+
+@cached_figure("rendimento", "rede")
+def _figura_rede(data_loader: DataLoader, *filtros: str):
+    """Comparativo das taxas de rendimento por rede."""
+    agregados = _agregados_rendimento(data_loader, data_loader.data_version, *filtros)
+    comp_rede = agregados["comp_rede"]
+    return _barras_taxas(
+        comp_rede["REDE"], comp_rede, title="Comparativo de Rendimento por Rede"
+    )
+
+
+@cached_figure("rendimento", "sre")
+def _figura_sre(data_loader: DataLoader, *filtros: str):
+    """Taxas de rendimento por SRE."""
+    agregados = _agregados_rendimento(data_loader, data_loader.data_version, *filtros)
+    comp_sre = agregados["comp_sre"]
+    return _barras_taxas(
+        comp_sre["SRE"].astype(str),
+        comp_sre,
+        title="Rendimento por SRE",
+        xaxis_tickangle=-45,
+    )
+
+
+@warmup_task
+def _aquecer_rendimento(data_loader: DataLoader, rede: str):
+    """Pré-calcula a visão padrão (sem filtros) da análise de rendimento."""
+    # A página tem filtro de rede próprio; a visão padrão independe da sidebar
+    filtros = ("Todas", "Todos", "Todas", "Todos")
+    _agregados_rendimento(data_loader, data_loader.data_version, *filtros)
+    _indice_tabela(data_loader, data_loader.data_version, *filtros)
+    for figura in (_figura_pizza, _figura_ano, _figura_rede, _figura_sre):
+        figura(data_loader, *filtros)
 
 
 def render_rendimento_analysis(data_loader: DataLoader, rede_selecionada):
@@ -16,11 +271,46 @@ def render_rendimento_analysis(data_loader: DataLoader, rede_selecionada):
         unsafe_allow_html=True,
     )
 
+    _pagina_rendimento(data_loader)
+
+    # Informações sobre rendimento escolar
+    with st.expander("ℹ️ Sobre os Indicadores de Rendimento"):
+        st.markdown(
+            """
+        **Definições:**
+        
+        - **Taxa de Aprovação**: Percentual de alunos aprovados para a próxima série
+        - **Taxa de Reprovação**: Percentual de alunos retidos na mesma série
+        - **Taxa de Evasão**: Percentual de alunos que abandonaram a escola
+        
+        **Importância:**
+        - Indicadores essenciais para o cálculo do IDEB
+        - Refletem a eficiência do sistema educacional
+        - Influenciam diretamente na qualidade da educação
+        
+        **Meta Nacional:**
+        - Reduzir as taxas de reprovação e evasão
+        - Aumentar a taxa de aprovação com qualidade
+        - Atingir fluxo escolar adequado (aprovação próxima a 100%)
+        
+        **Fonte:** Censo Escolar 2023 - INEP/MEC
+        """
+        )
+
+
+@instrumented_fragment("rendimento.filtros")
+def _pagina_rendimento(data_loader: DataLoader):
+    """
+    Filtros e seções da página.
+
+    Alterar um filtro reexecuta este fragmento inteiro (todas as seções),
+    mas não o script nem a sidebar.
+    """
     # Carrega dados
     dados_serie_df = data_loader.load_dados_serie()
 
     # Filtros
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
 
     with col1:
         rede_filter = st.selectbox(
@@ -38,372 +328,175 @@ def render_rendimento_analysis(data_loader: DataLoader, rede_selecionada):
         )
 
     with col3:
-        municipios = data_loader.get_municipios_list()
+        sre_filter = st.selectbox(
+            "SRE:", ["Todas"] + data_loader.get_sre_list(), key="rendimento_sre"
+        )
+
+    with col4:
+        municipios = data_loader.get_municipios_list(sre_filter)
         municipio_filter = st.selectbox(
             "Município:", ["Todos"] + municipios, key="rendimento_municipio"
         )
 
     # Aplica filtros
-    filtered_df = dados_serie_df.copy()
+    filtros = (rede_filter, ano_filter, sre_filter, municipio_filter)
+    agregados = _agregados_rendimento(data_loader, data_loader.data_version, *filtros)
 
-    if rede_filter != "Todas":
-        filtered_df = filtered_df[filtered_df["REDE"] == rede_filter]
+    if agregados["registros"] > 0:
+        _secao_metricas(agregados)
+        _secao_graficos(data_loader, filtros)
 
-    if ano_filter != "Todos":
-        ano_numero = int(ano_filter.split("º")[0])
-        filtered_df = filtered_df[filtered_df["ANO_ESCOLAR"] == ano_numero]
+        # Análise comparativa por rede
+        if rede_filter == "Todas":
+            _secao_comparativo_rede(data_loader, filtros, agregados)
 
-    if municipio_filter != "Todos":
-        cities_df = data_loader.load_cities()
-        municipio_code = cities_df[cities_df["municipio"] == municipio_filter][
-            "ibge_code"
-        ].iloc[0]
-        filtered_df = filtered_df[filtered_df["CO_MUNICIPIO"] == municipio_code]
+        # Análise por SRE
+        if sre_filter == "Todas" and municipio_filter == "Todos":
+            _secao_sre(data_loader, filtros, agregados)
 
-    if len(filtered_df) > 0:
-        # Calcula médias ponderadas pelas matrículas
-        total_matriculas = filtered_df["QT_MATRICULAS"].sum()
+        _secao_ranking(agregados)
+        _secao_tabela(data_loader, filtros)
 
-        if total_matriculas > 0:
-            taxa_aprovacao_media = (
-                filtered_df["APROVADOS_ABSOLUTOS"].sum() / total_matriculas * 100
-            )
-            taxa_reprovacao_media = (
-                filtered_df["REPROVADOS_ABSOLUTOS"].sum() / total_matriculas * 100
+        # Municípios semelhantes, em cada rede do filtro
+        if municipio_filter != "Todos":
+            redes = (
+                [rede_filter]
+                if rede_filter != "Todas"
+                else sorted(dados_serie_df["REDE"].unique())
             )
-            taxa_evasao_media = (
-                filtered_df["EVASAO_ABSOLUTA"].sum() / total_matriculas * 100
+            render_peer_comparison(
+                data_loader,
+                municipio_filter,
+                redes,
+                ["Aprovação", "Reprovação", "Evasão", "Matrículas"],
+                "rendimento",
             )
-        else:
-            taxa_aprovacao_media = taxa_reprovacao_media = taxa_evasao_media = 0
-
-        # Métricas de rendimento
-        col1, col2, col3, col4 = st.columns(4)
 
-        with col1:
-            st.metric(
-                "Taxa de Aprovação",
-                f"{taxa_aprovacao_media:.1f}%",
-                help="Percentual de alunos aprovados",
-            )
+        render_data_export(
+            {
+                "Rendimento": _dados_rendimento(
+                    data_loader, data_loader.data_version, *filtros
+                )
+            },
+            "rendimento",
+            *filtros,
+        )
 
-        with col2:
-            st.metric(
-                "Taxa de Reprovação",
-                f"{taxa_reprovacao_media:.1f}%",
-                help="Percentual de alunos reprovados",
-            )
+    else:
+        st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
 
-        with col3:
-            st.metric(
-                "Taxa de Evasão",
-                f"{taxa_evasao_media:.1f}%",
-                help="Percentual de alunos evadidos",
-            )
+    render_fragment_counter()
 
-        with col4:
-            st.metric(
-                "Total de Matrículas",
-                f"{total_matriculas:,.0f}".replace(",", "."),
-                help="Total de matrículas analisadas",
-            )
 
-        # Gráficos de análise
-        col1, col2 = st.columns(2)
+def _secao_metricas(agregados: dict):
+    """Métricas de rendimento ponderadas pelas matrículas."""
+    col1, col2, col3, col4 = st.columns(4)
 
-        with col1:
-            st.markdown("### 📊 Composição do Rendimento")
+    with col1:
+        st.metric(
+            "Taxa de Aprovação",
+            f"{agregados['taxa_aprovacao']:.1f}%",
+            help="Percentual de alunos aprovados",
+        )
 
-            labels = ["Aprovação", "Reprovação", "Evasão"]
-            values = [taxa_aprovacao_media, taxa_reprovacao_media, taxa_evasao_media]
-            colors = ["#2E8B57", "#DC143C", "#FF8C00"]
+    with col2:
+        st.metric(
+            "Taxa de Reprovação",
+            f"{agregados['taxa_reprovacao']:.1f}%",
+            help="Percentual de alunos reprovados",
+        )
 
-            fig = go.Figure(
-                data=[
-                    go.Pie(labels=labels, values=values, hole=0.3, marker_colors=colors)
-                ]
-            )
+    with col3:
+        st.metric(
+            "Taxa de Evasão",
+            f"{agregados['taxa_evasao']:.1f}%",
+            help="Percentual de alunos evadidos",
+        )
 
-            fig.update_layout(
-                title="Distribuição do Rendimento (%)",
-                height=400,
-                template="plotly_white",
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-        with col2:
-            st.markdown("### 📈 Rendimento por Ano Escolar")
-
-            rendimento_ano = (
-                filtered_df.groupby("ANO_ESCOLAR")
-                .agg(
-                    {
-                        "QT_MATRICULAS": "sum",
-                        "APROVADOS_ABSOLUTOS": "sum",
-                        "REPROVADOS_ABSOLUTOS": "sum",
-                        "EVASAO_ABSOLUTA": "sum",
-                    }
-                )
-                .reset_index()
-            )
+    with col4:
+        st.metric(
+            "Total de Matrículas",
+            f"{agregados['total_matriculas']:,.0f}".replace(",", "."),
+            help="Total de matrículas analisadas",
+        )
 
-            # Calcula percentuais
-            rendimento_ano["Taxa_Aprovacao"] = (
-                rendimento_ano["APROVADOS_ABSOLUTOS"]
-                / rendimento_ano["QT_MATRICULAS"]
-                * 100
-            )
-            rendimento_ano["Taxa_Reprovacao"] = (
-                rendimento_ano["REPROVADOS_ABSOLUTOS"]
-                / rendimento_ano["QT_MATRICULAS"]
-                * 100
-            )
-            rendimento_ano["Taxa_Evasao"] = (
-                rendimento_ano["EVASAO_ABSOLUTA"]
-                / rendimento_ano["QT_MATRICULAS"]
-                * 100
-            )
 
-            rendimento_ano["ANO_ESCOLAR"] = (
-                rendimento_ano["ANO_ESCOLAR"].astype(str) + "º ano"
-            )
+def _secao_graficos(data_loader: DataLoader, filtros: tuple):
+    """Composição do rendimento e taxas por ano escolar."""
+    col1, col2 = st.columns(2)
 
-            fig = go.Figure()
+    with col1:
+        st.markdown("### 📊 Composição do Rendimento")
+        plotly_chart_spec(
+            _figura_pizza(data_loader, *filtros), use_container_width=True
+        )
 
-            fig.add_trace(
-                go.Bar(
-                    x=rendimento_ano["ANO_ESCOLAR"],
-                    y=rendimento_ano["Taxa_Aprovacao"],
-                    name="Aprovação",
-                    marker_color="#2E8B57",
-                )
-            )
+    with col2:
+        st.markdown("### 📈 Rendimento por Ano Escolar")
+        plotly_chart_spec(_figura_ano(data_loader, *filtros), use_container_width=True)
 
-            fig.add_trace(
-                go.Bar(
-                    x=rendimento_ano["ANO_ESCOLAR"],
-                    y=rendimento_ano["Taxa_Reprovacao"],
-                    name="Reprovação",
-                    marker_color="#DC143C",
-                )
-            )
 
-            fig.add_trace(
-                go.Bar(
-                    x=rendimento_ano["ANO_ESCOLAR"],
-                    y=rendimento_ano["Taxa_Evasao"],
-                    name="Evasão",
-                    marker_color="#FF8C00",
-                )
-            )
+def _secao_comparativo_rede(data_loader: DataLoader, filtros: tuple, agregados: dict):
+    """Comparativo de rendimento entre as redes de ensino."""
+    st.markdown("### 🔍 Comparativo por Rede de Ensino")
 
-            fig.update_layout(
-                title="Taxas por Série (%)",
-                barmode="group",
-                height=400,
-                template="plotly_white",
-                yaxis_title="Percentual (%)",
-            )
-            st.plotly_chart(fig, use_container_width=True)
+    comp_rede = agregados["comp_rede"]
 
-        # Análise comparativa por rede
-        if rede_filter == "Todas":
-            st.markdown("### 🔍 Comparativo por Rede de Ensino")
-
-            comp_rede = (
-                filtered_df.groupby("REDE")
-                .agg(
-                    {
-                        "QT_MATRICULAS": "sum",
-                        "APROVADOS_ABSOLUTOS": "sum",
-                        "REPROVADOS_ABSOLUTOS": "sum",
-                        "EVASAO_ABSOLUTA": "sum",
-                    }
-                )
-                .reset_index()
-            )
+    col1, col2 = st.columns([2, 1])
 
-            # Calcula percentuais por rede
-            comp_rede["Taxa_Aprovacao"] = (
-                comp_rede["APROVADOS_ABSOLUTOS"] / comp_rede["QT_MATRICULAS"] * 100
-            ).round(1)
-            comp_rede["Taxa_Reprovacao"] = (
-                comp_rede["REPROVADOS_ABSOLUTOS"] / comp_rede["QT_MATRICULAS"] * 100
-            ).round(1)
-            comp_rede["Taxa_Evasao"] = (
-                comp_rede["EVASAO_ABSOLUTA"] / comp_rede["QT_MATRICULAS"] * 100
-            ).round(1)
-
-            col1, col2 = st.columns([2, 1])
-
-            with col1:
-                # Gráfico de barras agrupadas
-                fig = go.Figure()
-
-                fig.add_trace(
-                    go.Bar(
-                        x=comp_rede["REDE"],
-                        y=comp_rede["Taxa_Aprovacao"],
-                        name="Aprovação",
-                        marker_color="#2E8B57",
-                    )
-                )
+    with col1:
+        # Gráfico de barras agrupadas
+        plotly_chart_spec(_figura_rede(data_loader, *filtros), use_container_width=True)
 
-                fig.add_trace(
-                    go.Bar(
-                        x=comp_rede["REDE"],
-                        y=comp_rede["Taxa_Reprovacao"],
-                        name="Reprovação",
-                        marker_color="#DC143C",
-                    )
+    with col2:
+        st.markdown("**Resumo por Rede:**")
+        for _, row in comp_rede.iterrows():
+            st.markdown(
+                f"""
+            **{row['REDE']}**
+            - Aprovação: {row['Taxa_Aprovacao']:.1f}%
+            - Reprovação: {row['Taxa_Reprovacao']:.1f}%
+            - Evasão: {row['Taxa_Evasao']:.1f}%
+            - Matrículas: {row['QT_MATRICULAS']:,.0f}
+            """.replace(
+                    ",", "."
                 )
+            )
 
-                fig.add_trace(
-                    go.Bar(
-                        x=comp_rede["REDE"],
-                        y=comp_rede["Taxa_Evasao"],
-                        name="Evasão",
-                        marker_color="#FF8C00",
-                    )
-                )
 
-                fig.update_layout(
-                    title="Comparativo de Rendimento por Rede",
-                    barmode="group",
-                    height=400,
-                    template="plotly_white",
-                    yaxis_title="Percentual (%)",
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-            with col2:
-                st.markdown("**Resumo por Rede:**")
-                for _, row in comp_rede.iterrows():
-                    st.markdown(
-                        f"""
-                    **{row['REDE']}**
-                    - Aprovação: {row['Taxa_Aprovacao']:.1f}%
-                    - Reprovação: {row['Taxa_Reprovacao']:.1f}%
-                    - Evasão: {row['Taxa_Evasao']:.1f}%
-                    - Matrículas: {row['QT_MATRICULAS']:,.0f}
-                    """.replace(
-                            ",", "."
-                        )
-                    )
-
-        # Ranking de municípios por aprovação
-        st.markdown("### 🏆 Ranking de Municípios por Taxa de Aprovação")
-
-        ranking_municipios = (
-            filtered_df.groupby(["NO_MUNICIPIO", "REDE"])
-            .agg({"QT_MATRICULAS": "sum", "APROVADOS_ABSOLUTOS": "sum"})
-            .reset_index()
-        )
+def _secao_sre(data_loader: DataLoader, filtros: tuple, agregados: dict):
+    """Rendimento por Superintendência Regional de Educação."""
+    st.markdown("### 🌍 Análise por SRE (Superintendência Regional de Educação)")
 
-        ranking_municipios["Taxa_Aprovacao"] = (
-            ranking_municipios["APROVADOS_ABSOLUTOS"]
-            / ranking_municipios["QT_MATRICULAS"]
-            * 100
-        ).round(1)
-        ranking_municipios = ranking_municipios[
-            ranking_municipios["QT_MATRICULAS"] >= 10
-        ]  # Filtrar municípios com pelo menos 10 matrículas
-        ranking_municipios = ranking_municipios.sort_values(
-            "Taxa_Aprovacao", ascending=False
-        ).head(15)
-
-        # Exibe tabela do ranking
-        ranking_display = ranking_municipios[
-            ["NO_MUNICIPIO", "REDE", "Taxa_Aprovacao", "QT_MATRICULAS"]
-        ].copy()
-        ranking_display.columns = [
-            "Município",
-            "Rede",
-            "Taxa Aprovação (%)",
-            "Matrículas",
-        ]
+    plotly_chart_spec(_figura_sre(data_loader, *filtros), use_container_width=True)
 
-        st.dataframe(ranking_display, use_container_width=True, hide_index=True)
+    tabela = agregados["comp_sre"][["SRE", "QT_MATRICULAS"] + TAXAS].copy()
+    tabela["SRE"] = tabela["SRE"].astype(str)
+    tabela.columns = [
+        "SRE",
+        "Matrículas",
+        "Aprovação (%)",
+        "Reprovação (%)",
+        "Evasão (%)",
+    ]
+    st.dataframe(tabela, use_container_width=True, hide_index=True)
 
-        # Tabela detalhada com todos os indicadores
-        st.markdown("### 📋 Dados Detalhados por Município")
 
-        tabela_detalhada = (
-            filtered_df.groupby(["NO_MUNICIPIO", "REDE"])
-            .agg(
-                {
-                    "QT_MATRICULAS": "sum",
-                    "APROVADOS_ABSOLUTOS": "sum",
-                    "REPROVADOS_ABSOLUTOS": "sum",
-                    "EVASAO_ABSOLUTA": "sum",
-                }
-            )
-            .reset_index()
-        )
+def _secao_ranking(agregados: dict):
+    """Ranking de municípios por taxa de aprovação."""
+    st.markdown("### 🏆 Ranking de Municípios por Taxa de Aprovação")
 
-        tabela_detalhada["Taxa_Aprovacao"] = (
-            tabela_detalhada["APROVADOS_ABSOLUTOS"]
-            / tabela_detalhada["QT_MATRICULAS"]
-            * 100
-        ).round(1)
-        tabela_detalhada["Taxa_Reprovacao"] = (
-            tabela_detalhada["REPROVADOS_ABSOLUTOS"]
-            / tabela_detalhada["QT_MATRICULAS"]
-            * 100
-        ).round(1)
-        tabela_detalhada["Taxa_Evasao"] = (
-            tabela_detalhada["EVASAO_ABSOLUTA"]
-            / tabela_detalhada["QT_MATRICULAS"]
-            * 100
-        ).round(1)
-
-        tabela_display = tabela_detalhada[
-            [
-                "NO_MUNICIPIO",
-                "REDE",
-                "QT_MATRICULAS",
-                "Taxa_Aprovacao",
-                "Taxa_Reprovacao",
-                "Taxa_Evasao",
-            ]
-        ].sort_values(["NO_MUNICIPIO", "REDE"])
-
-        tabela_display.columns = [
-            "Município",
-            "Rede",
-            "Matrículas",
-            "Aprovação (%)",
-            "Reprovação (%)",
-            "Evasão (%)",
-        ]
+    # Exibe tabela do ranking
+    st.dataframe(agregados["ranking"], use_container_width=True, hide_index=True)
+    st.caption(
+        f"Posição entre {agregados['total_ranqueados']} pares município/rede "
+        "com pelo menos 10 matrículas."
+    )
 
-        st.dataframe(
-            tabela_display, use_container_width=True, hide_index=True, height=400
-        )
 
-    else:
-        st.warning("⚠️ Nenhum dado disponível para os filtros selecionados.")
+def _secao_tabela(data_loader: DataLoader, filtros: tuple):
+    """Tabela detalhada com todos os indicadores."""
+    st.markdown("### 📋 Dados Detalhados por Município")
 
-    # Informações sobre rendimento escolar
-    with st.expander("ℹ️ Sobre os Indicadores de Rendimento"):
-        st.markdown(
-            """
-        **Definições:**
-        
-        - **Taxa de Aprovação**: Percentual de alunos aprovados para a próxima série
-        - **Taxa de Reprovação**: Percentual de alunos retidos na mesma série
-        - **Taxa de Evasão**: Percentual de alunos que abandonaram a escola
-        
-        **Importância:**
-        - Indicadores essenciais para o cálculo do IDEB
-        - Refletem a eficiência do sistema educacional
-        - Influenciam diretamente na qualidade da educação
-        
-        **Meta Nacional:**
-        - Reduzir as taxas de reprovação e evasão
-        - Aumentar a taxa de aprovação com qualidade
-        - Atingir fluxo escolar adequado (aprovação próxima a 100%)
-        
-        **Fonte:** Censo Escolar 2023 - INEP/MEC
-        """
-        )
+    indice = _indice_tabela(data_loader, data_loader.data_version, *filtros)
+    render_paginated_table(indice, key="rendimento_tabela")
@@ -0,0 +1,81 @@
+"""
+Comparação de um município com os municípios mais semelhantes.
+
+O índice de vizinhos (``src/data/neighbors.py``) é criado pelo
+``DataLoader`` uma vez por versão dos dados e rede e pré-carregado no
+aquecimento; cada consulta só percorre a matriz já pronta.
+"""
+
+from typing import List
+
+import pandas as pd
+import streamlit as st
+
+from src.data.data_loader import DataLoader
+from src.data.warmup import warmup_task
+from src.utils.fragments import instrumented_fragment
+
+
+@warmup_task
+def _aquecer_semelhantes(data_loader: DataLoader, rede: str):
+    """Cria o índice de semelhantes da rede."""
+    data_loader.get_neighbor_index(rede)
+
+
+def _com_media(tabela: pd.DataFrame, colunas: List[str]) -> pd.DataFrame:
+    """Acrescenta a linha com a média dos semelhantes (sem o município)."""
+    tabela = tabela.astype({"SRE": str})
+    media = tabela.iloc[1:][["Distância"] + colunas].mean()
+    linha = {"NO_MUNICIPIO": "Média dos semelhantes", "SG_UF": "", "SRE": ""}
+    linha.update(media.round(2).to_dict())
+    return pd.concat([tabela, pd.DataFrame([linha])], ignore_index=True)
+
+
+@instrumented_fragment("semelhantes")
+def render_peer_comparison(
+    data_loader: DataLoader,
+    municipio: str,
+    redes: List[str],
+    colunas: List[str],
+    key: str,
+):
+    """
+    Tabela do município com os semelhantes em cada rede.
+
+    Args:
+        data_loader: Carregador de dados
+        municipio: Nome do município selecionado
+        redes: Redes comparadas (uma aba por rede quando há mais de uma)
+        colunas: Indicadores exibidos (colunas de ``FeatureMatrix.valores``)
+        key: Prefixo único das chaves dos widgets
+    """
+    st.subheader("👥 Municípios Semelhantes")
+    codigo = data_loader.get_municipio_code(municipio)
+
+    k = st.slider(
+        "Quantidade de semelhantes:",
+        min_value=3,
+        max_value=15,
+        value=5,
+        key=f"{key}_semelhantes_k",
+    )
+
+    abas = st.tabs(redes) if len(redes) > 1 else [st.container()]
+    for aba, rede in zip(abas, redes):
+        with aba:
+            indice = data_loader.get_neighbor_index(rede)
+            if codigo is None or codigo not in indice:
+                st.info(f"{municipio} não tem dados da rede {rede}.")
+                continue
+            tabela = _com_media(indice.table(codigo, k, colunas), colunas)
+            st.dataframe(
+                tabela.rename(columns={"NO_MUNICIPIO": "Município", "SG_UF": "UF"}),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+    st.caption(
+        "Semelhança pela distância entre IDEB, distância da meta, taxas por "
+        "série e matrículas (escala log), padronizados, entre os municípios "
+        "da mesma rede. A primeira linha é o município selecionado."
+    )
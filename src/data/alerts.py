@@ -0,0 +1,362 @@
+"""
+Motor de regras de alerta sobre município × rede × série.
+
+Cada regra é uma expressão simples compilada para uma operação vetorizada
+do numpy sobre as colunas:
+
+- ``COLUNA > 0.05`` (limite fixo; operadores ``> >= < <= == !=``);
+- ``COLUNA < OUTRA_COLUNA`` (comparação entre colunas);
+- ``queda(COLUNA) > 0.05``: queda em relação ao valor anterior da mesma
+  linha, isto é, o valor antes da última atualização dos dados que o
+  alterou (na atualização anual do censo, a queda frente ao ano anterior).
+
+A base avaliada são os dados por série com o IDEB e a meta da rede do
+município. Todas as regras são avaliadas em uma passada sobre as colunas.
+Em uma recarga dos dados, o motor compara o hash de cada linha com o da
+avaliação anterior e reavalia só as linhas novas ou alteradas; as demais
+mantêm o resultado anterior.
+
+O estado da última avaliação (hashes, valores atuais e anteriores) pode ser
+gravado em uma pasta, um arquivo por versão dos dados. Um processo que
+inicia (após um reinício ou como mais um processo do supervisor) parte do
+estado gravado mais recente, e assim ``queda(...)`` continua disparando e
+todos os processos chegam ao mesmo resultado.
+"""
+
+import json
+import logging
+import operator
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ["CO_MUNICIPIO", "REDE", "ANO_ESCOLAR"]
+
+_OPERADORES = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_EXPRESSAO = re.compile(
+    r"^\s*(?:(?P<queda>queda)\(\s*(?P<coluna_queda>\w+)\s*\)|(?P<coluna>\w+))"
+    r"\s*(?P<op>>=|<=|==|!=|>|<)\s*(?P<operando>[-+]?\d*\.?\d+|\w+)\s*$"
+)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Regra de alerta."""
+
+    nome: str
+    descricao: str
+    expressao: str
+    severidade: str = "alta"
+    # Regras do IDEB valem para a rede do município, não para cada série
+    por_serie: bool = True
+
+
+DEFAULT_RULES = [
+    AlertRule(
+        "evasao_alta",
+        "Evasão acima de 2%",
+        "TAXA_EVASAO > 0.02",
+    ),
+    AlertRule(
+        "reprovacao_alta",
+        "Reprovação acima de 15%",
+        "TAXA_REPROVACAO > 0.15",
+        severidade="media",
+    ),
+    AlertRule(
+        "ideb_abaixo_meta",
+        "IDEB 2023 abaixo da meta",
+        "VL_OBSERVADO_2023 < VL_PROJECAO_2021",
+        severidade="media",
+        por_serie=False,
+    ),
+    AlertRule(
+        "queda_aprovacao",
+        "Aprovação caiu mais de 5 p.p. desde a versão anterior dos dados",
+        "queda(TAXA_APROVACAO) > 0.05",
+    ),
+]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """Regra compilada: colunas usadas e função vetorizada."""
+
+    rule: AlertRule
+    columns: tuple
+    # (valores atuais, valores anteriores) -> máscara booleana
+    evaluate: Callable[[Dict[str, np.ndarray], Dict[str, np.ndarray]], np.ndarray]
+
+
+def compile_rule(rule: AlertRule) -> CompiledRule:
+    """
+    Compila a expressão da regra.
+
+    Raises:
+        ValueError: Se a expressão não segue a sintaxe aceita
+    """
+    match = _EXPRESSAO.match(rule.expressao)
+    if match is None:
+        raise ValueError(f"Expressão inválida na regra {rule.nome}: {rule.expressao}")
+
+    comparar = _OPERADORES[match["op"]]
+    operando = match["operando"]
+    try:
+        limite = float(operando)
+        coluna_operando = None
+    except ValueError:
+        limite, coluna_operando = None, operando
+
+    if match["queda"]:
+        coluna = match["coluna_queda"]
+
+        def esquerda(atuais, anteriores):
+            return anteriores[coluna] - atuais[coluna]
+
+    else:
+        coluna = match["coluna"]
+
+        def esquerda(atuais, anteriores):
+            return atuais[coluna]
+
+    def evaluate(atuais, anteriores):
+        direita = atuais[coluna_operando] if coluna_operando else limite
+        # Comparações com NaN (sem valor ou sem anterior) não disparam
+        with np.errstate(invalid="ignore"):
+            return comparar(esquerda(atuais, anteriores), direita)
+
+    columns = tuple(c for c in (coluna, coluna_operando) if c)
+    return CompiledRule(rule, columns, evaluate)
+
+
+def load_rules(path: Optional[str] = None) -> List[AlertRule]:
+    """Regras de um arquivo JSON (lista de objetos) ou as regras padrão."""
+    if not path:
+        return list(DEFAULT_RULES)
+    itens = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [AlertRule(**item) for item in itens]
+
+
+def alert_frame(
+    dados_serie: pd.DataFrame, ideb: pd.DataFrame, columns: Sequence[str]
+) -> pd.DataFrame:
+    """Dados por série com as colunas do IDEB da rede do município."""
+    colunas_ideb = [c for c in columns if c in ideb.columns and c not in KEY_COLUMNS]
+    base = dados_serie[
+        KEY_COLUMNS
+        + ["NO_MUNICIPIO"]
+        + [c for c in columns if c in dados_serie.columns and c not in KEY_COLUMNS]
+    ]
+    if not colunas_ideb:
+        return base.reset_index(drop=True)
+    ideb = ideb.drop_duplicates(["CO_MUNICIPIO", "REDE"])
+    return base.merge(
+        ideb[["CO_MUNICIPIO", "REDE"] + colunas_ideb],
+        on=["CO_MUNICIPIO", "REDE"],
+        how="left",
+    )
+
+
+@dataclass
+class _State:
+    keys: np.ndarray
+    hashes: np.ndarray
+    atuais: Dict[str, np.ndarray]
+    anteriores: Dict[str, np.ndarray]
+    masks: np.ndarray
+
+
+@dataclass
+class AlertResult:
+    """Resultado de uma avaliação."""
+
+    frame: pd.DataFrame
+    masks: np.ndarray
+    rules: List[AlertRule]
+    reavaliadas: int
+
+    def firing(self, rede: Optional[str] = None) -> pd.DataFrame:
+        """
+        Alertas disparados, uma linha por regra e combinação.
+
+        Regras com ``por_serie=False`` aparecem uma vez por município e rede
+        (ANO_ESCOLAR vazio).
+        """
+        linhas, regras = np.nonzero(self.masks)
+        disparos = self.frame.iloc[linhas][["NO_MUNICIPIO"] + KEY_COLUMNS]
+        disparos = disparos.reset_index(drop=True)
+        disparos.insert(0, "regra", [self.rules[j].nome for j in regras])
+        por_serie = np.array([self.rules[j].por_serie for j in regras], dtype=bool)
+        disparos["ANO_ESCOLAR"] = disparos["ANO_ESCOLAR"].astype("Int64")
+        disparos.loc[~por_serie, "ANO_ESCOLAR"] = pd.NA
+        disparos = disparos.drop_duplicates()
+        if rede is not None:
+            disparos = disparos[disparos["REDE"] == rede]
+        return disparos.reset_index(drop=True)
+
+
+class AlertEngine:
+    """Avalia as regras e guarda o estado para reavaliações incrementais."""
+
+    # Arquivos de estado mantidos na pasta (versões mais recentes)
+    _MAX_STATE_FILES = 3
+
+    def __init__(self, rules: Sequence[AlertRule], state_dir: Optional[str] = None):
+        """
+        Compila as regras.
+
+        Args:
+            rules: Regras de alerta
+            state_dir: Pasta do estado gravado por versão dos dados (None
+                mantém o estado só em memória)
+        """
+        self.compiled = [compile_rule(r) for r in rules]
+        self.rules = [c.rule for c in self.compiled]
+        self.columns = sorted({c for r in self.compiled for c in r.columns})
+        self.state_dir = Path(state_dir) if state_dir else None
+        self._state: Optional[_State] = None
+        self._lock = threading.Lock()
+
+    @traced("alertas.avaliacao")
+    def evaluate(
+        self, frame: pd.DataFrame, data_version: Optional[str] = None
+    ) -> AlertResult:
+        """
+        Avalia as regras sobre ``frame`` (saída de ``alert_frame``).
+
+        Na primeira chamada todas as linhas são avaliadas (ou, com estado
+        gravado, só as que mudaram desde ele); nas seguintes, apenas as
+        linhas novas ou com valores diferentes da última chamada. Com
+        ``data_version`` e ``state_dir``, o novo estado é gravado.
+        """
+        # Chave de cada linha como hash de 64 bits das colunas de KEY_COLUMNS
+        keys = pd.util.hash_pandas_object(frame[KEY_COLUMNS], index=False).to_numpy()
+        hashes = pd.util.hash_pandas_object(frame[self.columns], index=False).to_numpy()
+        atuais = {c: frame[c].to_numpy(dtype=np.float64) for c in self.columns}
+        n = len(frame)
+
+        with self._lock:
+            if self._state is None:
+                self._state = self._read_state()
+            state = self._state
+            if state is None:
+                posicoes = np.full(n, -1)
+            elif np.array_equal(state.keys, keys):
+                # Mesmas linhas na mesma ordem (caso comum numa recarga)
+                posicoes = np.arange(n)
+            else:
+                indice = pd.Index(state.keys)
+                if indice.is_unique and pd.Index(keys).is_unique:
+                    posicoes = indice.get_indexer(keys)
+                else:
+                    # Chaves repetidas não permitem alinhar as linhas
+                    state, posicoes = None, np.full(n, -1)
+            existentes = posicoes >= 0
+            iguais = existentes.copy()
+            if state is not None:
+                iguais[existentes] = (
+                    state.hashes[posicoes[existentes]] == hashes[existentes]
+                )
+
+            # Valor anterior: o atual da última avaliação para linhas que
+            # mudaram, o anterior guardado para as inalteradas, NaN se nova
+            anteriores = {}
+            for c in self.columns:
+                valores = np.full(n, np.nan)
+                if state is not None:
+                    mudou = existentes & ~iguais
+                    valores[mudou] = state.atuais[c][posicoes[mudou]]
+                    valores[iguais] = state.anteriores[c][posicoes[iguais]]
+                anteriores[c] = valores
+
+            masks = np.zeros((n, len(self.compiled)), dtype=bool)
+            if state is not None:
+                masks[iguais] = state.masks[posicoes[iguais]]
+            alteradas = np.flatnonzero(~iguais)
+            if len(alteradas):
+                parte = {c: v[alteradas] for c, v in atuais.items()}
+                parte_anterior = {c: v[alteradas] for c, v in anteriores.items()}
+                for j, regra in enumerate(self.compiled):
+                    masks[alteradas, j] = regra.evaluate(parte, parte_anterior)
+
+            self._state = _State(keys, hashes, atuais, anteriores, masks)
+            if data_version is not None:
+                self._write_state(data_version)
+
+        return AlertResult(frame, masks, self.rules, len(alteradas))
+
+    def _state_names(self) -> np.ndarray:
+        """Identifica as regras e colunas a que um estado gravado pertence."""
+        return np.array([r.expressao for r in self.rules] + ["|"] + list(self.columns))
+
+    def _read_state(self) -> Optional[_State]:
+        """Estado gravado mais recente (None se não houver um compatível)."""
+        if self.state_dir is None or not self.state_dir.exists():
+            return None
+        arquivos = sorted(
+            self.state_dir.glob("*.npz"), key=lambda p: p.stat().st_mtime_ns
+        )
+        for arquivo in reversed(arquivos):
+            try:
+                with np.load(arquivo, allow_pickle=False) as dados:
+                    if not np.array_equal(dados["regras"], self._state_names()):
+                        continue
+                    return _State(
+                        dados["keys"],
+                        dados["hashes"],
+                        {c: dados[f"atual_{c}"] for c in self.columns},
+                        {c: dados[f"anterior_{c}"] for c in self.columns},
+                        dados["masks"],
+                    )
+            except (OSError, KeyError, ValueError):
+                continue
+        return None
+
+    def _write_state(self, data_version: str):
+        """Grava o estado da versão (troca atômica) e apaga os antigos."""
+        if self.state_dir is None:
+            return
+        state = self._state
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    regras=self._state_names(),
+                    keys=state.keys,
+                    hashes=state.hashes,
+                    masks=state.masks,
+                    **{f"atual_{c}": v for c, v in state.atuais.items()},
+                    **{f"anterior_{c}": v for c, v in state.anteriores.items()},
+                )
+            os.replace(tmp, self.state_dir / f"{data_version}.npz")
+
+            arquivos = sorted(
+                self.state_dir.glob("*.npz"), key=lambda p: p.stat().st_mtime_ns
+            )
+            for antigo in arquivos[: -self._MAX_STATE_FILES]:
+                antigo.unlink(missing_ok=True)
+        except OSError:
+            # Sem o arquivo, o estado continua valendo neste processo
+            logger.warning(
+                "Não foi possível gravar o estado dos alertas", exc_info=True
+            )
@@ -0,0 +1,169 @@
+"""
+Detecção de anomalias nos dados por série.
+
+Os escores robustos (``0,6745 · (x - mediana) / MAD``) de todos os
+indicadores são calculados em uma única passagem agrupada por rede e série
+sobre ``dados_por_serie``: a mediana e a MAD de cada grupo saem de duas
+agregações vetorizadas do mesmo agrupamento, para todas as colunas de uma
+vez. Quando a MAD é zero (por exemplo, a evasão, zerada na maioria das
+linhas), usa-se o desvio absoluto médio (``1,2533 · MeanAD``). Além dos
+valores atípicos, as linhas com matrículas zeradas, taxas ausentes, evasão
+exatamente zero ou taxas que não somam 100% são marcadas como
+inconsistências.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import traced
+
+# Indicador -> rótulo de exibição
+INDICADORES = {
+    "QT_MATRICULAS": "Matrículas",
+    "TAXA_APROVACAO": "Aprovação (%)",
+    "TAXA_REPROVACAO": "Reprovação (%)",
+    "TAXA_EVASAO": "Evasão (%)",
+}
+TAXAS = ["TAXA_APROVACAO", "TAXA_REPROVACAO", "TAXA_EVASAO"]
+
+# Escore robusto acima do qual o valor é atípico (Iglewicz e Hoaglin)
+LIMITE_ESCORE = 3.5
+
+# Taxas de turmas muito pequenas variam demais para serem comparadas
+MIN_MATRICULAS = 10
+
+# Folga da soma das taxas (publicadas com uma casa decimal em %)
+TOLERANCIA_SOMA = 0.005
+
+ATIPICO = "Valor atípico"
+SEM_MATRICULAS = "Sem matrículas"
+TAXAS_AUSENTES = "Taxas ausentes"
+EVASAO_ZERADA = "Evasão zerada"
+SOMA_TAXAS = "Taxas não somam 100%"
+TIPOS = [ATIPICO, SEM_MATRICULAS, TAXAS_AUSENTES, EVASAO_ZERADA, SOMA_TAXAS]
+
+_CHAVES = ["CO_MUNICIPIO", "NO_MUNICIPIO", "SG_UF", "SRE", "REDE", "ANO_ESCOLAR"]
+COLUNAS = _CHAVES + ["Tipo", "Indicador", "Valor", "Mediana", "Escore"]
+
+
+def robust_zscores(
+    df: pd.DataFrame, colunas: List[str], grupos: List[str]
+) -> Dict[str, pd.DataFrame]:
+    """
+    Escores robustos das colunas dentro de cada grupo.
+
+    Args:
+        df: Dados (NaN não entra nas medianas)
+        colunas: Colunas avaliadas
+        grupos: Colunas que definem os grupos
+
+    Returns:
+        Dicionário com "escore" e "mediana", DataFrames alinhados a ``df``
+    """
+    chaves = [df[g] for g in grupos]
+    valores = df[colunas]
+    mediana = valores.groupby(chaves, observed=True).transform("median")
+    desvio = (valores - mediana).abs()
+    agrupado = desvio.groupby(chaves, observed=True)
+    mad = agrupado.transform("median")
+    mean_ad = agrupado.transform("mean")
+
+    escala = (mad / 0.6745).where(mad > 0, 1.2533 * mean_ad)
+    escore = (valores - mediana) / escala.where(escala > 0)
+    return {"escore": escore, "mediana": mediana}
+
+
+def _linhas(df: pd.DataFrame, mascara: np.ndarray, tipo: str, **colunas):
+    """Anomalias das linhas marcadas, com as colunas extras dadas."""
+    resultado = df.loc[mascara, _CHAVES].assign(Tipo=tipo)
+    for nome, valores in colunas.items():
+        resultado[nome] = valores[mascara] if np.ndim(valores) else valores
+    return resultado
+
+
+@traced("anomalias.deteccao")
+def detect_anomalies(dados_serie: pd.DataFrame) -> pd.DataFrame:
+    """
+    Encontra valores atípicos e inconsistências nos dados por série.
+
+    Args:
+        dados_serie: Dados por série (uma linha por município, rede e série)
+
+    Returns:
+        Uma linha por anomalia (colunas de ``COLUNAS``); Valor e Mediana nas
+        unidades de exibição (taxas em %) e Escore só para valores atípicos
+    """
+    df = dados_serie.reset_index(drop=True)
+    matriculas = df["QT_MATRICULAS"].fillna(0).to_numpy()
+    com_matricula = matriculas > 0
+
+    # Matrículas em escala log (os municípios grandes não são atípicos por
+    # si); taxas só das linhas com matrículas suficientes
+    avaliados = pd.DataFrame(
+        {
+            "QT_MATRICULAS": np.log1p(df["QT_MATRICULAS"].where(com_matricula)),
+            **{
+                taxa: df[taxa].where(matriculas >= MIN_MATRICULAS) * 100
+                for taxa in TAXAS
+            },
+        }
+    )
+    robusto = robust_zscores(
+        avaliados.assign(REDE=df["REDE"], ANO_ESCOLAR=df["ANO_ESCOLAR"]),
+        list(INDICADORES),
+        ["REDE", "ANO_ESCOLAR"],
+    )
+    escore = robusto["escore"].to_numpy(dtype=np.float64)
+    mediana = robusto["mediana"].to_numpy(dtype=np.float64, copy=True)
+    exibidos = avaliados.to_numpy(dtype=np.float64, copy=True)
+    exibidos[:, 0] = np.expm1(exibidos[:, 0])
+    mediana[:, 0] = np.expm1(mediana[:, 0])
+
+    # Valores atípicos: todos os pares (linha, indicador) de uma vez
+    with np.errstate(invalid="ignore"):
+        linhas, colunas = np.nonzero(np.abs(escore) > LIMITE_ESCORE)
+    rotulos = np.array(list(INDICADORES.values()))
+    atipicos = df.loc[linhas, _CHAVES].assign(
+        Tipo=ATIPICO,
+        Indicador=rotulos[colunas],
+        Valor=exibidos[linhas, colunas],
+        Mediana=mediana[linhas, colunas],
+        Escore=escore[linhas, colunas],
+    )
+
+    taxas = df[TAXAS].to_numpy(dtype=np.float64)
+    ausentes = np.isnan(taxas).any(axis=1)
+    soma = np.nansum(taxas, axis=1)
+    evasao = df["TAXA_EVASAO"].to_numpy(dtype=np.float64)
+    inconsistencias = [
+        _linhas(
+            df, ~com_matricula, SEM_MATRICULAS, Indicador="Matrículas", Valor=matriculas
+        ),
+        _linhas(df, com_matricula & ausentes, TAXAS_AUSENTES, Indicador="Taxas"),
+        _linhas(
+            df,
+            com_matricula & (evasao == 0),
+            EVASAO_ZERADA,
+            Indicador=INDICADORES["TAXA_EVASAO"],
+            Valor=0.0,
+        ),
+        _linhas(
+            df,
+            ~ausentes & (np.abs(soma - 1) > TOLERANCIA_SOMA),
+            SOMA_TAXAS,
+            Indicador="Aprovação + Reprovação + Evasão (%)",
+            Valor=soma * 100,
+            Mediana=100.0,
+        ),
+    ]
+
+    anomalias = pd.concat([atipicos, *inconsistencias], ignore_index=True)
+    anomalias["Tipo"] = pd.Categorical(anomalias["Tipo"], categories=TIPOS)
+    return (
+        anomalias.reindex(columns=COLUNAS)
+        .round({"Valor": 1, "Mediana": 1, "Escore": 2})
+        .sort_values(["Tipo", "NO_MUNICIPIO", "REDE", "ANO_ESCOLAR"], kind="stable")
+        .reset_index(drop=True)
+    )
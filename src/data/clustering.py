@@ -0,0 +1,132 @@
+"""
+K-means vetorizado em NumPy para o agrupamento de municípios.
+
+Cada iteração calcula as distâncias de todos os pontos a todos os centros
+em uma multiplicação de matrizes (``|x|² - 2·x·c + |c|²``) e recalcula os
+centros com ``np.bincount``, sem laços sobre os pontos. A inicialização é
+a do k-means++ e o resultado é o de menor inércia entre ``n_init``
+inicializações com semente fixa (mesmos dados, mesmos grupos). Os grupos
+são numerados do maior para o menor.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.utils.tracing import traced
+
+
+@dataclass
+class KMeansResult:
+    """Resultado do k-means."""
+
+    labels: np.ndarray  # grupo de cada ponto (0 = maior grupo)
+    centers: np.ndarray  # centros, shape (k, colunas)
+    inertia: float  # soma das distâncias quadradas aos centros
+    iterations: int  # iterações da melhor inicialização
+
+
+def _distancias(x: np.ndarray, normas: np.ndarray, centros: np.ndarray):
+    """Distâncias quadradas, shape (pontos, centros)."""
+    d = normas[:, None] - 2 * x @ centros.T + (centros**2).sum(axis=1)[None, :]
+    return np.maximum(d, 0, out=d)
+
+
+def _kmeans_plus_plus(x: np.ndarray, normas: np.ndarray, k: int, rng):
+    """Centros iniciais do k-means++."""
+    centros = np.empty((k, x.shape[1]))
+    centros[0] = x[rng.integers(len(x))]
+    minimas = _distancias(x, normas, centros[:1])[:, 0]
+    for i in range(1, k):
+        total = minimas.sum()
+        if total > 0:
+            escolhido = rng.choice(len(x), p=minimas / total)
+        else:  # menos pontos distintos que grupos
+            escolhido = rng.integers(len(x))
+        centros[i] = x[escolhido]
+        minimas = np.minimum(minimas, _distancias(x, normas, centros[i : i + 1])[:, 0])
+    return centros
+
+
+def _lloyd(x, normas, centros, max_iter: int, tol: float):
+    """Iterações de Lloyd a partir dos centros dados."""
+    k = len(centros)
+    for iteracao in range(1, max_iter + 1):
+        distancias = _distancias(x, normas, centros)
+        labels = distancias.argmin(axis=1)
+        contagens = np.bincount(labels, minlength=k)
+        somas = np.stack(
+            [np.bincount(labels, weights=coluna, minlength=k) for coluna in x.T],
+            axis=1,
+        )
+        novos = somas / np.maximum(contagens, 1)[:, None]
+
+        vazios = np.flatnonzero(contagens == 0)
+        if len(vazios):
+            # Grupo vazio recebe os pontos mais distantes do próprio centro
+            proprias = distancias[np.arange(len(x)), labels]
+            novos[vazios] = x[np.argsort(proprias)[::-1][: len(vazios)]]
+
+        deslocamento = ((novos - centros) ** 2).sum()
+        centros = novos
+        if deslocamento <= tol:
+            break
+
+    distancias = _distancias(x, normas, centros)
+    labels = distancias.argmin(axis=1)
+    inercia = float(distancias[np.arange(len(x)), labels].sum())
+    return labels, centros, inercia, iteracao
+
+
+@traced("analises.kmeans")
+def kmeans(
+    x: np.ndarray,
+    k: int,
+    n_init: int = 4,
+    max_iter: int = 100,
+    tol: float = 1e-8,
+    seed: int = 42,
+) -> KMeansResult:
+    """
+    Agrupa as linhas de ``x`` em ``k`` grupos.
+
+    Args:
+        x: Matriz padronizada, shape (pontos, colunas)
+        k: Número de grupos (limitado ao número de pontos)
+        n_init: Inicializações; fica a de menor inércia
+        max_iter: Máximo de iterações por inicialização
+        tol: Deslocamento total dos centros abaixo do qual para
+        seed: Semente do gerador aleatório
+
+    Returns:
+        KMeansResult com os grupos numerados do maior para o menor
+    """
+    x = np.asarray(x, dtype=np.float64)
+    k = max(1, min(k, len(x)))
+    normas = (x**2).sum(axis=1)
+    rng = np.random.default_rng(seed)
+
+    melhor = None
+    for _ in range(n_init):
+        centros = _kmeans_plus_plus(x, normas, k, rng)
+        resultado = _lloyd(x, normas, centros, max_iter, tol)
+        if melhor is None or resultado[2] < melhor[2]:
+            melhor = resultado
+    labels, centros, inercia, iteracoes = melhor
+
+    # Renumera do maior para o menor grupo (empates pelo número anterior)
+    ordem = np.argsort(-np.bincount(labels, minlength=k), kind="stable")
+    novo_numero = np.empty(k, dtype=np.intp)
+    novo_numero[ordem] = np.arange(k)
+    return KMeansResult(novo_numero[labels], centros[ordem], inercia, iteracoes)
+
+
+def principal_components(x: np.ndarray, n: int = 2) -> np.ndarray:
+    """Projeção nas ``n`` primeiras componentes principais (via SVD)."""
+    x = np.asarray(x, dtype=np.float64)
+    centrada = x - x.mean(axis=0)
+    _, _, vt = np.linalg.svd(centrada, full_matrices=False)
+    projecao = centrada @ vt[:n].T
+    if projecao.shape[1] < n:
+        projecao = np.pad(projecao, ((0, 0), (0, n - projecao.shape[1])))
+    return projecao
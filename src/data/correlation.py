@@ -0,0 +1,74 @@
+"""
+Correlações entre os indicadores dos municípios.
+
+As matrizes de Pearson e de Spearman são calculadas para todos os pares de
+indicadores de uma vez, com os pares de valores presentes de cada dupla de
+colunas (*pairwise complete*): as somas por par saem de produtos
+matriciais com a máscara de valores presentes, sem laço sobre os pares.
+Spearman é o Pearson dos postos, obtidos de uma vez para todas as colunas
+(postos médios nos empates, sobre os municípios com valor na coluna).
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import traced
+
+PEARSON = "Pearson"
+SPEARMAN = "Spearman"
+
+
+def pairwise_pearson(x: np.ndarray) -> np.ndarray:
+    """
+    Correlação de Pearson entre as colunas de ``x`` (NaN nos ausentes).
+
+    Returns:
+        Matriz (colunas, colunas); NaN nos pares com menos de 3 valores
+        ou sem variação
+    """
+    x = np.asarray(x, dtype=np.float64)
+    presente = ~np.isnan(x)
+    m = presente.astype(np.float64)
+    x0 = np.where(presente, x, 0.0)
+
+    # Somas sobre as linhas em que as duas colunas do par têm valor
+    n = m.T @ m
+    soma = x0.T @ m  # soma[i, j]: soma de x_i onde x_j existe
+    quadrados = (x0**2).T @ m
+    cruzados = x0.T @ x0
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariancia = cruzados - soma * soma.T / n
+        variancia = quadrados - soma**2 / n
+        r = covariancia / np.sqrt(variancia * variancia.T)
+    r[(n < 3) | ~np.isfinite(r)] = np.nan
+    np.fill_diagonal(r, np.where(np.diag(n) >= 3, 1.0, np.nan))
+    return np.clip(r, -1, 1)
+
+
+def ranks(x: np.ndarray) -> np.ndarray:
+    """Postos médios de cada coluna (NaN continua NaN)."""
+    return pd.DataFrame(x).rank(method="average").to_numpy(dtype=np.float64)
+
+
+@traced("analises.correlacao")
+def correlation_matrices(x: np.ndarray, colunas: List[str]) -> dict:
+    """
+    Correlações de Pearson e de Spearman entre os indicadores.
+
+    Args:
+        x: Matriz (municípios, indicadores), com NaN nos ausentes
+        colunas: Nomes dos indicadores
+
+    Returns:
+        Dicionário com as matrizes ``PEARSON`` e ``SPEARMAN`` e "pares" (número
+        de municípios de cada par), como DataFrames indexados pelos indicadores
+    """
+    pares = (~np.isnan(x)).astype(np.float64)
+    return {
+        PEARSON: pd.DataFrame(pairwise_pearson(x), colunas, colunas),
+        SPEARMAN: pd.DataFrame(pairwise_pearson(ranks(x)), colunas, colunas),
+        "pares": pd.DataFrame((pares.T @ pares).astype(int), colunas, colunas),
+    }
@@ -2,11 +2,76 @@
 Módulo para carregamento e processamento dos dados educacionais.
 """
 
+import hashlib
+import threading
+import time
+import numpy as np
 import pandas as pd
 import streamlit as st
 from pathlib import Path
 from typing import Dict, Optional
 
+from src.data.anomalies import detect_anomalies
+from src.data.features import FeatureMatrix, municipality_features
+from src.data.forecast import forecast_ideb
+from src.data.neighbors import NeighborIndex
+from src.data.rates import RATE_COLUMNS, weighted_rates
+from src.data.snapshot import snapshot_file
+from src.utils.metrics import record_cache_request
+from src.utils.tracing import span
+
+# Arquivos da pasta database e respectivos separadores
+DATA_FILES = {
+    "ideb": ("ideb_final.csv", ";"),
+    "microdados": ("microdados_final.csv", ";"),
+    "dados_serie": ("dados_por_serie.csv", ";"),
+    "cities": ("cities.csv", ","),
+}
+
+
+# Marca, por thread, se a última leitura precisou executar a função cacheada
+_cache_state = threading.local()
+
+
+@st.cache_data(show_spinner=False)
+def _read_csv(path: str, sep: str, data_version: str) -> pd.DataFrame:
+    """Lê um CSV; a versão dos dados entra na chave do cache."""
+    _cache_state.miss = True
+    return pd.read_csv(path, sep=sep)
+
+
+# Tabelas de fatos que recebem a SRE do município ao serem carregadas
+FACT_TABLES = ("ideb", "microdados", "dados_serie")
+
+
+def _attach_sre(df: pd.DataFrame, cities_df: pd.DataFrame) -> pd.DataFrame:
+    """Anexa a SRE de cada linha (pelo código IBGE) como coluna categórica."""
+    cities_df = cities_df.drop_duplicates("ibge_code")
+    categories = sorted(cities_df["sre"].dropna().unique())
+    sre_codes = pd.Categorical(cities_df["sre"], categories=categories).codes
+
+    positions = pd.Index(cities_df["ibge_code"]).get_indexer(df["CO_MUNICIPIO"])
+    codes = np.where(positions >= 0, sre_codes[positions], -1)
+    df["SRE"] = pd.Categorical.from_codes(codes, categories=categories)
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def _read_fact_table(
+    path: str, sep: str, cities_path: str, data_version: str
+) -> pd.DataFrame:
+    """Lê uma tabela de fatos já com a coluna SRE (uma vez por versão)."""
+    _cache_state.miss = True
+    cities_df = _read_csv(cities_path, DATA_FILES["cities"][1], data_version)
+    return _attach_sre(pd.read_csv(path, sep=sep), cities_df)
+
+
+@st.cache_data(show_spinner=False)
+def _read_snapshot(path: str, data_version: str) -> pd.DataFrame:
+    """Lê uma tabela do snapshot compartilhado entre processos."""
+    _cache_state.miss = True
+    return pd.read_pickle(path)
+
 
 class DataLoader:
     """Classe responsável pelo carregamento e processamento dos dados."""
@@ -21,25 +86,60 @@ class DataLoader:
         self.data_path = Path(data_path)
         self._data_cache: Dict[str, pd.DataFrame] = {}
 
-    @st.cache_data
-    def load_ideb_data(_self) -> pd.DataFrame:
+    @property
+    def data_version(self) -> str:
+        """
+        Versão dos dados, derivada de tamanho e data de modificação dos CSVs.
+
+        Qualquer alteração nos arquivos gera uma nova versão, o que invalida
+        os caches que a utilizam como chave (recarga a quente dos dados).
+        """
+        digest = hashlib.sha1()
+        for file_name, _ in DATA_FILES.values():
+            stat = (self.data_path / file_name).stat()
+            digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:12]
+
+    def _load(self, name: str) -> pd.DataFrame:
+        """Carrega um dos arquivos de DATA_FILES pela versão atual."""
+        file_name, sep = DATA_FILES[name]
+        path = str(self.data_path / file_name)
+        data_version = self.data_version
+        _cache_state.miss = False
+        inicio = time.perf_counter()
+        with span(f"data_loader.{name}"):
+            snapshot = snapshot_file(data_version, name)
+            if snapshot is not None:
+                df = _read_snapshot(str(snapshot), data_version)
+            elif name in FACT_TABLES:
+                cities_path = str(self.data_path / DATA_FILES["cities"][0])
+                df = _read_fact_table(path, sep, cities_path, data_version)
+            else:
+                df = _read_csv(path, sep, data_version)
+        record_cache_request(
+            name, hit=not _cache_state.miss, seconds=time.perf_counter() - inicio
+        )
+        return df
+
+    def load_ideb_data(self) -> pd.DataFrame:
         """Carrega dados do IDEB."""
-        return pd.read_csv(_self.data_path / "ideb_final.csv", sep=";")
+        return self._load("ideb")
 
-    @st.cache_data
-    def load_microdados(_self) -> pd.DataFrame:
+    def load_microdados(self) -> pd.DataFrame:
         """Carrega microdados de matrículas."""
-        return pd.read_csv(_self.data_path / "microdados_final.csv", sep=";")
+        return self._load("microdados")
 
-    @st.cache_data
-    def load_dados_serie(_self) -> pd.DataFrame:
+    def load_dados_serie(self) -> pd.DataFrame:
         """Carrega dados por série com taxas de rendimento."""
-        return pd.read_csv(_self.data_path / "dados_por_serie.csv", sep=";")
+        return self._load("dados_serie")
 
-    @st.cache_data
-    def load_cities(_self) -> pd.DataFrame:
+    def load_cities(self) -> pd.DataFrame:
         """Carrega dados de cidades e SREs."""
-        return pd.read_csv(_self.data_path / "cities.csv")
+        return self._load("cities")
+
+    def load_all(self) -> Dict[str, pd.DataFrame]:
+        """Carrega todos os conjuntos de dados."""
+        return {name: self._load(name) for name in DATA_FILES}
 
     def get_summary_stats(self) -> Dict:
         """Retorna estatísticas resumidas dos dados."""
@@ -48,19 +148,68 @@ class DataLoader:
         dados_serie_df = self.load_dados_serie()
         cities_df = self.load_cities()
 
+        # Taxas ponderadas pelas matrículas (fração)
+        taxas = weighted_rates(dados_serie_df, [()])[()]
+
         return {
             "total_municipios": len(cities_df),
             "total_registros_ideb": len(ideb_df),
             "municipios_acima_meta": len(ideb_df[ideb_df["acima_meta"] == True]),
             "total_matriculas": microdados_df["QT_MATRICULAS"].sum(),
-            "taxa_aprovacao_media": dados_serie_df["TAXA_APROVACAO"].mean(),
-            "taxa_evasao_media": dados_serie_df["TAXA_EVASAO"].mean(),
+            "taxa_aprovacao_media": taxas.at[0, "Taxa_Aprovacao"] / 100,
+            "taxa_evasao_media": taxas.at[0, "Taxa_Evasao"] / 100,
             "redes_analisadas": sorted(ideb_df["REDE"].unique().tolist()),
         }
 
-    def get_municipios_list(self) -> list:
-        """Retorna lista de municípios únicos."""
+    def get_rede_summary(self, rede: str) -> Dict:
+        """Retorna o resumo da sidebar (municípios, matrículas, IDEB) da rede."""
+        return _rede_summary(self, self.data_version, rede)
+
+    def get_sre_rollup(self, rede: Optional[str] = None) -> pd.DataFrame:
+        """
+        Retorna os indicadores agregados por SRE.
+
+        Args:
+            rede: Rede de ensino (None considera todas)
+
+        Returns:
+            DataFrame indexado pela SRE com municípios, IDEB médio, municípios
+            acima da meta, matrículas e taxas de rendimento ponderadas
+        """
+        return _sre_rollup(self, self.data_version, rede)
+
+    def get_municipality_features(self, rede: str) -> FeatureMatrix:
+        """Retorna os indicadores por município da rede (veja ``features.py``)."""
+        return _municipality_features(self, self.data_version, rede)
+
+    def get_neighbor_index(self, rede: str) -> NeighborIndex:
+        """Retorna o índice de municípios semelhantes da rede."""
+        return _neighbor_index(self, self.data_version, rede)
+
+    def get_ideb_forecast(self) -> pd.DataFrame:
+        """
+        Retorna a projeção do IDEB e da meta nas próximas edições.
+
+        Returns:
+            Uma linha por município, rede e edição projetada (veja
+            ``forecast.py``); vazio se os dados não têm o histórico do IDEB
+        """
+        return _ideb_forecast(self, self.data_version)
+
+    def get_anomalies(self) -> pd.DataFrame:
+        """
+        Retorna os valores atípicos e as inconsistências dos dados por série.
+
+        Returns:
+            Uma linha por anomalia, de todas as redes (veja ``anomalies.py``)
+        """
+        return _anomalies(self, self.data_version)
+
+    def get_municipios_list(self, sre: Optional[str] = None) -> list:
+        """Retorna lista de municípios únicos (opcionalmente de uma SRE)."""
         cities_df = self.load_cities()
+        if sre is not None and sre != "Todas":
+            cities_df = cities_df[cities_df["sre"] == sre]
         return sorted(cities_df["municipio"].unique().tolist())
 
     def get_sre_list(self) -> list:
@@ -68,21 +217,96 @@ class DataLoader:
         cities_df = self.load_cities()
         return sorted(cities_df["sre"].unique().tolist())
 
+    def get_municipio_code(self, municipio: str) -> Optional[int]:
+        """Retorna o código IBGE do município (ou None se não encontrado)."""
+        cities_df = self.load_cities()
+        codes = cities_df.loc[cities_df["municipio"] == municipio, "ibge_code"]
+        return codes.iloc[0] if len(codes) > 0 else None
+
     def filter_data_by_municipio(self, municipio: str) -> Dict[str, pd.DataFrame]:
         """Filtra todos os dados por município específico."""
-        cities_df = self.load_cities()
-        municipio_code = cities_df[cities_df["municipio"] == municipio][
-            "ibge_code"
-        ].iloc[0]
+        municipio_code = self.get_municipio_code(municipio)
+        ideb_df = self.load_ideb_data()
+        microdados_df = self.load_microdados()
+        dados_serie_df = self.load_dados_serie()
 
         return {
-            "ideb": self.load_ideb_data()[
-                self.load_ideb_data()["CO_MUNICIPIO"] == municipio_code
-            ],
-            "microdados": self.load_microdados()[
-                self.load_microdados()["CO_MUNICIPIO"] == municipio_code
+            "ideb": ideb_df[ideb_df["CO_MUNICIPIO"] == municipio_code],
+            "microdados": microdados_df[
+                microdados_df["CO_MUNICIPIO"] == municipio_code
             ],
-            "dados_serie": self.load_dados_serie()[
-                self.load_dados_serie()["CO_MUNICIPIO"] == municipio_code
+            "dados_serie": dados_serie_df[
+                dados_serie_df["CO_MUNICIPIO"] == municipio_code
             ],
         }
+
+
+@st.cache_data(show_spinner=False)
+def _rede_summary(_data_loader: DataLoader, data_version: str, rede: str) -> Dict:
+    """Calcula o resumo da sidebar para uma rede (cacheado por versão)."""
+    ideb_df = _data_loader.load_ideb_data()
+    microdados_df = _data_loader.load_microdados()
+    ideb_filtrado = ideb_df[ideb_df["REDE"] == rede]
+    microdados_filtrado = microdados_df[microdados_df["REDE"] == rede]
+
+    return {
+        "municipios": ideb_filtrado["CO_MUNICIPIO"].nunique(),
+        "matriculas": microdados_filtrado["QT_MATRICULAS"].sum(),
+        "ideb_medio": ideb_filtrado["VL_OBSERVADO_2023"].mean(),
+    }
+
+
+@st.cache_data(show_spinner=False)
+def _sre_rollup(
+    _data_loader: DataLoader, data_version: str, rede: Optional[str]
+) -> pd.DataFrame:
+    """Calcula os indicadores por SRE para uma rede (cacheado por versão)."""
+    ideb_df = _data_loader.load_ideb_data()
+    microdados_df = _data_loader.load_microdados()
+    dados_serie_df = _data_loader.load_dados_serie()
+    if rede is not None:
+        ideb_df = ideb_df[ideb_df["REDE"] == rede]
+        microdados_df = microdados_df[microdados_df["REDE"] == rede]
+        dados_serie_df = dados_serie_df[dados_serie_df["REDE"] == rede]
+
+    rollup = ideb_df.groupby("SRE", observed=True).agg(
+        municipios=("CO_MUNICIPIO", "nunique"),
+        ideb_medio=("VL_OBSERVADO_2023", "mean"),
+        acima_meta=("acima_meta", "sum"),
+    )
+    rollup["matriculas"] = microdados_df.groupby("SRE", observed=True)[
+        "QT_MATRICULAS"
+    ].sum()
+
+    taxas = weighted_rates(dados_serie_df, [("SRE",)])[("SRE",)].set_index("SRE")
+    return rollup.join(taxas[list(RATE_COLUMNS)])
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _municipality_features(
+    _data_loader: DataLoader, data_version: str, rede: str
+) -> FeatureMatrix:
+    """Monta os indicadores por município (uma vez por versão e rede)."""
+    return municipality_features(
+        _data_loader.load_dados_serie(), _data_loader.load_ideb_data(), rede
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _neighbor_index(
+    _data_loader: DataLoader, data_version: str, rede: str
+) -> NeighborIndex:
+    """Cria o índice de semelhantes (refeito só quando a versão muda)."""
+    return NeighborIndex(_municipality_features(_data_loader, data_version, rede))
+
+
+@st.cache_data(show_spinner=False)
+def _ideb_forecast(_data_loader: DataLoader, data_version: str) -> pd.DataFrame:
+    """Projeta o IDEB de todas as séries (uma vez por versão)."""
+    return forecast_ideb(_data_loader.load_ideb_data())
+
+
+@st.cache_data(show_spinner=False)
+def _anomalies(_data_loader: DataLoader, data_version: str) -> pd.DataFrame:
+    """Detecta as anomalias dos dados por série (uma vez por versão)."""
+    return detect_anomalies(_data_loader.load_dados_serie())
@@ -0,0 +1,147 @@
+"""
+Vetores de indicadores por município, usados nas análises entre
+municípios (agrupamento e municípios semelhantes).
+
+Cada município da rede tem uma linha com o IDEB 2023, a distância da meta,
+as taxas de aprovação, reprovação e evasão de cada série e o total de
+matrículas (além das taxas gerais, só exibidas). Os grupos de indicadores escolhidos viram uma matriz
+padronizada (média 0, desvio 1 por coluna): valores ausentes recebem a
+mediana da coluna e as matrículas entram em escala logarítmica, para que
+os municípios grandes não dominem as distâncias.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.rates import weighted_rates
+from src.utils.tracing import traced
+
+_TAXAS = {
+    "Taxa_Aprovacao": "Aprovação",
+    "Taxa_Reprovacao": "Reprovação",
+    "Taxa_Evasao": "Evasão",
+}
+
+# Colunas em escala logarítmica na matriz padronizada
+_LOG_COLUMNS = {"Matrículas"}
+
+
+@dataclass
+class FeatureMatrix:
+    """Indicadores por município da rede, em unidades originais."""
+
+    municipios: pd.DataFrame  # CO_MUNICIPIO, NO_MUNICIPIO, SG_UF, SRE
+    valores: pd.DataFrame  # uma coluna por indicador, linhas alinhadas
+    grupos: Dict[str, List[str]]  # grupo -> colunas de ``valores``
+
+    def __len__(self) -> int:
+        return len(self.municipios)
+
+    def columns(self, grupos: Sequence[str]) -> List[str]:
+        """Colunas dos grupos escolhidos, na ordem dos grupos."""
+        return [c for g in self.grupos if g in grupos for c in self.grupos[g]]
+
+    def transformed(self, grupos: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Valores dos grupos escolhidos, com as matrículas em escala log.
+
+        Returns:
+            Tupla (matriz float64 com NaN nos ausentes, colunas)
+        """
+        colunas = self.columns(grupos)
+        x = self.valores[colunas].to_numpy(dtype=np.float64, copy=True)
+        for j, coluna in enumerate(colunas):
+            if coluna in _LOG_COLUMNS:
+                x[:, j] = np.log1p(x[:, j])
+        return x, colunas
+
+    def matrix(self, grupos: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Matriz padronizada dos grupos escolhidos.
+
+        Returns:
+            Tupla (matriz float64 com shape (municípios, colunas), colunas)
+        """
+        x, colunas = self.transformed(grupos)
+        if len(x):
+            medianas = np.nanmedian(x, axis=0)
+            ausentes = np.isnan(x)
+            x[ausentes] = np.take(np.nan_to_num(medianas), np.nonzero(ausentes)[1])
+            desvio = x.std(axis=0)
+            x = (x - x.mean(axis=0)) / np.where(desvio > 0, desvio, 1.0)
+        return x, colunas
+
+
+@traced("analises.indicadores")
+def municipality_features(
+    dados_serie: pd.DataFrame, ideb: pd.DataFrame, rede: str
+) -> FeatureMatrix:
+    """
+    Monta os indicadores por município da rede.
+
+    Args:
+        dados_serie: Dados por série (matrículas e absolutos de rendimento)
+        ideb: IDEB e meta por município e rede
+        rede: Rede de ensino
+
+    Returns:
+        FeatureMatrix com os municípios que têm dados da rede
+    """
+    serie = dados_serie[dados_serie["REDE"] == rede]
+    taxas = weighted_rates(
+        serie, [("CO_MUNICIPIO", "ANO_ESCOLAR"), ("CO_MUNICIPIO",)], decimals=1
+    )
+
+    # Uma coluna por taxa e série (ex.: "Aprovação 6º")
+    por_serie = taxas[("CO_MUNICIPIO", "ANO_ESCOLAR")].set_index(
+        ["CO_MUNICIPIO", "ANO_ESCOLAR"]
+    )[list(_TAXAS)]
+    por_serie = por_serie.unstack("ANO_ESCOLAR")
+    por_serie.columns = [f"{_TAXAS[taxa]} {ano}º" for taxa, ano in por_serie.columns]
+
+    # Totais do município: matrículas e taxas gerais (exibidas, fora da distância)
+    totais = taxas[("CO_MUNICIPIO",)].set_index("CO_MUNICIPIO")
+    totais = totais[["QT_MATRICULAS"] + list(_TAXAS)].rename(
+        columns={"QT_MATRICULAS": "Matrículas", **_TAXAS}
+    )
+
+    ideb_rede = ideb[ideb["REDE"] == rede].drop_duplicates("CO_MUNICIPIO")
+    ideb_rede = ideb_rede.set_index("CO_MUNICIPIO")
+    valores = pd.DataFrame(
+        {
+            "IDEB 2023": ideb_rede["VL_OBSERVADO_2023"],
+            "IDEB − Meta": ideb_rede["VL_OBSERVADO_2023"]
+            - ideb_rede["VL_PROJECAO_2021"],
+        }
+    )
+    valores = valores.join(por_serie, how="outer").join(totais, how="outer")
+    # Municípios sem matrículas nem IDEB na rede ficam de fora
+    presentes = valores["Matrículas"].fillna(0).gt(0) | valores["IDEB 2023"].notna()
+    valores = valores[presentes].sort_index()
+
+    cadastro = (
+        pd.concat(
+            [
+                df[["CO_MUNICIPIO", "NO_MUNICIPIO", "SG_UF", "SRE"]]
+                for df in (serie, ideb_rede.reset_index())
+            ]
+        )
+        .drop_duplicates("CO_MUNICIPIO")
+        .set_index("CO_MUNICIPIO")
+    )
+    municipios = cadastro.reindex(valores.index).reset_index()
+
+    colunas_serie = list(por_serie.columns)
+    grupos = {
+        "IDEB 2023": ["IDEB 2023"],
+        "Distância da meta": ["IDEB − Meta"],
+        **{
+            f"{rotulo} por série": [c for c in colunas_serie if c.startswith(rotulo)]
+            for rotulo in _TAXAS.values()
+        },
+        "Matrículas": ["Matrículas"],
+    }
+    return FeatureMatrix(municipios, valores.reset_index(drop=True), grupos)
@@ -0,0 +1,183 @@
+"""
+Projeção do IDEB por tendência linear.
+
+Cada município × rede é uma linha da matriz de edições (séries, anos), com
+NaN nas edições sem resultado. As retas de todas as séries saem de uma vez
+das equações normais ponderadas pela máscara de valores presentes
+(produtos matriciais), sem laço por série. O intervalo de previsão de 95%
+usa a variância dos resíduos de cada série e o quantil t com n - 2 graus
+de liberdade. A meta de cada série é extrapolada da mesma forma a partir
+das metas publicadas pelo INEP (a última é a de 2021).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import traced
+
+OBSERVADO = "VL_OBSERVADO_"
+PROJECAO = "VL_PROJECAO_"
+
+# Edições observadas necessárias para projetar uma série
+MIN_EDICOES = 4
+
+# Quantis t bicaudais de 95% por graus de liberdade (acima: normal)
+_T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228]
+
+
+def year_columns(df: pd.DataFrame, prefixo: str) -> Dict[int, str]:
+    """Colunas ``<prefixo><ano>`` do DataFrame, por ano em ordem crescente."""
+    padrao = re.compile(re.escape(prefixo) + r"(\d{4})$")
+    anos = {}
+    for coluna in df.columns:
+        encontrado = padrao.match(str(coluna))
+        if encontrado:
+            anos[int(encontrado.group(1))] = coluna
+    return dict(sorted(anos.items()))
+
+
+def _t_95(graus: np.ndarray) -> np.ndarray:
+    """Quantil t de 95% para cada número de graus de liberdade."""
+    tabela = np.append(_T_95, 1.96)
+    return tabela[np.clip(graus, 1, len(_T_95) + 1).astype(int) - 1]
+
+
+@dataclass
+class LinearTrend:
+    """Retas ajustadas para várias séries (uma posição por série)."""
+
+    n: np.ndarray  # edições observadas
+    centro: np.ndarray  # ano médio das edições observadas
+    media: np.ndarray  # valor médio (a reta passa por (centro, media))
+    inclinacao: np.ndarray  # variação por ano
+    sxx: np.ndarray  # soma dos quadrados dos anos centrados
+    desvio: np.ndarray  # desvio-padrão dos resíduos (NaN com n <= 2)
+
+    def predict(self, ano: float) -> np.ndarray:
+        """Valor da reta no ano."""
+        return self.media + self.inclinacao * (ano - self.centro)
+
+    def interval(self, ano: float) -> np.ndarray:
+        """Meia largura do intervalo de previsão de 95% no ano."""
+        erro = self.desvio * np.sqrt(
+            1 + 1 / self.n + (ano - self.centro) ** 2 / self.sxx
+        )
+        return _t_95(self.n - 2) * erro
+
+
+def linear_trend(anos: Sequence[float], valores: np.ndarray) -> LinearTrend:
+    """
+    Ajusta uma reta por mínimos quadrados a cada linha de ``valores``.
+
+    Args:
+        anos: Anos das colunas
+        valores: Matriz (séries, anos), com NaN nas edições ausentes
+
+    Returns:
+        LinearTrend; séries com uma só edição ficam constantes (inclinação 0)
+        e séries sem edições ficam com NaN
+    """
+    t = np.asarray(anos, dtype=np.float64)
+    t = t - t.mean()  # anos centrados: somas menores e mais estáveis
+    y = np.asarray(valores, dtype=np.float64)
+    presente = ~np.isnan(y)
+    w = presente.astype(np.float64)
+    y0 = np.where(presente, y, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n = w.sum(axis=1)
+        centro = (w @ t) / n
+        media = y0.sum(axis=1) / n
+        sxx = w @ t**2 - n * centro**2
+        sxy = y0 @ t - n * centro * media
+        inclinacao = np.where(sxx > 1e-12, sxy / sxx, 0.0)
+
+        residuos = y0 - (media[:, None] + inclinacao[:, None] * (t - centro[:, None]))
+        sse = ((residuos * w) ** 2).sum(axis=1)
+        desvio = np.where(n > 2, np.sqrt(sse / (n - 2)), np.nan)
+
+    return LinearTrend(n, centro + np.mean(anos), media, inclinacao, sxx, desvio)
+
+
+@traced("ideb.previsao")
+def forecast_ideb(ideb: pd.DataFrame, horizonte: int = 2) -> pd.DataFrame:
+    """
+    Projeta o IDEB e a meta de cada município e rede nas próximas edições.
+
+    Args:
+        ideb: IDEB por município e rede, com as colunas ``VL_OBSERVADO_<ano>``
+            e ``VL_PROJECAO_<ano>``
+        horizonte: Quantidade de edições (bienais) projetadas
+
+    Returns:
+        Uma linha por série e edição projetada (CO_MUNICIPIO, NO_MUNICIPIO,
+        SG_UF, REDE, SRE, ANO, Edições, Tendência, IDEB Projetado,
+        Inferior, Superior, Meta Projetada, Situação); vazio se não há séries com
+        ``MIN_EDICOES`` edições observadas
+    """
+    observado = year_columns(ideb, OBSERVADO)
+    metas = year_columns(ideb, PROJECAO)
+    chaves = ["CO_MUNICIPIO", "NO_MUNICIPIO", "SG_UF", "REDE", "SRE"]
+    colunas = chaves + [
+        "ANO",
+        "Edições",
+        "Tendência",
+        "IDEB Projetado",
+        "Inferior",
+        "Superior",
+        "Meta Projetada",
+        "Situação",
+    ]
+    if len(observado) < MIN_EDICOES or not metas:
+        return pd.DataFrame(columns=colunas)
+
+    ideb = ideb.drop_duplicates(["CO_MUNICIPIO", "REDE"])
+    tendencia = linear_trend(
+        list(observado), ideb[list(observado.values())].to_numpy(dtype=np.float64)
+    )
+    meta = linear_trend(
+        list(metas), ideb[list(metas.values())].to_numpy(dtype=np.float64)
+    )
+    validas = tendencia.n >= MIN_EDICOES
+
+    ultimo = max(observado)
+    anos = [ultimo + 2 * (i + 1) for i in range(horizonte)]
+    base = ideb.loc[validas, [c for c in chaves if c in ideb.columns]]
+    projecoes = []
+    for ano in anos:  # uma iteração por edição, vetorizada nas séries
+        previsto = tendencia.predict(ano)[validas]
+        margem = tendencia.interval(ano)[validas]
+        projecoes.append(
+            base.assign(
+                **{
+                    "ANO": ano,
+                    "Edições": tendencia.n[validas].astype(int),
+                    # Variação por edição (dois anos)
+                    "Tendência": (2 * tendencia.inclinacao[validas]).round(2),
+                    "IDEB Projetado": np.clip(previsto, 0, 10).round(1),
+                    "Inferior": np.clip(previsto - margem, 0, 10).round(1),
+                    "Superior": np.clip(previsto + margem, 0, 10).round(1),
+                    "Meta Projetada": np.clip(meta.predict(ano)[validas], 0, 10).round(
+                        1
+                    ),
+                }
+            )
+        )
+    resultado = pd.concat(projecoes, ignore_index=True)
+
+    # Situação pela posição da meta em relação ao intervalo de previsão
+    resultado["Situação"] = np.select(
+        [
+            resultado["Meta Projetada"].isna(),
+            resultado["Inferior"] >= resultado["Meta Projetada"],
+            resultado["Superior"] < resultado["Meta Projetada"],
+        ],
+        ["Sem meta", "Deve atingir", "Não deve atingir"],
+        "Incerta",
+    )
+    resultado = resultado.sort_values(["CO_MUNICIPIO", "REDE", "ANO"], kind="stable")
+    return resultado.reindex(columns=colunas).reset_index(drop=True)
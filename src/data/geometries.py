@@ -0,0 +1,64 @@
+"""
+Malhas municipais pré-simplificadas para os mapas coropléticos.
+
+As malhas são geradas uma vez por ``data_cleaning/build_geometries.py`` em
+três níveis de detalhe (usados conforme o zoom do mapa) e gravadas em
+``static/geo/municipios_<UF>_<nível>.json``: GeoJSON com coordenadas
+quantizadas, sem espaços e só com o código IBGE de cada feição. A pasta
+``static/`` é servida pelo Streamlit em ``app/static/``; o gráfico recebe a
+URL da malha, não as geometrias. O navegador baixa cada malha uma vez e,
+nas mudanças de filtro, o servidor envia só os códigos e os valores.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+GEO_DIR = Path(__file__).resolve().parents[2] / "static" / "geo"
+GEO_URL = "app/static/geo"
+
+# Nível -> (tolerância da simplificação em graus, casas decimais gravadas),
+# do menos ao mais detalhado
+NIVEIS: Dict[str, tuple] = {
+    "baixo": (0.004, 3),
+    "medio": (0.0012, 4),
+    "alto": (0.0003, 4),
+}
+
+# Municípios exibidos a partir dos quais cada nível é usado: a UF inteira
+# usa o nível baixo e uma SRE (até ~12 municípios), o alto
+_LIMITES_ZOOM = [("baixo", 40), ("medio", 13), ("alto", 0)]
+
+
+def geometry_file(uf: str, nivel: str) -> Path:
+    """Arquivo da malha da UF no nível indicado."""
+    return GEO_DIR / f"municipios_{uf}_{nivel}.json"
+
+
+def zoom_level(n_municipios: int) -> str:
+    """Nível de detalhe para a quantidade de municípios exibidos."""
+    for nivel, minimo in _LIMITES_ZOOM:
+        if n_municipios >= minimo:
+            return nivel
+    return "alto"
+
+
+def geometry_url(uf: str, nivel: str) -> Optional[str]:
+    """
+    URL da malha da UF (ou None, se não houver malha gerada).
+
+    Sem o nível pedido, usa o nível disponível mais próximo. A URL leva a
+    data e o tamanho do arquivo: uma malha regerada muda de URL e não é
+    servida do cache do navegador.
+    """
+    ordem = list(NIVEIS)
+    pedido = ordem.index(nivel)
+    for candidato in sorted(ordem, key=lambda n: abs(ordem.index(n) - pedido)):
+        path = geometry_file(uf, candidato)
+        try:
+            info = path.stat()
+        except OSError:
+            continue
+        versao = hashlib.sha1(f"{info.st_mtime_ns}:{info.st_size}".encode())
+        return f"{GEO_URL}/{path.name}?v={versao.hexdigest()[:10]}"
+    return None
@@ -0,0 +1,67 @@
+"""
+Manifesto dos CSVs da pasta de dados.
+
+O ``manifest.json`` guarda o hash SHA-256 e o tamanho de cada CSV do
+dashboard. É gravado pela limpeza dos dados (e pelo gerador de dados
+sintéticos) logo após escrever os CSVs, e conferido pelo ``run_app.py``
+antes de iniciar o servidor.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+MANIFEST_NAME = "manifest.json"
+
+DATA_FILES = [
+    "ideb_final.csv",
+    "microdados_final.csv",
+    "dados_por_serie.csv",
+    "cities.csv",
+]
+
+
+def file_sha256(path: Path, cache: Optional[Dict] = None) -> str:
+    """
+    SHA-256 do arquivo.
+
+    Args:
+        path: Arquivo
+        cache: Hashes já calculados (caminho -> [tamanho, mtime, hash]),
+            reaproveitados se tamanho e mtime não mudaram e atualizados aqui
+    """
+    stat = path.stat()
+    key = str(path.resolve())
+    cached = cache.get(key) if cache is not None else None
+    if cached and cached[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    if cache is not None:
+        cache[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def write_manifest(data_dir: Path, cache: Optional[Dict] = None) -> Path:
+    """
+    Grava o manifesto (hash e tamanho) dos CSVs da pasta de dados.
+
+    Arquivos ainda ausentes ficam de fora; o ``run_app.py`` acusa a falta
+    deles antes de conferir os hashes.
+    """
+    data_dir = Path(data_dir)
+    manifest = {
+        name: {
+            "sha256": file_sha256(data_dir / name, cache),
+            "bytes": (data_dir / name).stat().st_size,
+        }
+        for name in DATA_FILES
+        if (data_dir / name).exists()
+    }
+    path = data_dir / MANIFEST_NAME
+    path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return path
@@ -0,0 +1,81 @@
+"""
+Índice de municípios semelhantes (vizinhos mais próximos).
+
+Os vetores padronizados de ``FeatureMatrix`` são guardados uma vez em uma
+matriz contígua junto com as normas quadradas das linhas. Uma consulta é
+um produto matriz-vetor (``|x|² - 2·x·q + |q|²``) seguido de
+``np.argpartition``: busca exata, que com ~15 indicadores e até ~5.570
+municípios responde em menos de um milissegundo. Com tantas dimensões uma
+KD-tree descartaria poucos ramos e a varredura vetorizada é mais rápida.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.features import FeatureMatrix
+from src.utils.tracing import traced
+
+
+class NeighborIndex:
+    """Busca exata dos municípios mais próximos em indicadores padronizados."""
+
+    def __init__(self, features: FeatureMatrix, grupos: Optional[Sequence[str]] = None):
+        """
+        Cria o índice.
+
+        Args:
+            features: Indicadores por município da rede
+            grupos: Grupos de indicadores usados na distância (None usa todos)
+        """
+        self.features = features
+        x, self.columns = features.matrix(list(grupos or features.grupos))
+        self._x = np.ascontiguousarray(x)
+        self._normas = (self._x**2).sum(axis=1)
+        self._posicao = pd.Index(features.municipios["CO_MUNICIPIO"])
+
+    def __len__(self) -> int:
+        """Quantidade de municípios indexados."""
+        return len(self._x)
+
+    def __contains__(self, codigo) -> bool:
+        return codigo in self._posicao
+
+    def query(self, codigo, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Os ``k`` municípios mais próximos do município (sem ele mesmo).
+
+        Returns:
+            Tupla (posições nas linhas de ``features``, distâncias), em
+            ordem crescente de distância; vazia se o código não está no índice
+        """
+        if codigo not in self._posicao or len(self) < 2:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        i = self._posicao.get_loc(codigo)
+        d2 = self._normas - 2 * (self._x @ self._x[i]) + self._normas[i]
+        d2[i] = np.inf
+        k = max(0, min(k, len(d2) - 1))
+        vizinhos = np.argpartition(d2, k - 1)[:k] if k else np.empty(0, np.intp)
+        vizinhos = vizinhos[np.argsort(d2[vizinhos], kind="stable")]
+        return vizinhos, np.sqrt(np.maximum(d2[vizinhos], 0))
+
+    @traced("semelhantes.consulta")
+    def table(self, codigo, k: int, colunas: List[str]) -> pd.DataFrame:
+        """
+        Tabela do município seguido dos ``k`` semelhantes.
+
+        Colunas: NO_MUNICIPIO, SG_UF, SRE, Distância e as ``colunas``
+        pedidas de ``features.valores``; o município consultado tem
+        distância 0.
+        """
+        vizinhos, distancias = self.query(codigo, k)
+        if codigo not in self._posicao:
+            return pd.DataFrame()
+        linhas = np.concatenate([[self._posicao.get_loc(codigo)], vizinhos])
+        tabela = self.features.municipios.iloc[linhas][
+            ["NO_MUNICIPIO", "SG_UF", "SRE"]
+        ].reset_index(drop=True)
+        tabela["Distância"] = np.concatenate([[0.0], distancias]).round(2)
+        valores = self.features.valores.iloc[linhas][colunas].reset_index(drop=True)
+        return pd.concat([tabela, valores], axis=1)
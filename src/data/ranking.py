@@ -0,0 +1,88 @@
+"""
+Índice de ranking pré-calculado.
+
+A ordem decrescente de uma métrica é calculada uma única vez (argsort
+estável) e guardada junto com a posição de cada linha. Assim, o top-N é uma
+fatia da ordem e a posição de um município é uma consulta em dicionário.
+Para subconjuntos ad hoc (por exemplo, um único município), o top-N é
+selecionado com ``np.argpartition`` sobre as posições já calculadas.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import traced
+
+
+class RankingIndex:
+    """Ranking decrescente de uma métrica sobre as linhas de uma tabela."""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        metric: str,
+        label: str = "NO_MUNICIPIO",
+        eligible: Optional[np.ndarray] = None,
+    ):
+        """
+        Cria o índice.
+
+        Args:
+            df: Tabela com uma linha por item ranqueado
+            metric: Coluna da métrica (maior é melhor)
+            label: Coluna usada nas consultas de posição
+            eligible: Máscara das linhas que participam do ranking
+        """
+        self.df = df.reset_index(drop=True)
+        self.metric = metric
+        values = self.df[metric].to_numpy(dtype=np.float64)
+
+        ranked = np.isfinite(values)
+        if eligible is not None:
+            ranked &= np.asarray(eligible, dtype=bool)
+        candidates = np.flatnonzero(ranked)
+
+        # Empates mantêm a ordem original das linhas (como nlargest)
+        self.order = candidates[np.argsort(-values[candidates], kind="stable")]
+        self.rank = np.zeros(len(self.df), dtype=np.int64)
+        self.rank[self.order] = np.arange(1, len(self.order) + 1)
+        self._rows = {
+            key: rows
+            for key, rows in self.df.groupby(label, sort=False).indices.items()
+        }
+
+    def __len__(self) -> int:
+        """Quantidade de linhas ranqueadas."""
+        return len(self.order)
+
+    def rows_for(self, value) -> np.ndarray:
+        """Linhas cujo rótulo é ``value`` (vazio se não houver)."""
+        return self._rows.get(value, np.empty(0, dtype=np.intp))
+
+    @traced("ranking.top")
+    def top(self, n: int, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Retorna as ``n`` primeiras linhas do ranking.
+
+        Args:
+            n: Quantidade de linhas
+            rows: Restringe o ranking a estas linhas (None usa todas)
+
+        Returns:
+            Linhas em ordem decrescente da métrica, com a coluna "Posição"
+            (posição no ranking completo)
+        """
+        if rows is None:
+            selected = self.order[:n]
+        else:
+            rows = np.asarray(rows)
+            rows = rows[self.rank[rows] > 0]
+            if len(rows) > n:
+                rows = rows[np.argpartition(self.rank[rows], n - 1)[:n]]
+            selected = rows[np.argsort(self.rank[rows])]
+
+        result = self.df.iloc[selected].copy()
+        result["Posição"] = self.rank[selected]
+        return result
@@ -0,0 +1,124 @@
+"""
+Taxas de rendimento ponderadas pelas matrículas.
+
+As taxas de aprovação, reprovação e evasão de um grupo são a soma dos
+absolutos dividida pela soma das matrículas. ``weighted_rates`` calcula
+vários agrupamentos de uma vez (semântica de *grouping sets*): os dados são
+percorridos uma única vez no agrupamento mais fino (união das chaves) com
+``np.bincount`` e os demais agrupamentos são somados a partir dessas
+células, que são muito menos numerosas que as linhas.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import traced
+
+# Taxa percentual -> coluna de absolutos
+RATE_COLUMNS = {
+    "Taxa_Aprovacao": "APROVADOS_ABSOLUTOS",
+    "Taxa_Reprovacao": "REPROVADOS_ABSOLUTOS",
+    "Taxa_Evasao": "EVASAO_ABSOLUTA",
+}
+WEIGHT_COLUMN = "QT_MATRICULAS"
+SUM_COLUMNS = [WEIGHT_COLUMN] + list(RATE_COLUMNS.values())
+
+GroupingSet = Tuple[str, ...]
+
+
+def _group_sums(codes: Sequence[np.ndarray], values: np.ndarray):
+    """
+    Soma as colunas de ``values`` (shape (colunas, linhas)) por combinação
+    de códigos.
+
+    Returns:
+        Tupla (códigos de cada chave por grupo, somas com shape (colunas, grupos))
+    """
+    if not codes:
+        return [], values.sum(axis=1, keepdims=True)
+    if values.shape[1] == 0:
+        return [np.empty(0, dtype=np.intp) for _ in codes], values
+
+    dims = tuple(int(c.max()) + 1 for c in codes)
+    flat = np.ravel_multi_index(codes, dims)
+    n_cells = int(np.prod(dims))
+    if n_cells <= 4 * len(flat):
+        # Grade densa: contagem direta e descarte das células vazias
+        occupied = np.flatnonzero(np.bincount(flat, minlength=n_cells))
+        sums = np.stack(
+            [np.bincount(flat, weights=v, minlength=n_cells) for v in values]
+        )
+        sums = sums[:, occupied]
+        cells = occupied
+    else:
+        cells, inverse = np.unique(flat, return_inverse=True)
+        sums = np.stack(
+            [np.bincount(inverse, weights=v, minlength=len(cells)) for v in values]
+        )
+    return list(np.unravel_index(cells, dims)), sums
+
+
+@traced("taxas.kernel")
+def weighted_rates(
+    df: pd.DataFrame,
+    grouping_sets: Sequence[GroupingSet],
+    decimals: Optional[int] = None,
+) -> Dict[GroupingSet, pd.DataFrame]:
+    """
+    Calcula as taxas ponderadas para vários agrupamentos em uma passada.
+
+    Args:
+        df: Dados por série com as colunas de ``SUM_COLUMNS``
+        grouping_sets: Agrupamentos (tuplas de colunas); ``()`` é o total geral
+        decimals: Casas decimais das taxas (None mantém sem arredondar)
+
+    Returns:
+        Dicionário agrupamento -> DataFrame com as chaves (em ordem crescente),
+        as somas de ``SUM_COLUMNS`` e as taxas percentuais de ``RATE_COLUMNS``
+    """
+    keys = list(dict.fromkeys(k for gs in grouping_sets for k in gs))
+
+    # Passada única sobre as linhas, no agrupamento mais fino
+    uniques = {}
+    row_codes = []
+    for key in keys:
+        codes, uniques[key] = pd.factorize(df[key], sort=True)
+        row_codes.append(codes)
+    integer_columns = {
+        c: pd.api.types.is_integer_dtype(df[c].dtype) for c in SUM_COLUMNS
+    }
+    values = np.stack([df[c].to_numpy(dtype=np.float64) for c in SUM_COLUMNS])
+    if any(len(c) and c.min() < 0 for c in row_codes):
+        # Linhas com chave ausente ficam fora, como no groupby do pandas
+        valid = np.logical_and.reduce([c >= 0 for c in row_codes])
+        row_codes = [c[valid] for c in row_codes]
+        values = values[:, valid]
+    cell_codes, cell_sums = _group_sums(row_codes, values)
+
+    results = {}
+    for grouping_set in grouping_sets:
+        # Os demais agrupamentos somam as células, não as linhas
+        codes, sums = _group_sums(
+            [cell_codes[keys.index(k)] for k in grouping_set], cell_sums
+        )
+
+        columns = {k: uniques[k].take(c) for k, c in zip(grouping_set, codes)}
+        for column, column_sums in zip(SUM_COLUMNS, sums):
+            # Somas de colunas inteiras voltam a ser inteiras
+            if integer_columns[column]:
+                column_sums = column_sums.round().astype(np.int64)
+            columns[column] = column_sums
+
+        weight = sums[0]
+        for rate, column in RATE_COLUMNS.items():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                taxa = np.where(
+                    weight > 0, sums[SUM_COLUMNS.index(column)] / weight * 100, np.nan
+                )
+            columns[rate] = taxa if decimals is None else np.round(taxa, decimals)
+
+        result = pd.DataFrame(columns)
+        results[tuple(grouping_set)] = result
+    return results
@@ -0,0 +1,69 @@
+"""
+Snapshot das tabelas carregadas, compartilhado entre processos.
+
+Com vários processos do Streamlit (``run_app.py --workers N``), o
+supervisor carrega os CSVs uma vez (já com a coluna SRE) e grava cada
+tabela em pickle numa pasta por versão dos dados. Os processos leem o
+snapshot em vez de interpretar os CSVs; se a versão mudar e o snapshot
+ainda não existir, a leitura volta para os CSVs.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from src.utils.settings import SNAPSHOT_DIR
+
+
+def snapshot_file(data_version: str, name: str) -> Optional[Path]:
+    """Arquivo do snapshot da tabela (None se desligado ou inexistente)."""
+    if not SNAPSHOT_DIR:
+        return None
+    path = Path(SNAPSHOT_DIR) / data_version / f"{name}.pkl"
+    return path if path.exists() else None
+
+
+def write_snapshot(data_loader, directory: str) -> Path:
+    """
+    Grava o snapshot da versão atual dos dados (se ainda não existir).
+
+    Args:
+        data_loader: DataLoader da pasta de dados
+        directory: Pasta raiz dos snapshots
+
+    Returns:
+        Pasta do snapshot da versão
+    """
+    root = Path(directory)
+    target = root / data_loader.data_version
+    if target.exists():
+        return target
+
+    # Grava em uma pasta temporária e renomeia: leitores nunca veem metade
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=root, prefix=".tmp-"))
+    try:
+        for name, df in data_loader.load_all().items():
+            df.to_pickle(tmp / f"{name}.pkl")
+        os.replace(tmp, target)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not target.exists():
+            raise
+    return target
+
+
+def prune_snapshots(directory: str, keep: str):
+    """
+    Remove os snapshots de versões diferentes de ``keep``.
+
+    Pastas ocultas (gravações em andamento e o estado dos alertas) ficam.
+    """
+    root = Path(directory)
+    if not root.exists():
+        return
+    for path in root.iterdir():
+        if path.is_dir() and path.name != keep and not path.name.startswith("."):
+            shutil.rmtree(path, ignore_errors=True)
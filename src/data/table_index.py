@@ -0,0 +1,135 @@
+"""
+Índice para consulta paginada de tabelas no servidor.
+
+A tabela fica no processo do Streamlit; o navegador recebe apenas a página
+visível. A ordenação de cada coluna é calculada uma única vez (argsort) e a
+busca textual usa uma coluna normalizada (minúsculas, sem acentos).
+"""
+
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import traced
+
+
+def normalize_text(text: str) -> str:
+    """Remove acentos e converte para minúsculas."""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+class TableIndex:
+    """Tabela com ordenações pré-calculadas e busca textual."""
+
+    _MAX_SEARCHES = 32
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Cria o índice.
+
+        Args:
+            df: Tabela já no formato de exibição
+        """
+        self.df = df.reset_index(drop=True)
+        self.columns = list(self.df.columns)
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._searches: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Texto pesquisável: colunas textuais concatenadas e normalizadas
+        text_columns = [
+            c for c in self.columns if not pd.api.types.is_numeric_dtype(self.df[c])
+        ]
+        if text_columns:
+            joined = self.df[text_columns].astype(str).agg(" ".join, axis=1)
+            self._search_text = joined.map(normalize_text)
+        else:
+            self._search_text = pd.Series([""] * len(self.df))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _order(self, column: str, ascending: bool) -> np.ndarray:
+        """
+        Posições das linhas ordenadas pela coluna (NaN sempre ao final).
+
+        As duas ordens são estáveis: linhas com o mesmo valor mantêm a ordem
+        original, também na decrescente (como o ``sort_values`` do pandas).
+        """
+        with self._lock:
+            cached = self._orders.get((column, ascending))
+            if cached is not None:
+                return cached
+
+            values = self.df[column]
+            missing = values.isna().to_numpy()
+            if not pd.api.types.is_numeric_dtype(values):
+                values = values.astype(str).map(normalize_text)
+            values = values.to_numpy()
+            order = np.lexsort((values, missing))
+            if not ascending:
+                # Grupo de cada valor na ordem crescente; a decrescente inverte
+                # os grupos e a lexsort (estável) preserva a ordem nos empates
+                valid = order[: len(order) - int(missing.sum())]
+                ordered = values[valid]
+                new_group = np.ones(len(valid), dtype=bool)
+                new_group[1:] = ordered[1:] != ordered[:-1]
+                groups = np.zeros(len(values), dtype=np.int64)
+                groups[valid] = np.cumsum(new_group)
+                order = np.lexsort((-groups, missing))
+            self._orders[(column, ascending)] = order
+            return order
+
+    def _search_mask(self, term: str) -> np.ndarray:
+        """Máscara booleana das linhas que contêm o termo (com cache LRU)."""
+        with self._lock:
+            mask = self._searches.get(term)
+            if mask is not None:
+                self._searches.move_to_end(term)
+                return mask
+
+        mask = self._search_text.str.contains(term, regex=False).to_numpy()
+        with self._lock:
+            self._searches[term] = mask
+            while len(self._searches) > self._MAX_SEARCHES:
+                self._searches.popitem(last=False)
+        return mask
+
+    @traced("tabela.consulta")
+    def query(
+        self,
+        search: str = "",
+        sort_by: Optional[str] = None,
+        ascending: bool = True,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[pd.DataFrame, int]:
+        """
+        Retorna uma fatia da tabela filtrada e ordenada.
+
+        Args:
+            search: Termo de busca (ignora acentos e maiúsculas)
+            sort_by: Coluna de ordenação (None mantém a ordem original)
+            ascending: Ordem crescente ou decrescente
+            offset: Posição da primeira linha da fatia
+            limit: Número máximo de linhas da fatia
+
+        Returns:
+            Tupla (linhas da fatia, total de linhas que atendem à busca)
+        """
+        if sort_by in self.columns:
+            positions = self._order(sort_by, ascending)
+        else:
+            positions = np.arange(len(self.df))
+
+        term = normalize_text(search.strip()) if search else ""
+        if term:
+            positions = positions[self._search_mask(term)[positions]]
+
+        page = positions[offset : offset + limit]
+        return self.df.iloc[page], len(positions)
@@ -0,0 +1,119 @@
+"""
+Aquecimento dos caches em segundo plano.
+
+Ao iniciar o servidor (e sempre que a versão dos dados muda), uma thread
+carrega todos os conjuntos de dados e executa as tarefas de aquecimento
+registradas pelos componentes, que pré-calculam agregados e gráficos da
+visão padrão de cada página para todas as redes. O estado do aquecimento
+aparece no painel de desempenho dos administradores.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List
+
+import streamlit as st
+
+from src.data.data_loader import DataLoader
+from src.utils.tracing import panel_section
+
+logger = logging.getLogger(__name__)
+
+WarmupTask = Callable[[DataLoader, str], None]
+
+_tasks: List[WarmupTask] = []
+_lock = threading.Lock()
+_state: Dict = {
+    "version": None,
+    "ready": False,
+    "duration": None,
+    "error": None,
+}
+
+
+def warmup_task(func: WarmupTask) -> WarmupTask:
+    """Registra uma função ``func(data_loader, rede)`` de aquecimento."""
+    _tasks.append(func)
+    return func
+
+
+def start_warmup(data_loader: DataLoader) -> bool:
+    """
+    Inicia o aquecimento em segundo plano para a versão atual dos dados.
+
+    Returns:
+        True se uma nova thread foi iniciada, False se a versão atual já
+        está aquecida ou em aquecimento.
+    """
+    version = data_loader.data_version
+    with _lock:
+        if _state["version"] == version:
+            return False
+        _state.update(version=version, ready=False, duration=None, error=None)
+
+    thread = threading.Thread(
+        target=_run_warmup,
+        args=(data_loader, version),
+        name="dashboard-warmup",
+        daemon=True,
+    )
+    thread.start()
+    return True
+
+
+def is_warmup_ready(data_loader: DataLoader = None) -> bool:
+    """Indica se o aquecimento terminou (para a versão atual, se informada)."""
+    with _lock:
+        if data_loader is not None and _state["version"] != data_loader.data_version:
+            return False
+        return _state["ready"]
+
+
+def get_warmup_status() -> Dict:
+    """Retorna uma cópia do estado do aquecimento."""
+    with _lock:
+        return dict(_state)
+
+
+@panel_section
+def _render_warmup_status():
+    """Estado do aquecimento no painel de desempenho."""
+    status = get_warmup_status()
+    if status["version"] is None:
+        st.caption("🔥 Aquecimento: não iniciado")
+    elif not status["ready"]:
+        st.caption(f"🔥 Aquecimento da versão {status['version']}: em andamento")
+    elif status["error"]:
+        st.caption(f"🔥 Aquecimento da versão {status['version']}: falhou")
+        st.code(status["error"])
+    else:
+        st.caption(
+            f"🔥 Aquecimento da versão {status['version']}: concluído em "
+            f"{status['duration']:.1f} s ({len(_tasks)} tarefas por rede)"
+        )
+
+
+def _run_warmup(data_loader: DataLoader, version: str):
+    """Executa o aquecimento: carga dos dados e tarefas por rede."""
+    inicio = time.perf_counter()
+    error = None
+    try:
+        data_loader.load_all()
+        stats = data_loader.get_summary_stats()
+        for rede in stats["redes_analisadas"]:
+            data_loader.get_rede_summary(rede)
+            for task in _tasks:
+                task(data_loader, rede)
+    except Exception as e:  # o aquecimento nunca deve derrubar o servidor
+        logger.exception("Falha no aquecimento dos caches")
+        error = str(e)
+
+    with _lock:
+        # Uma recarga pode ter iniciado outro aquecimento nesse meio tempo
+        if _state["version"] == version:
+            _state.update(
+                ready=True,
+                duration=time.perf_counter() - inicio,
+                error=error,
+            )
@@ -0,0 +1 @@
+# Módulo de relatórios em PDF
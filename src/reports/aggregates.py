@@ -0,0 +1,169 @@
+"""
+Dados pré-agregados dos relatórios municipais.
+
+O processo principal agrega as três bases uma única vez e monta, para cada
+município, um pacote pequeno: IDEB e meta por rede com a posição no ranking
+da UF, matrículas por série e rede e taxas de rendimento por rede. As taxas
+de referência da UF e as distribuições do IDEB por UF e rede ficam à parte,
+compartilhadas pelos municípios. Tudo é gravado em um único snapshot, lido
+pelos processos do pool na inicialização; cada tarefa recebe só o código
+do município.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.data_loader import DataLoader
+from src.data.rates import RATE_COLUMNS, weighted_rates
+
+# Mudanças no layout do relatório devem incrementar a versão (regenera todos)
+REPORT_VERSION = 1
+
+TAXAS = list(RATE_COLUMNS)
+
+
+def build_report_data(data_loader: DataLoader, ufs: Optional[Iterable[str]] = None):
+    """
+    Agrega as bases para os relatórios.
+
+    Args:
+        data_loader: DataLoader da pasta de dados
+        ufs: UFs incluídas (None inclui todas)
+
+    Returns:
+        Dicionário com ``municipios`` (código -> pacote), ``taxas_uf``,
+        ``distribuicoes`` ((UF, rede) -> valores do IDEB), ``redes`` e
+        ``data_version``
+    """
+    ideb_df = data_loader.load_ideb_data()
+    microdados = data_loader.load_microdados()
+    dados_serie = data_loader.load_dados_serie()
+    if ufs is not None:
+        ufs = list(ufs)
+        ideb_df = ideb_df[ideb_df["SG_UF"].isin(ufs)]
+        microdados = microdados[microdados["SG_UF"].isin(ufs)]
+        dados_serie = dados_serie[dados_serie["SG_UF"].isin(ufs)]
+
+    # Posição no ranking do IDEB 2023 entre os municípios da UF, por rede
+    colunas_ideb = ["CO_MUNICIPIO", "SG_UF", "REDE", "VL_OBSERVADO_2023"]
+    ideb = ideb_df[colunas_ideb + ["VL_PROJECAO_2021", "acima_meta"]].copy()
+    grupos = ideb.groupby(["SG_UF", "REDE"])["VL_OBSERVADO_2023"]
+    ideb["POSICAO"] = grupos.rank(ascending=False, method="min")
+    ideb["TOTAL"] = grupos.transform("count")
+
+    matriculas = (
+        microdados.groupby(["CO_MUNICIPIO", "REDE", "ANO_ESCOLAR"])["QT_MATRICULAS"]
+        .sum()
+        .reset_index()
+    )
+
+    taxas = weighted_rates(
+        dados_serie, [("CO_MUNICIPIO", "REDE"), ("SG_UF", "REDE")], decimals=1
+    )
+    taxas_municipio = taxas[("CO_MUNICIPIO", "REDE")][["CO_MUNICIPIO", "REDE"] + TAXAS]
+    taxas_uf = taxas[("SG_UF", "REDE")][["SG_UF", "REDE"] + TAXAS]
+
+    cadastro = (
+        pd.concat(
+            [
+                df[["CO_MUNICIPIO", "NO_MUNICIPIO", "SG_UF", "SRE"]]
+                for df in (microdados, dados_serie, ideb_df)
+            ]
+        )
+        .drop_duplicates("CO_MUNICIPIO")
+        .set_index("CO_MUNICIPIO")
+    )
+
+    por_municipio = {
+        nome: dict(tuple(df.groupby("CO_MUNICIPIO")))
+        for nome, df in (
+            ("ideb", ideb.drop(columns="SG_UF")),
+            ("matriculas", matriculas),
+            ("taxas", taxas_municipio),
+        )
+    }
+    codigos = sorted(set().union(*(tabela.keys() for tabela in por_municipio.values())))
+
+    municipios = {}
+    for codigo in codigos:
+        linha = cadastro.loc[codigo]
+        pacote = {
+            "codigo": int(codigo),
+            "nome": str(linha["NO_MUNICIPIO"]),
+            "uf": str(linha["SG_UF"]),
+            "sre": None if pd.isna(linha["SRE"]) else str(linha["SRE"]),
+        }
+        for nome, tabela in por_municipio.items():
+            df = tabela.get(codigo)
+            pacote[nome] = (
+                df.drop(columns="CO_MUNICIPIO").reset_index(drop=True)
+                if df is not None
+                else None
+            )
+        municipios[int(codigo)] = pacote
+
+    distribuicoes = {
+        (uf, rede): np.sort(serie.dropna().to_numpy(dtype=np.float64))
+        for (uf, rede), serie in grupos
+    }
+
+    return {
+        "data_version": data_loader.data_version,
+        "redes": sorted(ideb["REDE"].dropna().unique().tolist()),
+        "municipios": municipios,
+        "taxas_uf": {
+            uf: df.drop(columns="SG_UF") for uf, df in taxas_uf.groupby("SG_UF")
+        },
+        "distribuicoes": distribuicoes,
+    }
+
+
+def content_hash(data: dict, codigo: int) -> str:
+    """
+    Hash do conteúdo do relatório de um município.
+
+    Inclui o pacote do município e os dados compartilhados que aparecem no
+    relatório (taxas da UF e distribuição do IDEB da UF), além da versão do
+    layout: se nada disso mudou, o PDF existente continua válido.
+    """
+    pacote = data["municipios"][codigo]
+    digest = hashlib.sha256(f"v{REPORT_VERSION}".encode())
+    for chave, valor in pacote.items():
+        digest.update(chave.encode())
+        if isinstance(valor, pd.DataFrame):
+            digest.update(valor.to_csv(index=False).encode())
+        else:
+            digest.update(repr(valor).encode())
+
+    uf = pacote["uf"]
+    if uf in data["taxas_uf"]:
+        digest.update(data["taxas_uf"][uf].to_csv(index=False).encode())
+    for rede in data["redes"]:
+        valores = data["distribuicoes"].get((uf, rede))
+        if valores is not None:
+            digest.update(rede.encode() + valores.tobytes())
+    return digest.hexdigest()
+
+
+def write_report_snapshot(data: dict, directory: Path) -> Path:
+    """Grava o snapshot dos dados agregados (escrita atômica)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".agregados-", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    path = directory / f".agregados-{data['data_version']}.pkl"
+    os.replace(tmp, path)
+    return path
+
+
+def load_report_snapshot(path: str) -> Dict:
+    """Lê o snapshot gravado por ``write_report_snapshot``."""
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,203 @@
+"""
+Geração em lote dos relatórios municipais com um pool de processos.
+
+Os dados são agregados uma vez e gravados em um snapshot lido por cada
+processo na inicialização. Um manifesto na pasta de saída guarda o hash do
+conteúdo de cada relatório: só são gerados os municípios sem PDF ou cujo
+hash mudou. Cada tarefa devolve o próprio tempo de geração.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from src.data.data_loader import DataLoader
+from src.reports.aggregates import (
+    build_report_data,
+    content_hash,
+    load_report_snapshot,
+    write_report_snapshot,
+)
+from src.reports.render import ReportRenderer
+from src.utils.helpers import slugify
+
+MANIFEST_NAME = "manifest.json"
+
+# Renderizador do processo do pool (criado pelo inicializador)
+_renderer: Optional[ReportRenderer] = None
+
+
+@dataclass
+class ReportResult:
+    """Resultado da geração de um relatório."""
+
+    codigo: int
+    arquivo: str
+    hash: str
+    segundos: Optional[float] = None
+    erro: Optional[str] = None
+
+
+def _init_worker(snapshot_path: str):
+    global _renderer
+    _renderer = ReportRenderer(load_report_snapshot(snapshot_path))
+
+
+def _render_one(tarefa: tuple) -> tuple:
+    """Gera um relatório no processo do pool; devolve (código, s, erro)."""
+    codigo, arquivo = tarefa
+    inicio = time.perf_counter()
+    try:
+        _renderer.render(codigo, Path(arquivo))
+    except Exception as e:  # noqa: BLE001 - reportado no resumo
+        return codigo, None, f"{type(e).__name__}: {e}"
+    return codigo, time.perf_counter() - inicio, None
+
+
+def report_path(saida: Path, pacote: dict) -> Path:
+    """Arquivo do relatório: ``<saída>/<UF>/<código>_<nome>.pdf``."""
+    return saida / pacote["uf"] / f"{pacote['codigo']}_{slugify(pacote['nome'])}.pdf"
+
+
+def _load_manifest(saida: Path) -> dict:
+    try:
+        return json.loads((saida / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def generate_reports(
+    data_path: str,
+    saida: Path,
+    ufs: Optional[Iterable[str]] = None,
+    municipios: Optional[Iterable[int]] = None,
+    processos: Optional[int] = None,
+    forcar: bool = False,
+    progresso=None,
+) -> dict:
+    """
+    Gera os relatórios dos municípios cujo conteúdo mudou.
+
+    Args:
+        data_path: Pasta com os CSVs
+        saida: Pasta dos PDFs e do manifesto
+        ufs: UFs incluídas (None inclui todas)
+        municipios: Códigos IBGE incluídos (None inclui todos)
+        processos: Tamanho do pool (None usa o número de CPUs)
+        forcar: Regenera todos, ignorando o manifesto
+        progresso: Função chamada com (feitos, total) a cada relatório
+
+    Returns:
+        Dicionário com ``gerados`` e ``inalterados`` (listas de
+        ``ReportResult``) e os tempos das etapas em ``etapas``
+    """
+    etapas = {}
+    inicio = time.perf_counter()
+    data = build_report_data(DataLoader(data_path), ufs)
+    etapas["agregação"] = time.perf_counter() - inicio
+
+    # Seleção incremental pelo hash do conteúdo
+    inicio = time.perf_counter()
+    manifesto = _load_manifest(saida)
+    anteriores = manifesto.get("relatorios", {})
+    selecionados = set(municipios) if municipios is not None else None
+    pendentes, inalterados = [], []
+    for codigo, pacote in data["municipios"].items():
+        if selecionados is not None and codigo not in selecionados:
+            continue
+        resultado = ReportResult(
+            codigo,
+            str(report_path(saida, pacote)),
+            content_hash(data, codigo),
+        )
+        anterior = anteriores.get(str(codigo), {})
+        if (
+            not forcar
+            and anterior.get("hash") == resultado.hash
+            and Path(resultado.arquivo).exists()
+        ):
+            resultado.segundos = anterior.get("segundos")
+            inalterados.append(resultado)
+        else:
+            pendentes.append(resultado)
+    etapas["comparação"] = time.perf_counter() - inicio
+
+    if not pendentes:
+        _write_manifest(saida, data, anteriores, pendentes)
+        return {
+            "gerados": [],
+            "inalterados": inalterados,
+            "etapas": etapas,
+            "processos": 0,
+        }
+
+    inicio = time.perf_counter()
+    snapshot = write_report_snapshot(data, saida)
+    etapas["snapshot"] = time.perf_counter() - inicio
+
+    # Municípios da mesma UF em sequência aproveitam o histograma em cache
+    pendentes.sort(key=lambda r: r.arquivo)
+    por_codigo = {r.codigo: r for r in pendentes}
+    tarefas = [(r.codigo, r.arquivo) for r in pendentes]
+    processos = max(1, min(processos or os.cpu_count() or 1, len(tarefas) or 1))
+
+    inicio = time.perf_counter()
+    try:
+        if processos == 1:
+            _init_worker(str(snapshot))
+            resultados = map(_render_one, tarefas)
+            _executar(resultados, por_codigo, progresso)
+        else:
+            with ProcessPoolExecutor(
+                processos, initializer=_init_worker, initargs=(str(snapshot),)
+            ) as pool:
+                chunksize = max(1, len(tarefas) // (processos * 8))
+                resultados = pool.map(_render_one, tarefas, chunksize=chunksize)
+                _executar(resultados, por_codigo, progresso)
+    finally:
+        snapshot.unlink(missing_ok=True)
+    etapas["geração"] = time.perf_counter() - inicio
+
+    _write_manifest(saida, data, anteriores, pendentes)
+    return {
+        "gerados": pendentes,
+        "inalterados": inalterados,
+        "etapas": etapas,
+        "processos": processos,
+    }
+
+
+def _write_manifest(saida: Path, data: dict, anteriores: dict, gerados: list):
+    """Grava o manifesto; só entram os relatórios gerados com sucesso."""
+    relatorios = dict(anteriores)
+    for resultado in gerados:
+        if resultado.erro is None:
+            relatorios[str(resultado.codigo)] = {
+                "hash": resultado.hash,
+                "arquivo": os.path.relpath(resultado.arquivo, saida),
+                "segundos": round(resultado.segundos, 4),
+            }
+    manifesto = {"data_version": data["data_version"], "relatorios": relatorios}
+    saida.mkdir(parents=True, exist_ok=True)
+    (saida / MANIFEST_NAME).write_text(
+        json.dumps(manifesto, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+
+
+def _executar(resultados, por_codigo: dict, progresso):
+    """Registra o tempo (ou o erro) de cada relatório à medida que terminam."""
+    for feitos, (codigo, segundos, erro) in enumerate(resultados, 1):
+        por_codigo[codigo].segundos = segundos
+        por_codigo[codigo].erro = erro
+        if progresso is not None:
+            progresso(feitos, len(por_codigo))
+
+
+def slowest(resultados: List[ReportResult], n: int = 5) -> List[ReportResult]:
+    """Relatórios mais lentos entre os gerados com sucesso."""
+    validos = [r for r in resultados if r.segundos is not None]
+    return sorted(validos, key=lambda r: r.segundos, reverse=True)[:n]
@@ -0,0 +1,295 @@
+"""
+Relatório municipal em PDF (uma página A4) com matplotlib.
+
+As figuras são criadas sem o ``pyplot`` (sem estado global nem gerenciador
+de janelas), com o backend Agg. O histograma do IDEB da UF, igual em todos
+os relatórios dos municípios da UF, é desenhado uma vez por processo e
+reaproveitado como imagem; cada relatório só acrescenta a linha do
+município.
+"""
+
+import os
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.reports.aggregates import TAXAS
+
+A4 = (8.27, 11.69)
+
+CORES_REDE = ["#1e3a8a", "#60a5fa", "#0f766e", "#f59e0b"]
+CORES_TAXA = {
+    "Taxa_Aprovacao": "#16a34a",
+    "Taxa_Reprovacao": "#f59e0b",
+    "Taxa_Evasao": "#dc2626",
+}
+ROTULOS_TAXA = {
+    "Taxa_Aprovacao": "Aprovação",
+    "Taxa_Reprovacao": "Reprovação",
+    "Taxa_Evasao": "Evasão",
+}
+
+
+def _numero(valor: float, casas: int = 1) -> str:
+    return f"{valor:,.{casas}f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _render_distribution(valores: np.ndarray) -> Tuple[np.ndarray, tuple]:
+    """
+    Histograma do IDEB desenhado em uma imagem sem margens nem eixos.
+
+    Returns:
+        Tupla (imagem RGBA, extent (x0, x1, y0, y1) para o ``imshow``)
+    """
+    x0 = np.floor(valores.min()) - 0.5 if len(valores) else 0.0
+    x1 = np.ceil(valores.max()) + 0.5 if len(valores) else 10.0
+    fig = Figure(figsize=(3.6, 1.4), dpi=150)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    contagens, _, _ = ax.hist(
+        valores, bins=np.arange(x0, x1 + 0.01, 0.2), color="#bfdbfe", ec="white"
+    )
+    y1 = max(contagens.max() if len(contagens) else 0, 1) * 1.15
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(0, y1)
+    ax.axis("off")
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy(), (x0, x1, 0, y1)
+
+
+class ReportRenderer:
+    """Gera os relatórios a partir dos dados de ``build_report_data``."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self._distribuicoes: Dict[tuple, Tuple[np.ndarray, tuple]] = {}
+
+    def distribution_image(self, uf: str, rede: str):
+        """Histograma da UF e rede (desenhado uma vez por processo)."""
+        chave = (uf, rede)
+        if chave not in self._distribuicoes:
+            valores = self.data["distribuicoes"].get(chave, np.empty(0))
+            self._distribuicoes[chave] = _render_distribution(valores)
+        return self._distribuicoes[chave]
+
+    def render(self, codigo: int, path: Path):
+        """Grava o PDF do município (arquivo temporário renomeado ao final)."""
+        pacote = self.data["municipios"][codigo]
+        fig = Figure(figsize=A4)
+        FigureCanvasAgg(fig)
+        self._cabecalho(fig, pacote)
+
+        grade = fig.add_gridspec(
+            4, 2, top=0.86, bottom=0.05, left=0.14, right=0.95, hspace=0.6
+        )
+        self._ideb_vs_meta(fig.add_subplot(grade[0, 0]), pacote)
+        self._ranking(fig.add_subplot(grade[0, 1]), pacote)
+        redes = self.data["redes"]
+        linha = grade[1, :].subgridspec(1, max(len(redes), 1), wspace=0.25)
+        for i, rede in enumerate(redes):
+            self._distribuicao(fig.add_subplot(linha[0, i]), pacote, rede)
+        self._matriculas(fig.add_subplot(grade[2, :]), pacote)
+        self._rendimento(fig.add_subplot(grade[3, :]), pacote)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        fig.savefig(tmp, format="pdf")
+        os.replace(tmp, path)
+
+    def _cabecalho(self, fig: Figure, pacote: dict):
+        fig.text(
+            0.5,
+            0.965,
+            f"Relatório Municipal — {pacote['nome']} ({pacote['uf']})",
+            ha="center",
+            fontsize=15,
+            weight="bold",
+            color="#1f4e79",
+        )
+        detalhes = [f"Código IBGE {pacote['codigo']}"]
+        if pacote["sre"]:
+            detalhes.append(f"SRE {pacote['sre']}")
+        detalhes.append(f"Dados {self.data['data_version']}")
+        detalhes.append(f"Gerado em {date.today():%d/%m/%Y}")
+        fig.text(0.5, 0.94, " · ".join(detalhes), ha="center", fontsize=9)
+        fig.text(
+            0.5,
+            0.92,
+            "IDEB 2023 e meta, matrículas por série e taxas de rendimento "
+            "(anos finais do ensino fundamental)",
+            ha="center",
+            fontsize=8,
+            color="#555555",
+        )
+
+    def _ideb_vs_meta(self, ax, pacote: dict):
+        ax.set_title("IDEB 2023 × Meta", fontsize=10, loc="left")
+        ideb = pacote["ideb"]
+        if ideb is None or ideb["VL_OBSERVADO_2023"].isna().all():
+            _sem_dados(ax, "Sem IDEB divulgado")
+            return
+        x = np.arange(len(ideb))
+        barras = ax.bar(
+            x - 0.2, ideb["VL_OBSERVADO_2023"], 0.4, label="IDEB", color="#1e3a8a"
+        )
+        ax.bar(x + 0.2, ideb["VL_PROJECAO_2021"], 0.4, label="Meta", color="#93c5fd")
+        ax.bar_label(barras, fmt="%.1f", fontsize=7)
+        ax.set_xticks(x, ideb["REDE"], fontsize=8)
+        ax.set_ylim(0, 10)
+        ax.tick_params(labelsize=7)
+        ax.legend(fontsize=7, frameon=False)
+
+    def _ranking(self, ax, pacote: dict):
+        ax.set_title("Posição no ranking da UF", fontsize=10, loc="left")
+        ax.axis("off")
+        ideb = pacote["ideb"]
+        if ideb is None:
+            _sem_dados(ax, "Sem IDEB divulgado")
+            return
+        y = 0.85
+        for linha in ideb.itertuples(index=False):
+            if np.isnan(linha.VL_OBSERVADO_2023):
+                texto = f"{linha.REDE}: sem IDEB divulgado"
+                situacao = ""
+            else:
+                texto = (
+                    f"{linha.REDE}: {int(linha.POSICAO)}º de {int(linha.TOTAL)} "
+                    f"(IDEB {_numero(linha.VL_OBSERVADO_2023)})"
+                )
+                situacao = (
+                    "acima da meta"
+                    if linha.acima_meta
+                    else f"abaixo da meta ({_numero(linha.VL_PROJECAO_2021)})"
+                )
+            ax.text(0, y, texto, fontsize=9, weight="bold", transform=ax.transAxes)
+            ax.text(
+                0,
+                y - 0.13,
+                situacao,
+                fontsize=8,
+                color="#16a34a" if situacao == "acima da meta" else "#dc2626",
+                transform=ax.transAxes,
+            )
+            y -= 0.35
+
+    def _distribuicao(self, ax, pacote: dict, rede: str):
+        imagem, extent = self.distribution_image(pacote["uf"], rede)
+        ax.imshow(imagem, extent=extent, aspect="auto", interpolation="bilinear")
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
+        ax.set_yticks([])
+        ax.tick_params(labelsize=7)
+        ax.set_title(f"IDEB na UF — {rede}", fontsize=9, loc="left")
+
+        valor = _valor_ideb(pacote, rede)
+        if valor is not None:
+            ax.axvline(valor, color="#dc2626", lw=1.5)
+            ax.text(
+                valor,
+                extent[3] * 0.92,
+                f" {_numero(valor)}",
+                color="#dc2626",
+                fontsize=7,
+            )
+
+    def _matriculas(self, ax, pacote: dict):
+        matriculas = pacote["matriculas"]
+        if matriculas is None or matriculas.empty:
+            ax.set_title("Matrículas por série", fontsize=10, loc="left")
+            _sem_dados(ax, "Sem matrículas")
+            return
+        total = matriculas["QT_MATRICULAS"].sum()
+        ax.set_title(
+            f"Matrículas por série (total {_numero(total, 0)})", fontsize=10, loc="left"
+        )
+        tabela = matriculas.pivot_table(
+            index="ANO_ESCOLAR", columns="REDE", values="QT_MATRICULAS", aggfunc="sum"
+        ).fillna(0)
+        x = np.arange(len(tabela))
+        largura = 0.8 / max(len(tabela.columns), 1)
+        for i, rede in enumerate(tabela.columns):
+            barras = ax.bar(
+                x + (i - (len(tabela.columns) - 1) / 2) * largura,
+                tabela[rede],
+                largura,
+                label=rede,
+                color=CORES_REDE[i % len(CORES_REDE)],
+            )
+            ax.bar_label(barras, fmt="%d", fontsize=6)
+        ax.set_xticks(x, [f"{ano}º ano" for ano in tabela.index], fontsize=8)
+        ax.tick_params(labelsize=7)
+        ax.legend(fontsize=7, frameon=False)
+
+    def _rendimento(self, ax, pacote: dict):
+        ax.set_title(
+            "Taxas de rendimento (%) — município e UF", fontsize=10, loc="left"
+        )
+        taxas = pacote["taxas"]
+        if taxas is None or taxas.empty:
+            _sem_dados(ax, "Sem dados de rendimento")
+            return
+        taxas_uf = self.data["taxas_uf"].get(pacote["uf"])
+        linhas, rotulos = [], []
+        for linha in taxas.itertuples(index=False):
+            linhas.append([getattr(linha, t) for t in TAXAS])
+            rotulos.append(linha.REDE)
+            referencia = _linha_uf(taxas_uf, linha.REDE)
+            if referencia is not None:
+                linhas.append(referencia)
+                rotulos.append(f"{linha.REDE} ({pacote['uf']})")
+
+        valores = np.nan_to_num(np.array(linhas, dtype=np.float64))
+        y = np.arange(len(linhas))[::-1]
+        inicio = np.zeros(len(linhas))
+        for j, taxa in enumerate(TAXAS):
+            barras = ax.barh(
+                y,
+                valores[:, j],
+                left=inicio,
+                color=CORES_TAXA[taxa],
+                label=ROTULOS_TAXA[taxa],
+                height=0.6,
+            )
+            ax.bar_label(
+                barras,
+                labels=[f"{v:.1f}" if v >= 4 else "" for v in valores[:, j]],
+                label_type="center",
+                fontsize=6,
+                color="white",
+            )
+            inicio += valores[:, j]
+        ax.set_yticks(y, rotulos, fontsize=8)
+        ax.set_xlim(0, 100)
+        ax.tick_params(labelsize=7)
+        ax.legend(
+            fontsize=7,
+            frameon=False,
+            ncol=3,
+            loc="lower right",
+            bbox_to_anchor=(1, 1),
+        )
+
+
+def _sem_dados(ax, mensagem: str):
+    ax.text(0.5, 0.5, mensagem, ha="center", va="center", transform=ax.transAxes)
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+
+def _valor_ideb(pacote: dict, rede: str) -> Optional[float]:
+    ideb = pacote["ideb"]
+    if ideb is None:
+        return None
+    valores = ideb.loc[ideb["REDE"] == rede, "VL_OBSERVADO_2023"].dropna()
+    return float(valores.iloc[0]) if len(valores) else None
+
+
+def _linha_uf(taxas_uf, rede: str) -> Optional[list]:
+    if taxas_uf is None:
+        return None
+    linha = taxas_uf[taxas_uf["REDE"] == rede]
+    return linha[TAXAS].iloc[0].tolist() if len(linha) else None
@@ -0,0 +1,84 @@
+"""
+Modo de gráfico conforme a quantidade de pontos.
+
+Com poucos pontos os gráficos são desenhados normalmente (SVG). Acima de
+``WEBGL_MIN_POINTS`` as dispersões usam traços WebGL; acima de
+``CHART_MAX_POINTS`` (ou ``CHART_MAX_BARS`` em gráficos de barras) o
+servidor envia um resumo calculado com NumPy (densidade em grade ou
+top-N + "demais"), mantendo o tempo de renderização limitado.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from src.utils.settings import CHART_MAX_BARS, CHART_MAX_POINTS, WEBGL_MIN_POINTS
+
+SVG = "svg"
+WEBGL = "webgl"
+RESUMO = "resumo"
+
+
+def scatter_mode(n_points: int) -> str:
+    """Modo de renderização de uma dispersão com ``n_points`` pontos."""
+    if n_points > CHART_MAX_POINTS:
+        return RESUMO
+    if n_points >= WEBGL_MIN_POINTS:
+        return WEBGL
+    return SVG
+
+
+def bar_mode(n_bars: int) -> str:
+    """Modo de renderização de um gráfico com ``n_bars`` barras."""
+    return RESUMO if n_bars > CHART_MAX_BARS else SVG
+
+
+def top_n_with_others(
+    labels: np.ndarray, values: np.ndarray, n: int, others_label: str
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Mantém os ``n`` maiores valores e resume os demais pela média.
+
+    Args:
+        labels: Rótulos das barras
+        values: Valores das barras
+        n: Quantidade de barras mantidas
+        others_label: Rótulo da barra que resume as demais
+
+    Returns:
+        Tupla (rótulos, valores, quantidade de itens resumidos)
+    """
+    labels = np.asarray(labels, dtype=object)
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= n:
+        order = np.argsort(-values, kind="stable")
+        return labels[order], values[order], 0
+
+    # argpartition separa os n maiores em O(len); só eles são ordenados
+    top = np.argpartition(-values, n - 1)[:n]
+    top = top[np.argsort(-values[top], kind="stable")]
+    rest = np.ones(len(values), dtype=bool)
+    rest[top] = False
+
+    out_labels = np.append(labels[top], others_label)
+    out_values = np.append(values[top], values[rest].mean())
+    return out_labels, out_values, int(rest.sum())
+
+
+def density_grid(
+    x: np.ndarray, y: np.ndarray, bins: int = 60
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Conta os pontos em uma grade regular (densidade 2D).
+
+    Returns:
+        Tupla (centros em x, centros em y, contagens com shape (y, x));
+        células vazias ficam como NaN para não serem desenhadas
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=bins)
+    counts = counts.T
+    counts[counts == 0] = np.nan
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, counts
@@ -0,0 +1,206 @@
+"""
+Exportação de tabelas em blocos (CSV, Excel e Parquet).
+
+O arquivo é gerado bloco a bloco direto em disco, em
+``static/exports/<token>/``: o CSV é escrito em partes, o Excel por um
+escritor de memória constante (xlsxwriter ``constant_memory`` ou openpyxl
+``write_only``) e o Parquet com um row group por bloco. O arquivo pronto é
+servido pelo Streamlit em ``app/static/`` (como as malhas dos mapas) e nunca
+é lido de volta para o processo; o token aleatório torna a URL não
+adivinhável e os arquivos são apagados depois de ``EXPORT_TTL`` segundos.
+Excel e Parquet só são oferecidos se a biblioteca estiver instalada.
+"""
+
+import secrets
+import shutil
+import time
+from dataclasses import dataclass
+from importlib.util import find_spec
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+from src.utils.helpers import slugify
+from src.utils.settings import EXPORT_CHUNK_ROWS
+from src.utils.tracing import span
+
+# Linhas por planilha do Excel (o limite do formato inclui o cabeçalho)
+EXCEL_MAX_ROWS = 1_048_576
+
+EXPORT_DIR = Path(__file__).resolve().parents[2] / "static" / "exports"
+EXPORT_URL = "app/static/exports"
+
+# Maior arquivo servido pelo Streamlit em app/static/
+EXPORT_MAX_BYTES = 200 * 2**20
+
+# Tempo que um arquivo gerado fica disponível para download (s)
+EXPORT_TTL = 3600
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """Formato de exportação e a função que o escreve."""
+
+    extension: str
+    mime: str
+    writer: Callable[[pd.DataFrame, BinaryIO, int], None]
+    # Bibliotecas que permitem escrever o formato (basta uma)
+    modules: Tuple[str, ...] = ()
+
+    @property
+    def available(self) -> bool:
+        return not self.modules or any(find_spec(m) for m in self.modules)
+
+
+def chunks(df: pd.DataFrame, rows: int) -> Iterator[pd.DataFrame]:
+    """Blocos consecutivos de até ``rows`` linhas (um bloco vazio se vazia)."""
+    for start in range(0, max(len(df), 1), rows):
+        yield df.iloc[start : start + rows]
+
+
+def _python_rows(chunk: pd.DataFrame) -> Iterator[tuple]:
+    """Linhas do bloco com tipos do Python e ``None`` nos valores ausentes."""
+    values = chunk.astype(object)
+    return values.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def write_csv(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int):
+    """CSV em UTF-8 com BOM (abre com acentos no Excel), escrito em blocos."""
+    for i, chunk in enumerate(chunks(df, chunk_rows)):
+        text = chunk.to_csv(index=False, header=i == 0)
+        fh.write(text.encode("utf-8-sig" if i == 0 else "utf-8"))
+
+
+def write_excel(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int):
+    """Planilha gravada linha a linha; acima do limite do Excel, mais abas."""
+    header = [str(c) for c in df.columns]
+    sheet_rows = EXCEL_MAX_ROWS - 1
+
+    use_xlsxwriter = find_spec("xlsxwriter") is not None
+    if use_xlsxwriter:
+        import xlsxwriter
+
+        workbook = xlsxwriter.Workbook(
+            fh, {"constant_memory": True, "nan_inf_to_errors": True}
+        )
+        add_sheet = workbook.add_worksheet
+
+        def append(sheet, row_number, row):
+            sheet.write_row(row_number, 0, row)
+
+    else:
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        add_sheet = workbook.create_sheet
+
+        def append(sheet, row_number, row):
+            sheet.append(row)
+
+    sheets, sheet, written = 0, None, sheet_rows
+    for chunk in chunks(df, chunk_rows):
+        for row in _python_rows(chunk):
+            if written == sheet_rows:
+                sheets += 1
+                sheet = add_sheet("Dados" if sheets == 1 else f"Dados {sheets}")
+                append(sheet, 0, header)
+                written = 0
+            written += 1
+            append(sheet, written, row)
+    if sheet is None:
+        append(add_sheet("Dados"), 0, header)
+
+    if use_xlsxwriter:
+        workbook.close()
+    else:
+        workbook.save(fh)
+
+
+def write_parquet(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int):
+    """Parquet com um row group por bloco."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(fh, schema) as writer:
+        for chunk in chunks(df, chunk_rows):
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+
+
+FORMATOS: Dict[str, ExportFormat] = {
+    "CSV": ExportFormat("csv", "text/csv", write_csv),
+    "Excel": ExportFormat(
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        write_excel,
+        ("xlsxwriter", "openpyxl"),
+    ),
+    "Parquet": ExportFormat(
+        "parquet", "application/vnd.apache.parquet", write_parquet, ("pyarrow",)
+    ),
+}
+
+
+def available_formats() -> List[str]:
+    """Formatos cujas bibliotecas estão instaladas."""
+    return [nome for nome, formato in FORMATOS.items() if formato.available]
+
+
+def export_table(
+    df: pd.DataFrame,
+    formato: str,
+    file_name: str,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> str:
+    """
+    Grava o arquivo da tabela no formato informado em ``EXPORT_DIR``.
+
+    Args:
+        df: Tabela a exportar
+        formato: Chave de ``FORMATOS``
+        file_name: Nome do arquivo
+        chunk_rows: Linhas por bloco
+
+    Returns:
+        URL relativa do arquivo
+
+    Raises:
+        ValueError: Se o arquivo passa de ``EXPORT_MAX_BYTES``
+    """
+    prune_exports()
+    pasta = EXPORT_DIR / secrets.token_urlsafe(16)
+    pasta.mkdir(parents=True)
+    with span(f"exportacao.{FORMATOS[formato].extension}"):
+        with open(pasta / file_name, "wb") as fh:
+            FORMATOS[formato].writer(df, fh, chunk_rows)
+
+    tamanho = (pasta / file_name).stat().st_size
+    if tamanho > EXPORT_MAX_BYTES:
+        shutil.rmtree(pasta, ignore_errors=True)
+        raise ValueError(
+            f"O arquivo ({tamanho / 2**20:.0f} MB) passa do limite de "
+            f"{EXPORT_MAX_BYTES // 2**20} MB; refine os filtros ou use o Parquet"
+        )
+    return f"{EXPORT_URL}/{pasta.name}/{file_name}"
+
+
+def prune_exports(ttl: float = EXPORT_TTL):
+    """Apaga os arquivos exportados há mais de ``ttl`` segundos."""
+    if not EXPORT_DIR.exists():
+        return
+    limite = time.time() - ttl
+    for pasta in EXPORT_DIR.iterdir():
+        try:
+            if pasta.is_dir() and pasta.stat().st_mtime < limite:
+                shutil.rmtree(pasta, ignore_errors=True)
+        except OSError:  # apagada por outro processo
+            continue
+
+
+def export_file_name(nome: str, formato: str, *filtros: str) -> str:
+    """Nome do arquivo com os filtros aplicados (sem acentos nem espaços)."""
+    partes = [nome] + [f for f in filtros if f not in ("Todos", "Todas")]
+    return f"{slugify('_'.join(partes))}.{FORMATOS[formato].extension}"
@@ -0,0 +1,261 @@
+"""
+Cache de gráficos Plotly serializados.
+
+Os gráficos são guardados como especificação JSON, com chave formada por
+(componente, id do gráfico, filtros normalizados, versão dos dados). Em um
+acerto, o texto JSON vai direto para a mensagem do gráfico enviada ao
+navegador, sem reconstruir a figura, sem validação do Plotly e sem uma nova
+serialização. O cache é compartilhado entre as sessões do processo e
+limitado em bytes, descartando primeiro os itens menos usados.
+"""
+
+import functools
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+import streamlit as st
+
+try:  # mensagem do gráfico montada com o texto já serializado
+    from streamlit.elements.lib.form_utils import current_form_id
+    from streamlit.elements.lib.layout_utils import LayoutConfig
+    from streamlit.elements.lib.utils import compute_and_register_element_id
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+
+    _mensagem_direta = True
+except ImportError:  # outra versão do Streamlit: caminho público
+    _mensagem_direta = False
+
+from src.utils.payload import serialize_figure
+from src.utils.settings import COMPACT_CHARTS, FIGURE_CACHE_MAX_MB
+from src.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+FigureKey = Tuple[str, str, tuple, str]
+
+# Altura padrão do plotly.js (usada quando o layout não define a altura)
+_ALTURA_PADRAO = 450
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """Especificação JSON de um gráfico e a altura do layout."""
+
+    json: str
+    height: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.json)
+
+
+# Marca de "construtor sem dados" no cache
+_SEM_GRAFICO = ChartSpec("")
+
+
+class FigureCache:
+    """Cache LRU de especificações de gráficos limitado em bytes."""
+
+    def __init__(self, max_bytes: int):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_bytes: Tamanho máximo somado das especificações armazenadas
+        """
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[FigureKey, ChartSpec]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._data_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: FigureKey) -> Optional[ChartSpec]:
+        """Retorna a especificação armazenada (ou None) e a marca como usada."""
+        with self._lock:
+            spec = self._items.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return spec
+
+    def put(self, key: FigureKey, spec: ChartSpec):
+        """Armazena uma especificação, descartando itens antigos se preciso."""
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            # Uma nova versão dos dados torna as anteriores inúteis
+            data_version = key[3]
+            if data_version != self._data_version:
+                self._drop(lambda k: k[3] != data_version)
+                self._data_version = data_version
+
+            if key in self._items:
+                self._bytes -= len(self._items.pop(key))
+            self._items[key] = spec
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, removed = self._items.popitem(last=False)
+                self._bytes -= len(removed)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove todos os itens."""
+        with self._lock:
+            self._drop(lambda k: True)
+
+    def stats(self) -> dict:
+        """Estatísticas de uso do cache."""
+        with self._lock:
+            return {
+                "itens": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _drop(self, predicate: Callable[[FigureKey], bool]):
+        """Remove os itens cuja chave satisfaz o predicado (com lock)."""
+        for key in [k for k in self._items if predicate(k)]:
+            self._bytes -= len(self._items.pop(key))
+
+
+figure_cache = FigureCache(FIGURE_CACHE_MAX_MB * 1024 * 1024)
+
+# Construtores registrados por (componente, id do gráfico), sem cache
+figure_builders: Dict[Tuple[str, str], Callable] = {}
+
+
+def _normalize_filter(value) -> str:
+    """Normaliza um valor de filtro para compor a chave do cache."""
+    if value is None or value in ("Todas", "Todos"):
+        return "*"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return "|".join(sorted(_normalize_filter(v) for v in value))
+    if hasattr(value, "item"):  # escalares do NumPy
+        value = value.item()
+    return str(value).strip()
+
+
+def figure_key(
+    component: str, chart_id: str, filters: tuple, data_version: str
+) -> FigureKey:
+    """Monta a chave de cache de um gráfico."""
+    return (
+        component,
+        chart_id,
+        tuple(_normalize_filter(v) for v in filters),
+        data_version,
+    )
+
+
+def cached_figure(component: str, chart_id: str, decimals: int = 3):
+    """
+    Decorador para funções ``builder(data_loader, *filtros) -> Figure | None``.
+
+    A função decorada retorna a ``ChartSpec`` do gráfico (ou None, se não
+    houver dados), construindo a figura apenas em uma falha do cache.
+
+    Args:
+        component: Nome do componente (página) do gráfico
+        chart_id: Identificador do gráfico dentro do componente
+        decimals: Precisão de exibição usada na compactação dos valores
+    """
+
+    def decorator(builder):
+        figure_builders[(component, chart_id)] = builder
+
+        @functools.wraps(builder)
+        def wrapper(data_loader, *filters) -> Optional[ChartSpec]:
+            key = figure_key(component, chart_id, filters, data_loader.data_version)
+            spec = figure_cache.get(key)
+            if spec is None:
+                with span(f"grafico.{component}.{chart_id}"):
+                    fig = builder(data_loader, *filters)
+                    spec = _SEM_GRAFICO
+                    if fig is not None:
+                        spec = ChartSpec(
+                            serialize_figure(fig, decimals, compact=COMPACT_CHARTS),
+                            fig.layout.height,
+                        )
+                figure_cache.put(key, spec)
+            return spec if spec.json else None
+
+        return wrapper
+
+    return decorator
+
+
+def plotly_chart_spec(spec: ChartSpec, use_container_width: bool = True):
+    """
+    Exibe um gráfico a partir da especificação armazenada no cache.
+
+    O texto JSON entra como está na mensagem ``PlotlyChart``, como faria o
+    ``st.plotly_chart`` depois de validar e serializar a figura. Esse
+    caminho usa partes internas do Streamlit; se elas não existirem ou
+    mudarem de assinatura nesta versão, o gráfico (e os seguintes do
+    processo) passa pelo ``st.plotly_chart``.
+    """
+    global _mensagem_direta
+    with span("st.plotly_chart"):
+        if _mensagem_direta:
+            try:
+                _enqueue_spec(spec, use_container_width)
+                return
+            except (TypeError, AttributeError, ValueError):
+                logger.warning(
+                    "Envio direto do gráfico indisponível nesta versão do "
+                    "Streamlit; usando st.plotly_chart",
+                    exc_info=True,
+                )
+                _mensagem_direta = False
+
+        import plotly.io as pio
+
+        st.plotly_chart(
+            pio.from_json(spec.json, skip_invalid=True),
+            use_container_width=use_container_width,
+        )
+
+
+def _enqueue_spec(spec: ChartSpec, use_container_width: bool):
+    """Envia a mensagem ``PlotlyChart`` com o texto JSON do cache."""
+    dg = st._main
+    width = "stretch" if use_container_width else "content"
+    height = int(spec.height) if spec.height else _ALTURA_PADRAO
+    proto = PlotlyChartProto()
+    proto.theme = "streamlit"
+    proto.form_id = current_form_id(dg)
+    proto.spec = spec.json
+    proto.config = json.dumps({})
+    proto.id = compute_and_register_element_id(
+        "plotly_chart",
+        user_key=None,
+        key_as_main_identity=False,
+        dg=dg,
+        plotly_spec=proto.spec,
+        plotly_config=proto.config,
+        selection_mode=("points", "box", "lasso"),
+        is_selection_activated=False,
+        theme="streamlit",
+        width=width,
+        height="content",
+        alt=None,
+    )
+    dg._enqueue(
+        "plotly_chart",
+        proto,
+        layout_config=LayoutConfig(width=width, height=height),
+    )
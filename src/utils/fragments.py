@@ -0,0 +1,130 @@
+"""
+Fragmentos do Streamlit com contagem de execuções por interação.
+
+Uma interação com um widget dentro de um fragmento (``st.fragment``)
+reexecuta apenas esse fragmento e o que ele chama, sem rodar o script
+inteiro. O Streamlit não permite que um widget reexecute só os fragmentos
+irmãos que dependem dele, então a granularidade real é:
+
+- os filtros de cada página ficam em um fragmento com todas as seções que
+  dependem deles; mudar um filtro reexecuta a página, não a sidebar;
+- as seções com widgets próprios (paginação das tabelas, exportação,
+  municípios semelhantes, ano da projeção do IDEB, seções das Análises)
+  são fragmentos e reexecutam sozinhas quando esses widgets mudam.
+
+Seções sem widgets próprios são funções comuns: como fragmentos, seriam
+sempre reexecutadas junto com a página. O contador registra quantos
+fragmentos foram executados na última interação; o painel de desempenho
+mostra quais foram e o total da sessão.
+"""
+
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+from src.utils.tracing import panel_section
+
+logger = logging.getLogger(__name__)
+
+_STATS_KEY = "_fragment_stats"
+_local = threading.local()
+
+
+def _get_stats() -> dict:
+    """Estatísticas de execução de fragmentos da sessão atual."""
+    if _STATS_KEY not in st.session_state:
+        st.session_state[_STATS_KEY] = {
+            "interacao": 0,
+            "execucao_completa": True,
+            "executados": [],
+            "anteriores": [],
+            "total": 0,
+        }
+    return st.session_state[_STATS_KEY]
+
+
+def _nova_interacao(execucao_completa: bool):
+    """Inicia a contagem de uma nova interação."""
+    stats = _get_stats()
+    stats["interacao"] += 1
+    stats["execucao_completa"] = execucao_completa
+    stats["anteriores"] = stats["executados"]
+    stats["executados"] = []
+
+
+@contextmanager
+def interaction_scope():
+    """Delimita uma execução completa do script (usado em ``main``)."""
+    _nova_interacao(execucao_completa=True)
+    _local.depth = 1
+    try:
+        yield
+    finally:
+        _local.depth = 0
+
+
+def instrumented_fragment(name: str):
+    """
+    Decorador que transforma a função em ``st.fragment`` e conta execuções.
+
+    Args:
+        name: Nome do fragmento exibido no contador
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            depth = getattr(_local, "depth", 0)
+            if depth == 0:
+                # Fragmento reexecutado isoladamente: nova interação
+                _nova_interacao(execucao_completa=False)
+
+            stats = _get_stats()
+            stats["executados"].append(name)
+            stats["total"] += 1
+
+            _local.depth = depth + 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _local.depth = depth
+
+        return st.fragment(wrapper)
+
+    return decorator
+
+
+def get_fragment_stats() -> dict:
+    """Retorna uma cópia das estatísticas de fragmentos da sessão."""
+    stats = _get_stats()
+    return {
+        **stats,
+        "executados": list(stats["executados"]),
+        "anteriores": list(stats["anteriores"]),
+    }
+
+
+@panel_section
+def _render_fragment_stats():
+    """Contagem de fragmentos da sessão no painel de desempenho."""
+    # A sidebar é desenhada antes da página: mostra a interação anterior
+    stats = get_fragment_stats()
+    anteriores = ", ".join(stats["anteriores"]) or "nenhum"
+    st.caption(
+        f"🧩 Fragmentos: {stats['total']} execuções em {stats['interacao']} "
+        f"interações nesta sessão. Interação anterior: {anteriores}"
+    )
+
+
+def render_fragment_counter():
+    """Mostra quantos fragmentos foram executados na interação atual."""
+    stats = _get_stats()
+    origem = "script completo" if stats["execucao_completa"] else "fragmento"
+    logger.debug("Fragmentos executados: %s", stats["executados"])
+    st.caption(
+        f"🧩 Fragmentos executados nesta interação: {len(stats['executados'])} "
+        f"({origem})"
+    )
@@ -2,6 +2,8 @@
 Funções auxiliares para formatação e cálculos.
 """
 
+import re
+import unicodedata
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
@@ -16,6 +18,12 @@ def format_number(value: float, decimals: int = 2) -> str:
     return f"{value:,.{decimals}f}".replace(",", ".")
 
 
+def slugify(text: str) -> str:
+    """Texto em minúsculas, sem acentos e com ``_`` no lugar de espaços e símbolos."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_").lower()
+
+
 def create_metric_card(
     title: str, value: Any, delta: str = None, help_text: str = None
 ):
@@ -149,20 +157,7 @@ def show_expansion_plans():
         st.markdown("### 📊 Visualizações Avançadas")
         st.markdown(
             """
-        - **Mapas Interativos**: Visualização geoespacial dos indicadores
         - **Séries Temporais**: Análise da evolução histórica
-        - **Dashboards Comparativos**: Benchmarking entre municípios
-        - **Gráficos de Correlação**: Análise de fatores correlacionados
-        """
-        )
-
-        st.markdown("### 🤖 Analytics Avançado")
-        st.markdown(
-            """
-        - **Machine Learning**: Modelos preditivos para IDEB
-        - **Clustering**: Agrupamento de municípios similares
-        - **Análise de Tendências**: Previsão de indicadores
-        - **Detecção de Anomalias**: Identificação de padrões atípicos
         """
         )
 
@@ -170,8 +165,6 @@ def show_expansion_plans():
         st.markdown("### 📱 Funcionalidades Técnicas")
         st.markdown(
             """
-        - **Relatórios PDF**: Geração automática de relatórios
-        - **Sistema de Alertas**: Notificações para metas críticas
         - **Dashboard Mobile**: Interface responsiva
         - **Exportação de Dados**: CSV, Excel, PDF
         """
@@ -182,7 +175,6 @@ def show_expansion_plans():
             """
         - **Análise Socioeconômica**: Correlação com dados do IBGE
         - **Impacto de Políticas**: Avaliação de intervenções
-        - **Previsão de Desempenho**: Modelos preditivos para IDEB
         - **Análise de Eficiência**: Benchmarking entre municípios
         """
         )
@@ -0,0 +1,277 @@
+"""
+Métricas operacionais no formato de exposição do Prometheus.
+
+Registra a latência das execuções completas por página (com quantis sobre
+uma amostra das execuções mais recentes), acertos e falhas do cache do
+DataLoader e do cache de gráficos, duração da última leitura de cada tabela
+(também exibida no painel de desempenho), memória residente do processo, memória
+estimada por sessão e sessões ativas. Uma thread em segundo plano grava o
+texto em ``METRICS_FILE`` a cada ``METRICS_INTERVAL`` segundos, para ser
+lido pelo coletor de arquivos do node_exporter ou servido como estático.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from src.utils.settings import METRICS_FILE, METRICS_INTERVAL
+from src.utils.tracing import panel_section
+
+try:  # só existe em sistemas Unix
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Execuções recentes usadas nos quantis de cada página
+_RESERVOIR_SIZE = 1000
+_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Sessões sem execução há mais tempo que isso deixam de ser ativas (s)
+_SESSION_TTL = 30 * 60
+
+_lock = threading.Lock()
+_reruns: Dict[str, deque] = defaultdict(lambda: deque(maxlen=_RESERVOIR_SIZE))
+_rerun_totals: Dict[str, Tuple[int, float]] = defaultdict(lambda: (0, 0.0))
+_cache_requests: Dict[Tuple[str, str], int] = defaultdict(int)
+_load_seconds: Dict[str, float] = {}
+_sessions: Dict[str, Tuple[float, int]] = {}
+_writer: Optional[threading.Thread] = None
+
+
+def record_rerun(page: str, seconds: float):
+    """Registra a duração de uma execução completa do script."""
+    with _lock:
+        _reruns[page].append(seconds)
+        count, total = _rerun_totals[page]
+        _rerun_totals[page] = (count + 1, total + seconds)
+
+
+def record_cache_request(table: str, hit: bool, seconds: float = 0.0):
+    """Registra uma consulta ao cache do DataLoader (e a duração da leitura)."""
+    with _lock:
+        _cache_requests[(table, "hit" if hit else "miss")] += 1
+        if not hit:
+            _load_seconds[table] = seconds
+
+
+def get_load_seconds() -> Dict[str, float]:
+    """Duração da última leitura (falha do cache) de cada tabela."""
+    with _lock:
+        return dict(_load_seconds)
+
+
+@panel_section
+def _render_load_seconds():
+    """Tempo da carga dos dados no painel de desempenho."""
+    load_seconds = get_load_seconds()
+    if load_seconds:
+        tabelas = ", ".join(f"{t} {s:.1f} s" for t, s in sorted(load_seconds.items()))
+        st.caption(f"📂 Carga dos dados: {sum(load_seconds.values()):.1f} s ({tabelas})")
+
+
+def _estimate_bytes(value) -> int:
+    """Estimativa rasa do tamanho de um valor guardado na sessão."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_estimate_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def track_session():
+    """Marca a sessão atual como ativa e estima a memória do seu estado."""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    state_bytes = sum(
+        _estimate_bytes(st.session_state[k]) for k in list(st.session_state.keys())
+    )
+    with _lock:
+        _sessions[ctx.session_id] = (time.time(), state_bytes)
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """
+    Memória residente do processo (pico, fora do Linux).
+
+    Returns:
+        Bytes, ou None se o sistema não oferece a medida (Windows)
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        if resource is None:
+            return None
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _escape(value: str) -> str:
+    """Escapa um valor de rótulo."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_metrics() -> str:
+    """Texto das métricas no formato de exposição do Prometheus."""
+    # Importados aqui para evitar ciclo (ambos registram métricas aqui)
+    from src.utils.figure_cache import figure_cache
+    from src.utils.tracing import BUCKETS_MS, tracer
+
+    now = time.time()
+    with _lock:
+        reruns = {page: np.array(values) for page, values in _reruns.items()}
+        totals = dict(_rerun_totals)
+        cache_requests = dict(_cache_requests)
+        load_seconds = dict(_load_seconds)
+        for session_id in [
+            s for s, (seen, _) in _sessions.items() if now - seen > _SESSION_TTL
+        ]:
+            del _sessions[session_id]
+        sessions = dict(_sessions)
+
+    lines = [
+        "# HELP dashboard_rerun_seconds Duração das execuções completas por página.",
+        "# TYPE dashboard_rerun_seconds summary",
+    ]
+    for page, values in sorted(reruns.items()):
+        for q in _QUANTILES:
+            lines.append(
+                f"dashboard_rerun_seconds{_labels(page=page, quantile=q)} "
+                f"{np.quantile(values, q):.6f}"
+            )
+        count, total = totals[page]
+        lines.append(f"dashboard_rerun_seconds_sum{_labels(page=page)} {total:.6f}")
+        lines.append(f"dashboard_rerun_seconds_count{_labels(page=page)} {count}")
+
+    lines += [
+        "# HELP dashboard_data_cache_requests_total Consultas ao cache do DataLoader.",
+        "# TYPE dashboard_data_cache_requests_total counter",
+    ]
+    for (table, result), count in sorted(cache_requests.items()):
+        lines.append(
+            "dashboard_data_cache_requests_total"
+            f"{_labels(table=table, result=result)} {count}"
+        )
+    lines += [
+        "# HELP dashboard_data_load_seconds Duração da última leitura de cada tabela.",
+        "# TYPE dashboard_data_load_seconds gauge",
+    ]
+    for table, seconds in sorted(load_seconds.items()):
+        lines.append(f"dashboard_data_load_seconds{_labels(table=table)} {seconds:.6f}")
+
+    figure_stats = figure_cache.stats()
+    lines += [
+        "# HELP dashboard_figure_cache_requests_total Consultas ao cache de gráficos.",
+        "# TYPE dashboard_figure_cache_requests_total counter",
+        f'dashboard_figure_cache_requests_total{{result="hit"}} {figure_stats["hits"]}',
+        f'dashboard_figure_cache_requests_total{{result="miss"}} '
+        f'{figure_stats["misses"]}',
+        "# HELP dashboard_figure_cache_bytes Bytes ocupados pelo cache de gráficos.",
+        "# TYPE dashboard_figure_cache_bytes gauge",
+        f"dashboard_figure_cache_bytes {figure_stats['bytes']}",
+    ]
+
+    residente = resident_memory_bytes()
+    if residente is not None:
+        lines += [
+            "# HELP dashboard_resident_memory_bytes Memória residente do processo.",
+            "# TYPE dashboard_resident_memory_bytes gauge",
+            f"dashboard_resident_memory_bytes {residente}",
+        ]
+    lines += [
+        "# HELP dashboard_session_state_bytes Memória estimada do estado da sessão.",
+        "# TYPE dashboard_session_state_bytes gauge",
+    ]
+    for session_id, (_, state_bytes) in sorted(sessions.items()):
+        lines.append(
+            f"dashboard_session_state_bytes{_labels(session=session_id)} {state_bytes}"
+        )
+    lines += [
+        "# HELP dashboard_active_sessions Sessões com execução nos últimos 30 min.",
+        "# TYPE dashboard_active_sessions gauge",
+        f"dashboard_active_sessions {len(sessions)}",
+    ]
+
+    # Histogramas dos spans, quando o rastreamento está ativo
+    histograms = tracer.histograms()
+    if histograms:
+        lines += [
+            "# HELP dashboard_span_seconds Latência dos spans de rastreamento.",
+            "# TYPE dashboard_span_seconds histogram",
+        ]
+        for name, histogram in sorted(histograms.items()):
+            acumulado = 0
+            for limite, n in zip(BUCKETS_MS + (float("inf"),), histogram.counts):
+                acumulado += n
+                le = "+Inf" if limite == float("inf") else f"{limite / 1000:g}"
+                lines.append(
+                    f"dashboard_span_seconds_bucket{_labels(span=name, le=le)} "
+                    f"{acumulado}"
+                )
+            lines.append(
+                f"dashboard_span_seconds_sum{_labels(span=name)} "
+                f"{histogram.total_ms / 1000:.6f}"
+            )
+            lines.append(
+                f"dashboard_span_seconds_count{_labels(span=name)} {histogram.count}"
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: str):
+    """Grava as métricas de forma atômica (arquivo temporário + rename)."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_text(render_metrics(), encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def _writer_loop(path: str, interval: int):
+    while True:
+        try:
+            write_metrics(path)
+        except Exception:  # as métricas nunca devem derrubar o servidor
+            logger.exception("Falha ao gravar métricas em %s", path)
+        time.sleep(interval)
+
+
+def start_metrics_writer(
+    path: str = METRICS_FILE, interval: int = METRICS_INTERVAL
+) -> bool:
+    """Inicia (uma vez por processo) a gravação periódica das métricas."""
+    global _writer
+    if not path:
+        return False
+    with _lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(
+                target=_writer_loop,
+                args=(path, max(interval, 1)),
+                name="dashboard-metrics",
+                daemon=True,
+            )
+            _writer.start()
+    return True
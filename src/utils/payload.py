@@ -0,0 +1,144 @@
+"""
+Compactação das especificações de gráficos enviadas ao navegador.
+
+Antes de serializar uma figura:
+- arredonda os valores numéricos dos traços à precisão de exibição;
+- codifica arrays numéricos como typed arrays do plotly.js
+  (``{"dtype", "bdata", "shape"}``), com o menor tipo inteiro possível,
+  ou mantém a lista em texto quando ela fica menor que o binário;
+- remove do template os estilos de tipos de traço que a figura não usa.
+"""
+
+import base64
+import json
+from typing import Optional
+
+import numpy as np
+import plotly.io as pio
+
+# Tipos aceitos pelo plotly.js em typed arrays
+_TYPED_DTYPES = {
+    "f8": np.float64,
+    "f4": np.float32,
+    "i1": np.int8,
+    "u1": np.uint8,
+    "i2": np.int16,
+    "u2": np.uint16,
+    "i4": np.int32,
+    "u4": np.uint32,
+}
+_INT_DTYPES = ["u1", "i1", "u2", "i2", "u4", "i4"]
+
+# Arrays menores que isso não compensam a codificação
+_MIN_ARRAY_SIZE = 4
+
+
+def _as_numeric_array(value) -> Optional[np.ndarray]:
+    """Converte um valor de atributo em array numérico (ou None)."""
+    if isinstance(value, dict):
+        if "bdata" not in value or value.get("dtype") not in _TYPED_DTYPES:
+            return None
+        arr = np.frombuffer(
+            base64.b64decode(value["bdata"]), dtype=_TYPED_DTYPES[value["dtype"]]
+        )
+        if "shape" in value:
+            arr = arr.reshape([int(n) for n in str(value["shape"]).split(",")])
+        return arr
+
+    if isinstance(value, (list, tuple)):
+        if len(value) == 0 or isinstance(value[0], (str, bool, dict)):
+            return None
+        try:
+            value = np.asarray(value)
+        except ValueError:  # listas irregulares
+            return None
+
+    if isinstance(value, np.ndarray) and value.dtype.kind in "iuf":
+        return value
+    return None
+
+
+def _typed_array(arr: np.ndarray, dtype: str) -> dict:
+    """Codifica o array como typed array do plotly.js."""
+    encoded = {
+        "dtype": dtype,
+        "bdata": base64.b64encode(
+            np.ascontiguousarray(arr, dtype=_TYPED_DTYPES[dtype]).tobytes()
+        ).decode("ascii"),
+    }
+    if arr.ndim > 1:
+        encoded["shape"] = ",".join(str(n) for n in arr.shape)
+    return encoded
+
+
+def _encode_array(arr: np.ndarray, decimals: int):
+    """Arredonda e escolhe a codificação mais compacta para o array."""
+    if arr.dtype.kind == "f":
+        arr = np.round(arr.astype(np.float64), decimals)
+        finite = np.isfinite(arr)
+        if finite.all() and np.array_equal(arr, np.floor(arr)):
+            arr = arr.astype(np.int64)
+
+    if arr.dtype.kind in "iu":
+        lo, hi = arr.min(), arr.max()
+        for dtype in _INT_DTYPES:
+            info = np.iinfo(_TYPED_DTYPES[dtype])
+            if info.min <= lo and hi <= info.max:
+                return _typed_array(arr, dtype)
+        return arr.tolist()
+
+    # Floats: texto arredondado costuma ser menor que 8 bytes por valor
+    as_list = np.where(np.isfinite(arr), arr, np.nan).tolist()
+    as_list = _nan_to_none(as_list)
+    typed = _typed_array(arr, "f8")
+    if len(json.dumps(as_list)) <= len(typed["bdata"]):
+        return as_list
+    return typed
+
+
+def _nan_to_none(values):
+    """Troca NaN por None (null no JSON), inclusive em listas aninhadas."""
+    if isinstance(values, list):
+        return [_nan_to_none(v) for v in values]
+    return None if isinstance(values, float) and values != values else values
+
+
+def _compact_node(node: dict, decimals: int):
+    """Compacta recursivamente os arrays numéricos de um traço."""
+    for key, value in node.items():
+        if isinstance(value, dict) and "bdata" not in value:
+            _compact_node(value, decimals)
+            continue
+        arr = _as_numeric_array(value)
+        if arr is not None and arr.size >= _MIN_ARRAY_SIZE:
+            node[key] = _encode_array(arr, decimals)
+
+
+def compact_figure_dict(fig_dict: dict, decimals: int = 3) -> dict:
+    """
+    Compacta uma figura em formato de dicionário (altera o próprio dict).
+
+    Args:
+        fig_dict: Figura no formato de ``Figure.to_dict()``
+        decimals: Casas decimais de exibição dos valores
+    """
+    trace_types = set()
+    for trace in fig_dict.get("data", []):
+        trace_types.add(trace.get("type", "scatter"))
+        _compact_node(trace, decimals)
+
+    template = fig_dict.get("layout", {}).get("template")
+    if isinstance(template, dict) and isinstance(template.get("data"), dict):
+        template["data"] = {
+            trace_type: styles
+            for trace_type, styles in template["data"].items()
+            if trace_type in trace_types
+        }
+    return fig_dict
+
+
+def serialize_figure(fig, decimals: int = 3, compact: bool = True) -> str:
+    """Serializa a figura em JSON, compactando o conteúdo se indicado."""
+    if not compact:
+        return pio.to_json(fig, validate=False)
+    return pio.to_json(compact_figure_dict(fig.to_dict(), decimals), validate=False)
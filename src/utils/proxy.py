@@ -0,0 +1,162 @@
+"""
+Proxy reverso local com sessões fixas (sticky) para vários processos.
+
+Cada sessão do Streamlit vive em uma conexão WebSocket com um processo;
+arquivos de mídia e o cookie XSRF também pertencem ao processo que os
+criou. O proxy escolhe o processo pela cookie ``dashboard_worker`` (ou,
+na primeira visita, por um hash do IP do cliente) e grava a cookie na
+primeira resposta. Depois do cabeçalho da requisição, os bytes são
+repassados nos dois sentidos sem interpretação, o que inclui o upgrade
+para WebSocket.
+"""
+
+import asyncio
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+COOKIE_NAME = "dashboard_worker"
+
+_MAX_HEADER_BYTES = 64 * 1024
+_BUFFER_SIZE = 64 * 1024
+
+
+@dataclass
+class Backend:
+    """Processo do Streamlit atrás do proxy."""
+
+    index: int
+    host: str
+    port: int
+    healthy: bool = False
+
+
+def _cookie_worker(head: bytes) -> Optional[int]:
+    """Índice do processo gravado na cookie da requisição (se houver)."""
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() != b"cookie":
+            continue
+        for item in value.split(b";"):
+            key, _, cookie = item.strip().partition(b"=")
+            if key == COOKIE_NAME.encode() and cookie.isdigit():
+                return int(cookie)
+    return None
+
+
+def _add_header(head: bytes, header: str) -> bytes:
+    """Acrescenta um cabeçalho ao bloco terminado em ``\\r\\n\\r\\n``."""
+    return head[:-2] + header.encode("latin1") + b"\r\n\r\n"
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Copia bytes até o fim da conexão de origem."""
+    try:
+        while data := await reader.read(_BUFFER_SIZE):
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+class StickyProxy:
+    """Proxy TCP que fixa cada cliente em um processo saudável."""
+
+    def __init__(self, backends: List[Backend]):
+        self.backends = backends
+
+    def choose(self, head: bytes, client_ip: str) -> List[Backend]:
+        """Processos candidatos, em ordem de preferência."""
+        healthy = [b for b in self.backends if b.healthy]
+        if not healthy:
+            return []
+        preferred = _cookie_worker(head)
+        start = zlib.crc32(client_ip.encode()) % len(healthy)
+        ordered = healthy[start:] + healthy[:start]
+        for i, backend in enumerate(ordered):
+            if backend.index == preferred:
+                ordered.insert(0, ordered.pop(i))
+                break
+        return ordered
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão de cliente."""
+        client_ip = (writer.get_extra_info("peername") or ("",))[0]
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+
+        upstream = None
+        for backend in self.choose(head, client_ip):
+            try:
+                upstream = await asyncio.open_connection(backend.host, backend.port)
+                break
+            except OSError:
+                logger.warning("Processo %d indisponível", backend.index)
+                backend.healthy = False
+        if upstream is None:
+            writer.write(
+                b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            await writer.drain()
+            writer.close()
+            return
+
+        up_reader, up_writer = upstream
+        up_writer.write(_add_header(head, f"X-Forwarded-For: {client_ip}"))
+        await up_writer.drain()
+
+        if _cookie_worker(head) != backend.index:
+            # Primeira resposta: fixa o cliente no processo escolhido
+            try:
+                response = await up_reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                up_writer.close()
+                writer.close()
+                return
+            if not response.startswith(b"HTTP/1.1 101"):
+                response = _add_header(
+                    response,
+                    f"Set-Cookie: {COOKIE_NAME}={backend.index}; Path=/; "
+                    "HttpOnly; SameSite=Lax",
+                )
+            writer.write(response)
+            await writer.drain()
+
+        await asyncio.gather(_pipe(reader, up_writer), _pipe(up_reader, writer))
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        """Inicia o servidor do proxy."""
+        return await asyncio.start_server(
+            self.handle, host, port, limit=_MAX_HEADER_BYTES
+        )
+
+
+async def check_health(backend: Backend, timeout: float = 2.0) -> bool:
+    """Consulta o endpoint de saúde do Streamlit no processo."""
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(backend.host, backend.port), timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+    try:
+        writer.write(
+            f"GET /_stcore/health HTTP/1.1\r\nHost: {backend.host}\r\n"
+            "Connection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status = await asyncio.wait_for(reader.readline(), timeout)
+        return b" 200 " in status
+    except (OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        writer.close()
@@ -0,0 +1,70 @@
+"""
+Configurações do dashboard lidas de variáveis de ambiente.
+"""
+
+import os
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Lê uma variável de ambiente booleana (1/true/sim/yes/on)."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "sim", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    """Lê uma variável de ambiente inteira, usando o padrão se inválida."""
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Pasta com os CSVs do dashboard (dados sintéticos, testes de carga)
+DATA_PATH = os.environ.get("DASHBOARD_DATA_PATH", "database")
+
+# Pasta dos snapshots das tabelas compartilhados entre processos (definida
+# pelo run_app.py com --workers; vazia lê sempre os CSVs)
+SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR", "")
+
+# Aquecimento dos caches em segundo plano ao iniciar o servidor
+WARMUP_ENABLED = env_flag("DASHBOARD_WARMUP", default=True)
+
+# Limite de memória do cache de gráficos serializados (em MB)
+FIGURE_CACHE_MAX_MB = env_int("DASHBOARD_FIGURE_CACHE_MB", 64)
+
+# Compactação das especificações de gráficos (arredondamento e typed arrays)
+COMPACT_CHARTS = env_flag("DASHBOARD_COMPACT_CHARTS", default=True)
+
+# Linhas carregadas por página nas tabelas detalhadas
+TABLE_PAGE_SIZE = env_int("DASHBOARD_TABLE_PAGE_SIZE", 50)
+
+# Linhas por bloco na exportação dos dados filtrados (CSV, Excel e Parquet)
+EXPORT_CHUNK_ROWS = env_int("DASHBOARD_EXPORT_CHUNK_ROWS", 50000)
+
+# Regras de alerta em JSON (lista de objetos com nome, descricao, expressao,
+# severidade e por_serie); vazio usa as regras padrão de src/data/alerts.py
+ALERT_RULES_FILE = os.environ.get("DASHBOARD_ALERT_RULES", "")
+
+# Pasta do estado das regras de alerta por versão dos dados (valores
+# anteriores usados por queda(...)); sobrevive a reinícios e é compartilhada
+# pelos processos. Vazia (padrão) mantém o estado só em memória
+ALERT_STATE_DIR = os.environ.get("DASHBOARD_ALERT_STATE_DIR", "")
+
+# Gráficos em escala nacional: a partir de quantos pontos usar WebGL e a
+# partir de quantos pontos/barras trocar por resumos calculados no servidor
+WEBGL_MIN_POINTS = env_int("DASHBOARD_WEBGL_MIN_POINTS", 1000)
+CHART_MAX_POINTS = env_int("DASHBOARD_CHART_MAX_POINTS", 10000)
+CHART_MAX_BARS = env_int("DASHBOARD_CHART_MAX_BARS", 150)
+
+# Spans de rastreamento (latência por etapa) e painel de desempenho, exibido
+# apenas com ?admin=<token> na URL
+TRACING_ENABLED = env_flag("DASHBOARD_TRACING", default=False)
+ADMIN_TOKEN = os.environ.get("DASHBOARD_ADMIN_TOKEN", "")
+
+# Arquivo de métricas no formato de exposição do Prometheus (vazio desliga) e
+# intervalo de escrita em segundos; em static/ é servido em /app/static/
+# (com run_app.py --workers, um arquivo por processo: metrics-0.prom etc.)
+METRICS_FILE = os.environ.get("DASHBOARD_METRICS_FILE", "")
+METRICS_INTERVAL = env_int("DASHBOARD_METRICS_INTERVAL", 15)
@@ -0,0 +1,226 @@
+"""
+Supervisor de vários processos do Streamlit atrás do proxy local.
+
+Um único processo do Streamlit atende todos os usuários com um só
+interpretador (e um só GIL). O supervisor inicia N processos em portas
+locais, coloca o ``StickyProxy`` na porta pública, reinicia processos que
+terminarem (com espera crescente se caírem logo após iniciar) e mantém um
+snapshot das tabelas já carregadas para que os processos não interpretem
+os CSVs de novo.
+"""
+
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from src.data.data_loader import DataLoader
+from src.data.snapshot import prune_snapshots, write_snapshot
+from src.utils.proxy import Backend, StickyProxy, check_health
+
+logger = logging.getLogger(__name__)
+
+# Um processo que cai antes disso conta como falha na inicialização (s)
+_MIN_UPTIME = 30
+_MAX_BACKOFF = 30
+_MONITOR_INTERVAL = 1.0
+_SNAPSHOT_INTERVAL = 10.0
+
+
+def _worker_env(env: dict, index: int) -> dict:
+    """
+    Ambiente de um processo, com arquivo de métricas próprio.
+
+    Cada processo grava as próprias métricas; com o mesmo arquivo, um
+    sobrescreveria o do outro. ``metrics.prom`` vira ``metrics-0.prom``,
+    ``metrics-1.prom`` etc. (o índice não muda quando o processo reinicia).
+    """
+    metrics_file = env.get("DASHBOARD_METRICS_FILE")
+    if not metrics_file:
+        return env
+    path = Path(metrics_file)
+    return {
+        **env,
+        "DASHBOARD_METRICS_FILE": str(
+            path.with_name(f"{path.stem}-{index}{path.suffix}")
+        ),
+    }
+
+
+class Worker:
+    """Processo do Streamlit em uma porta local."""
+
+    def __init__(self, backend: Backend, command: List[str], env: dict):
+        self.backend = backend
+        self.command = command
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restarts = 0
+        self.next_start = 0.0
+
+    def start(self):
+        self.process = subprocess.Popen(self.command, env=self.env)
+        self.started_at = time.monotonic()
+        self.backend.healthy = False
+
+    def exited(self) -> bool:
+        return self.process is not None and self.process.poll() is not None
+
+    def schedule_restart(self):
+        """Agenda o reinício, com espera crescente para quedas seguidas."""
+        uptime = time.monotonic() - self.started_at
+        self.failures = self.failures + 1 if uptime < _MIN_UPTIME else 0
+        delay = min(_MAX_BACKOFF, 2**self.failures - 1)
+        logger.warning(
+            "Processo %d terminou (código %s); reiniciando em %ds",
+            self.backend.index,
+            self.process.returncode,
+            delay,
+        )
+        self.process = None
+        self.next_start = time.monotonic() + delay
+
+    def stop(self, timeout: float = 10):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class Supervisor:
+    """Inicia, monitora e reinicia os processos e serve o proxy."""
+
+    def __init__(
+        self,
+        workers: int,
+        port: int = 8501,
+        host: str = "0.0.0.0",
+        data_path: str = "database",
+        app: str = "app.py",
+        snapshot_dir: Optional[str] = None,
+    ):
+        """
+        Configura o supervisor.
+
+        Args:
+            workers: Quantidade de processos do Streamlit
+            port: Porta pública do proxy (os processos usam as seguintes)
+            host: Endereço público do proxy
+            data_path: Pasta com os CSVs
+            app: Script do Streamlit
+            snapshot_dir: Pasta dos snapshots (None cria uma temporária)
+        """
+        self.host = host
+        self.port = port
+        self.data_path = data_path
+        self.snapshot_dir = snapshot_dir or tempfile.mkdtemp(prefix="dashboard-")
+        self.data_version = None
+
+        env = {
+            **os.environ,
+            "DASHBOARD_DATA_PATH": str(data_path),
+            "DASHBOARD_SNAPSHOT_DIR": self.snapshot_dir,
+        }
+        # Estado dos alertas comum aos processos (junto dos snapshots, se não
+        # houver uma pasta configurada)
+        env.setdefault(
+            "DASHBOARD_ALERT_STATE_DIR", str(Path(self.snapshot_dir) / ".alertas")
+        )
+        self.workers = []
+        for i in range(workers):
+            backend = Backend(index=i, host="127.0.0.1", port=port + 1 + i)
+            command = [
+                sys.executable,
+                "-m",
+                "streamlit",
+                "run",
+                app,
+                "--server.port",
+                str(backend.port),
+                "--server.address",
+                backend.host,
+                "--server.headless",
+                "true",
+            ]
+            self.workers.append(Worker(backend, command, _worker_env(env, i)))
+        self.proxy = StickyProxy([w.backend for w in self.workers])
+
+    def refresh_snapshot(self) -> bool:
+        """Grava o snapshot se a versão dos dados mudou."""
+        data_loader = DataLoader(self.data_path)
+        data_version = data_loader.data_version
+        if data_version == self.data_version:
+            return False
+        inicio = time.perf_counter()
+        write_snapshot(data_loader, self.snapshot_dir)
+        prune_snapshots(self.snapshot_dir, keep=data_version)
+        self.data_version = data_version
+        logger.info(
+            "Snapshot %s gravado em %.2fs", data_version, time.perf_counter() - inicio
+        )
+        return True
+
+    async def _monitor(self):
+        """Reinicia processos que terminaram e atualiza a saúde e o snapshot."""
+        ultimo_snapshot = time.monotonic()
+        while True:
+            for worker in self.workers:
+                if worker.exited():
+                    worker.backend.healthy = False
+                    worker.schedule_restart()
+                if worker.process is None and time.monotonic() >= worker.next_start:
+                    worker.restarts += 1
+                    worker.start()
+
+            saude = await asyncio.gather(
+                *(check_health(w.backend) for w in self.workers)
+            )
+            for worker, healthy in zip(self.workers, saude):
+                if healthy and not worker.backend.healthy:
+                    logger.info(
+                        "Processo %d pronto na porta %d",
+                        worker.backend.index,
+                        worker.backend.port,
+                    )
+                worker.backend.healthy = healthy
+
+            if time.monotonic() - ultimo_snapshot >= _SNAPSHOT_INTERVAL:
+                ultimo_snapshot = time.monotonic()
+                try:
+                    await asyncio.to_thread(self.refresh_snapshot)
+                except Exception:  # noqa: BLE001 - os processos leem os CSVs
+                    logger.exception("Falha ao gravar o snapshot dos dados")
+
+            await asyncio.sleep(_MONITOR_INTERVAL)
+
+    async def run(self):
+        """Executa até ser interrompido."""
+        self.refresh_snapshot()
+        for worker in self.workers:
+            worker.start()
+        server = await self.proxy.serve(self.host, self.port)
+        logger.info(
+            "Proxy em http://%s:%d com %d processos",
+            self.host,
+            self.port,
+            len(self.workers),
+        )
+        try:
+            async with server:
+                await self._monitor()
+        finally:
+            self.stop()
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stop()
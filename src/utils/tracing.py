@@ -0,0 +1,181 @@
+"""
+Rastreamento leve das etapas de cada execução do dashboard.
+
+Spans (gerenciador de contexto ``span`` ou decorador ``traced``) medem o
+tempo de carregamentos, filtros, agrupamentos e gráficos. As latências são
+agregadas no processo em histogramas com faixas fixas, compartilhados por
+todas as sessões. Com o rastreamento desligado (padrão), ``span`` devolve um
+contexto vazio compartilhado e ``traced`` devolve a própria função, sem
+custo adicional.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List
+
+import pandas as pd
+import streamlit as st
+
+from src.utils.settings import ADMIN_TOKEN, TRACING_ENABLED
+
+# Limites superiores das faixas do histograma (ms); a última é infinita
+# fmt: off
+BUCKETS_MS = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000
+)
+# fmt: on
+
+_NOOP = nullcontext()
+
+
+class SpanHistogram:
+    """Histograma de latências de um span."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float):
+        """Registra uma execução."""
+        self.counts[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def quantile(self, q: float) -> float:
+        """Estimativa do quantil ``q`` (limite superior da faixa, em ms)."""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        acumulado = 0
+        for i, n in enumerate(self.counts):
+            acumulado += n
+            if acumulado >= target:
+                limite = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+                return min(limite, self.max_ms)
+        return self.max_ms
+
+
+class Tracer:
+    """Registro dos histogramas de todos os spans do processo."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._histograms: Dict[str, SpanHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed_ms: float):
+        """Registra a duração de um span."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = SpanHistogram()
+            histogram.observe(elapsed_ms)
+
+    @contextmanager
+    def _measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def span(self, name: str):
+        """Contexto que mede o bloco (vazio se o rastreamento estiver desligado)."""
+        if not self.enabled:
+            return _NOOP
+        return self._measure(name)
+
+    def histograms(self) -> Dict[str, SpanHistogram]:
+        """Cópia rasa do registro de histogramas."""
+        with self._lock:
+            return dict(self._histograms)
+
+    def reset(self):
+        """Descarta todas as medições."""
+        with self._lock:
+            self._histograms.clear()
+
+
+tracer = Tracer(TRACING_ENABLED)
+
+
+def span(name: str):
+    """Mede o bloco ``with`` como um span de nome ``name``."""
+    return tracer.span(name)
+
+
+def traced(name: str):
+    """Decorador que mede cada chamada da função como um span."""
+
+    def decorator(func):
+        if not tracer.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_span_stats() -> List[dict]:
+    """Estatísticas por span, ordenadas pelo tempo total."""
+    stats = [
+        {
+            "span": name,
+            "chamadas": h.count,
+            "media_ms": h.total_ms / h.count if h.count else 0.0,
+            "p50_ms": h.quantile(0.5),
+            "p95_ms": h.quantile(0.95),
+            "max_ms": h.max_ms,
+            "total_ms": h.total_ms,
+        }
+        for name, h in tracer.histograms().items()
+    ]
+    return sorted(stats, key=lambda s: s["total_ms"], reverse=True)
+
+
+def is_admin() -> bool:
+    """Indica se a sessão abriu o dashboard com o token de administrador."""
+    return bool(ADMIN_TOKEN) and st.query_params.get("admin") == ADMIN_TOKEN
+
+
+# Seções extras do painel de desempenho, registradas por outros módulos
+_panel_sections: List[Callable[[], None]] = []
+
+
+def panel_section(func: Callable[[], None]) -> Callable[[], None]:
+    """Registra uma função que desenha uma seção do painel de desempenho."""
+    _panel_sections.append(func)
+    return func
+
+
+def render_performance_panel():
+    """Painel de desempenho na sidebar (somente administradores)."""
+    if not tracer.enabled or not is_admin():
+        return
+
+    with st.sidebar.expander("⏱️ Desempenho (spans)"):
+        stats = get_span_stats()
+        if stats:
+            tabela = pd.DataFrame(stats).round(2)
+            tabela.columns = ["Span", "Chamadas", "Média", "p50", "p95", "Máx", "Total"]
+            st.dataframe(tabela, hide_index=True, use_container_width=True)
+            st.caption("Tempos em ms; p50/p95 estimados pelas faixas do histograma.")
+
+            if st.button("Zerar medições", key="tracing_reset"):
+                tracer.reset()
+        else:
+            st.caption("Nenhum span registrado ainda.")
+
+        for section in _panel_sections:
+            section()
@@ -0,0 +1,52 @@
+"""Testes do envio dos gráficos do cache (src/utils/figure_cache.py)."""
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from src.utils import figure_cache
+
+
+def _app():
+    import plotly.graph_objects as go
+
+    from src.utils.figure_cache import ChartSpec, plotly_chart_spec
+    from src.utils.payload import serialize_figure
+
+    fig = go.Figure(go.Bar(x=["a", "b"], y=[1, 2]))
+    fig.update_layout(height=320)
+    plotly_chart_spec(ChartSpec(serialize_figure(fig), 320))
+
+
+@pytest.fixture
+def mensagem_direta(monkeypatch):
+    """Restaura o caminho direto a cada teste."""
+    monkeypatch.setattr(figure_cache, "_mensagem_direta", True)
+
+
+def _graficos(at: AppTest):
+    assert not at.exception, [e.message for e in at.exception]
+    return at.get("plotly_chart")
+
+
+def test_envio_direto(mensagem_direta):
+    at = AppTest.from_function(_app).run()
+    graficos = _graficos(at)
+    assert len(graficos) == 1
+    assert '"height":320' in graficos[0].proto.spec.replace(" ", "")
+    assert figure_cache._mensagem_direta
+
+
+@pytest.mark.parametrize("erro", [TypeError, AttributeError])
+def test_fallback_quando_a_api_interna_muda(mensagem_direta, monkeypatch, erro):
+    def assinatura_nova(*args, **kwargs):
+        raise erro("argumento inesperado")
+
+    monkeypatch.setattr(
+        figure_cache, "compute_and_register_element_id", assinatura_nova
+    )
+    at = AppTest.from_function(_app).run()
+    graficos = _graficos(at)
+    assert len(graficos) == 1
+    assert '"type":"bar"' in graficos[0].proto.spec.replace(" ", "")
+    # Os gráficos seguintes vão direto para o st.plotly_chart
+    assert not figure_cache._mensagem_direta
@@ -0,0 +1,65 @@
+"""Testes da consulta paginada (src/data/table_index.py)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.table_index import TableIndex
+
+
+@pytest.fixture
+def tabela():
+    return pd.DataFrame(
+        {
+            "Município": [
+                "Ibatiba",
+                "Serra",
+                "Afonso Cláudio",
+                "Vitória",
+                "Águia Branca",
+                "Iúna",
+            ],
+            "Taxa": [90.0, 85.0, 90.0, np.nan, 85.0, 90.0],
+        }
+    )
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("coluna", ["Taxa", "Município"])
+def test_ordem_igual_ao_pandas(tabela, coluna, ascending):
+    pagina, total = TableIndex(tabela).query(
+        sort_by=coluna, ascending=ascending, limit=len(tabela)
+    )
+    chave = tabela[coluna]
+    if coluna == "Município":
+        chave = (
+            chave.str.normalize("NFKD")
+            .str.encode("ascii", "ignore")
+            .str.decode("ascii")
+            .str.lower()
+        )
+    esperado = chave.sort_values(ascending=ascending, kind="stable", na_position="last")
+    assert total == len(tabela)
+    assert list(pagina.index) == list(esperado.index)
+
+
+def test_empates_mantem_a_ordem_original_na_decrescente(tabela):
+    pagina, _ = TableIndex(tabela).query(sort_by="Taxa", ascending=False, limit=10)
+    assert list(pagina["Município"]) == [
+        "Ibatiba",
+        "Afonso Cláudio",
+        "Iúna",
+        "Serra",
+        "Águia Branca",
+        "Vitória",
+    ]
+
+
+def test_paginacao_com_busca(tabela):
+    indice = TableIndex(tabela)
+    pagina, total = indice.query(search="agu", offset=0, limit=1)
+    assert total == 1
+    assert list(pagina["Município"]) == ["Águia Branca"]
+    pagina, total = indice.query(sort_by="Taxa", offset=4, limit=2)
+    assert total == len(tabela)
+    assert list(pagina["Município"]) == ["Iúna", "Vitória"]